@@ -0,0 +1,328 @@
+# -------------------------------------------------------------------
+# Benchmark suite: every registered generator and solver, over a grid of maze sizes.
+# Run from the directory of mazeTester2.py:
+#   python3 benchmarks/benchmarkSuite.py run [--sizes sample,small,medium] [--seeds 1] [--output results.json]
+#   python3 benchmarks/benchmarkSuite.py compare <old results> <new results> [--threshold 0.2]
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+
+# directory of mazeTester2.py, which the suite imports the generators and solvers from
+TESTER_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if TESTER_DIR not in sys.path:
+    sys.path.insert(0, TESTER_DIR)
+
+from engineRegistry import registry, GENERATOR, SOLVER
+from maze.maze3D import Maze3D
+from maze.util import Coordinates3D
+
+
+# maze sizes, as levelSpecs; sample is that of the sample configurations, large and huge are millions of cells
+SIZES: Dict[str, List[List[int]]] = {'sample': [[5, 5], [5, 5], [5, 5]],
+                                     'small': [[20, 20], [20, 20], [20, 20]],
+                                     'medium': [[100, 100], [100, 100], [100, 100], [100, 100]],
+                                     'large': [[500, 500], [500, 500], [500, 500], [500, 500]],
+                                     'huge': [[1000, 1000], [1000, 1000], [1000, 1000]]}
+DEFAULT_SIZES: List[str] = ['sample', 'small', 'medium']
+
+# phases of a run, in order
+PHASES: List[str] = ['initCells', 'generateMaze', 'carve', 'solveMaze']
+
+# phases faster than this (in seconds) are too noisy to compare
+MIN_COMPARE_SECONDS: float = 0.005
+# memory peaks smaller than this (in MB) are too noisy to compare
+MIN_COMPARE_MB: float = 0.5
+
+
+
+def mazeSpec(levelSpecs: List[List[int]])->Tuple[List[List[int]], List[List[int]]]:
+    """
+    @returns (entrances, exits) of the benchmark mazes: an entrance on the left of the first level, and an exit on the
+        right of the last level.
+    """
+    (rowNum, colNum) = levelSpecs[-1]
+    return ([[0, 0, -1]], [[len(levelSpecs) - 1, rowNum - 1, colNum]])
+
+
+
+def peakRssMB()->float:
+    """
+    @returns Peak resident set size of this process so far, in MB.
+    """
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+
+class PhaseTimer:
+    """
+    Times the phases of a run and, if tracemalloc is tracing, records the peak memory each phase allocated on top of
+    what was allocated when it started.  Phases can be nested (initCells runs inside generateMaze); times are exclusive
+    of the nested phases, memory peaks include them.
+    """
+
+    def __init__(self):
+        self.m_seconds: Dict[str, float] = dict()
+        self.m_peakMB: Dict[str, float] = dict()
+        # [phase, start time, traced memory at start, highest traced memory so far] of the running phases
+        self.m_running: List[list] = list()
+
+
+
+    def updatePeaks(self):
+        """
+        Folds the traced memory peak since the last update into the running phases' peaks, and restarts it.
+        """
+        if tracemalloc.is_tracing():
+            (_, tracedPeak) = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for running in self.m_running:
+                running[3] = max(running[3], tracedPeak)
+
+
+
+    def start(self, phase: str):
+        self.updatePeaks()
+        traced: int = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self.m_running.append([phase, time.perf_counter(), traced, traced])
+
+
+
+    def stop(self, phase: str):
+        seconds: float = time.perf_counter() - self.m_running[-1][1]
+        self.updatePeaks()
+        (runningPhase, _, tracedStart, tracedPeak) = self.m_running.pop()
+        assert(runningPhase == phase)
+
+        self.m_seconds[phase] = self.m_seconds.get(phase, 0) + seconds
+        # the enclosing phase was paused meanwhile
+        if len(self.m_running) > 0:
+            enclosing: str = self.m_running[-1][0]
+            self.m_seconds[enclosing] = self.m_seconds.get(enclosing, 0) - seconds
+        if tracemalloc.is_tracing():
+            self.m_peakMB[phase] = max(self.m_peakMB.get(phase, 0), (tracedPeak - tracedStart) / (1 << 20))
+
+
+
+    def clear(self, phase: str):
+        """
+        Forgets the time and memory recorded for a phase, so it can be measured again.
+        """
+        self.m_seconds.pop(phase, None)
+        self.m_peakMB.pop(phase, None)
+
+
+
+def runGroup(genName: str, solverNames: List[str], levelSpecs: List[List[int]], seed: int,
+             measureMemory: bool = True)->List[dict]:
+    """
+    Generates a maze and runs every solver on it, once timing the phases, then again with tracemalloc tracing to
+    measure their memory (tracing slows down Python too much to time the same pass).
+
+    @param measureMemory: Whether to do the tracemalloc pass.  Default is True.
+
+    @returns One result per solver, see runSuite().
+    """
+    (entrances, exits) = mazeSpec(levelSpecs)
+    results: List[dict] = list()
+
+    for traceMemory in ([False, True] if measureMemory else [False]):
+        if traceMemory:
+            tracemalloc.start()
+        timer: PhaseTimer = PhaseTimer()
+        random.seed(seed)
+        maze: Maze3D = Maze3D(levelSpecs)
+        for (level, row, col) in entrances:
+            maze.storeEntrance(Coordinates3D(level, row, col))
+        for (level, row, col) in exits:
+            maze.storeExit(Coordinates3D(level, row, col))
+
+        # initCells is called by the generators, time it on its own
+        initCells = maze.initCells
+
+        def timedInitCells(addWallFlag: bool = False):
+            timer.start('initCells')
+            initCells(addWallFlag)
+            timer.stop('initCells')
+
+        maze.initCells = timedInitCells
+
+        generator = registry.construct(GENERATOR, genName)
+        timer.start('generateMaze')
+        generator.generateMaze(maze)
+        timer.stop('generateMaze')
+        timer.start('carve')
+        maze.carveEntrances()
+        maze.carveExits()
+        timer.stop('carve')
+
+        for (i, solverName) in enumerate(solverNames):
+            if not traceMemory:
+                results.append({'generator': genName, 'solver': solverName, 'levelSpecs': levelSpecs,
+                                 'cells': sum([rowNum * colNum for (rowNum, colNum) in levelSpecs]), 'seed': seed,
+                                 'generated': generator.isMazeGenerated()})
+            result: dict = results[i]
+            if not generator.isMazeGenerated():
+                continue
+
+            solver = registry.construct(SOLVER, solverName)
+            random.seed(seed)
+            timer.start('solveMaze')
+            if solverName == 'taskC':
+                solver.solveMaze(maze)
+            else:
+                solver.solveMaze(maze, maze.getEntrances()[0])
+            timer.stop('solveMaze')
+
+            if traceMemory:
+                result['peakMemoryMB'] = {phase: timer.m_peakMB[phase] for phase in PHASES if phase in timer.m_peakMB}
+            else:
+                result['phases'] = {phase: timer.m_seconds[phase] for phase in PHASES if phase in timer.m_seconds}
+                result['solved'] = solver.isSolved()
+                result['cellsExplored'] = solver.getCellsExplored()
+                result['peakRssMB'] = peakRssMB()
+            solver.getSolverPath().close()
+            # every solver has its own solve phase
+            timer.clear('solveMaze')
+
+        if traceMemory:
+            tracemalloc.stop()
+
+    return results
+
+
+
+def runSuite(sizeNames: List[str], seeds: List[int], generators: List[str], solvers: List[str],
+             measureMemory: bool = True)->dict:
+    """
+    Runs every generator with every solver, on every size and seed.  Each (generator, size, seed) is run in its own
+    process, so the runs don't affect each other's memory.
+
+    @returns Results: 'suite', describing the machine and what was run, and 'runs', one dictionary per run with the
+        generator, solver, levelSpecs, number of cells, seed, whether a maze was generated, the seconds each phase took
+        ('phases', see PHASES), the peak memory each phase allocated ('peakMemoryMB', from tracemalloc, if
+        measureMemory), the peak resident set size of the process so far ('peakRssMB'), whether the maze was solved
+        and the cells explored.
+    """
+    runs: List[dict] = list()
+    for sizeName in sizeNames:
+        for genName in generators:
+            for seed in seeds:
+                job: str = json.dumps({'generator': genName, 'solvers': solvers, 'levelSpecs': SIZES[sizeName],
+                                       'seed': seed, 'measureMemory': measureMemory})
+                print('{} generator on {} maze, seed {}...'.format(genName, sizeName, seed), flush=True)
+                child = subprocess.run([sys.executable, os.path.abspath(__file__), 'group', job], cwd=TESTER_DIR,
+                                       capture_output=True, text=True)
+                if child.returncode != 0:
+                    print('  failed:\n' + child.stderr)
+                    continue
+                for run in json.loads(child.stdout.splitlines()[-1]):
+                    run['size'] = sizeName
+                    runs.append(run)
+
+    return {'suite': {'python': platform.python_version(), 'platform': platform.platform(),
+                      'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'sizes': sizeNames, 'seeds': seeds,
+                      'measureMemory': measureMemory},
+            'runs': runs}
+
+
+
+def compareResults(oldResults: dict, newResults: dict, threshold: float)->List[str]:
+    """
+    Compares the runs two results files have in common.
+
+    @param threshold: Relative increase of time or memory that counts as a regression, e.g., 0.2 for 20%.
+
+    @returns Regressions found: phases slower or using more memory by more than threshold, and runs that explore a
+        different number of cells or no longer solve the maze (the seeds are fixed, so the runs should be the same).
+    """
+    def runKey(run: dict)->tuple:
+        return (run['generator'], run['solver'], run.get('size'), json.dumps(run['levelSpecs']), run['seed'])
+
+    oldRuns: Dict[tuple, dict] = {runKey(run): run for run in oldResults['runs']}
+    regressions: List[str] = list()
+    for newRun in newResults['runs']:
+        oldRun: dict = oldRuns.get(runKey(newRun))
+        if oldRun == None or not newRun['generated']:
+            continue
+        name: str = '{} + {} on {} ({} cells), seed {}'.format(newRun['generator'], newRun['solver'], newRun.get('size'),
+                                                               newRun['cells'], newRun['seed'])
+
+        for phase in PHASES:
+            (old, new) = (oldRun.get('phases', dict()).get(phase), newRun.get('phases', dict()).get(phase))
+            if old != None and new != None and max(old, new) >= MIN_COMPARE_SECONDS and new > old * (1 + threshold):
+                regressions.append('{}: {} took {:.4f} s, was {:.4f} s ({:+.0%})'.format(name, phase, new, old, new / old - 1))
+            (old, new) = (oldRun.get('peakMemoryMB', dict()).get(phase), newRun.get('peakMemoryMB', dict()).get(phase))
+            if old != None and new != None and max(old, new) >= MIN_COMPARE_MB and new > old * (1 + threshold):
+                regressions.append('{}: {} peaked at {:.1f} MB, was {:.1f} MB'.format(name, phase, new, old))
+
+        if oldRun.get('cellsExplored') != newRun.get('cellsExplored'):
+            regressions.append('{}: explored {} cells, was {}'.format(name, newRun.get('cellsExplored'), oldRun.get('cellsExplored')))
+        if oldRun.get('solved') and not newRun.get('solved'):
+            regressions.append('{}: no longer solves the maze'.format(name))
+
+    return regressions
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the generators and solvers over maze sizes.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    runParser = commands.add_parser('run', help='run the suite')
+    runParser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                           help='comma separated sizes, of {} (default {})'.format(', '.join(SIZES), ','.join(DEFAULT_SIZES)))
+    runParser.add_argument('--seeds', default='1', help='comma separated random seeds (default 1)')
+    runParser.add_argument('--generators', default=None, help='comma separated generators (default all registered)')
+    runParser.add_argument('--solvers', default=None, help='comma separated solvers (default all registered)')
+    runParser.add_argument('--no-memory', dest='measureMemory', action='store_false',
+                           help="don't trace memory with tracemalloc, which takes about as long as the timed runs")
+    runParser.add_argument('--output', default=os.path.join(TESTER_DIR, 'benchmarks', 'results.json'),
+                           help='results file to write (default benchmarks/results.json)')
+    compareParser = commands.add_parser('compare', help='compare two results files')
+    compareParser.add_argument('old')
+    compareParser.add_argument('new')
+    compareParser.add_argument('--threshold', type=float, default=0.2,
+                               help='relative slow down or memory increase that is a regression (default 0.2)')
+    groupParser = commands.add_parser('group', help=argparse.SUPPRESS)
+    groupParser.add_argument('job')
+    args = parser.parse_args()
+
+    if args.command == 'group':
+        job: dict = json.loads(args.job)
+        print(json.dumps(runGroup(job['generator'], job['solvers'], job['levelSpecs'], job['seed'], job['measureMemory'])))
+
+    elif args.command == 'run':
+        generators: List[str] = registry.names(GENERATOR) if args.generators == None else args.generators.split(',')
+        solvers: List[str] = registry.names(SOLVER) if args.solvers == None else args.solvers.split(',')
+        results: dict = runSuite(args.sizes.split(','), [int(seed) for seed in args.seeds.split(',')], generators, solvers,
+                                 args.measureMemory)
+        with open(args.output, 'w') as resultsFile:
+            json.dump(results, resultsFile, indent=1)
+        print('Wrote {} runs to {}.'.format(len(results['runs']), args.output))
+
+    else:
+        with open(args.old, 'r') as oldFile:
+            oldResults: dict = json.load(oldFile)
+        with open(args.new, 'r') as newFile:
+            newResults: dict = json.load(newFile)
+        regressions: List[str] = compareResults(oldResults, newResults, args.threshold)
+        for regression in regressions:
+            print('REGRESSION: ' + regression)
+        if len(regressions) > 0:
+            sys.exit(1)
+        print('No regressions.')
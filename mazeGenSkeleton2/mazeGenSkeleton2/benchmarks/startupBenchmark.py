@@ -0,0 +1,107 @@
+# -------------------------------------------------------------------
+# Start up time benchmark of mazeTester2.py.
+# Run from the directory of mazeTester2.py:
+#   python3 benchmarks/startupBenchmark.py [number of runs]
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from statistics import median
+from typing import List
+
+
+# directory of mazeTester2.py, which the runs are started in
+TESTER_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that a run without visualisation shouldn't import
+HEAVY_MODULES: List[str] = ['matplotlib', 'numpy', 'multiprocessing', 'maze.maze_viz', 'maze.rasterRenderer',
+                            'maze.svgRenderer', 'maze.tileRenderer', 'maze.replayExporter']
+# generator and solver modules, of which a run should only import the ones it selects
+ALGORITHM_PACKAGES: List[str] = ['generation.', 'solving.']
+
+# small run, as done many times over by batch runners
+SMALL_CONFIG: dict = {'levelSpecs': [[5, 5]], 'entrances': [[0, 0, -1]], 'exits': [[0, 4, 5]], 'generator': 'recur',
+                      'solver': 'wall', 'solverEntranceIndex': 0, 'visualise': False, 'randSeed': 1}
+
+# checks what is imported after constructing one generator and solver
+IMPORT_CHECK: str = '''
+import sys
+import mazeTester2
+from generatorSelector import GeneratorSelector
+from solverSelector import SolverSelector
+GeneratorSelector().construct('recur')
+SolverSelector().construct('wall')
+print('\\n'.join(sorted(sys.modules)))
+'''
+
+
+
+def timeRuns(args: List[str], runNum: int)->float:
+    """
+    @returns Median wall clock time of running args in a new process, runNum times, in seconds.
+    """
+    times: List[float] = list()
+    for _ in range(runNum):
+        startTime = time.perf_counter()
+        subprocess.run(args, cwd=TESTER_DIR, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - startTime)
+    return median(times)
+
+
+
+def importedModules()->List[str]:
+    """
+    @returns Names of the modules imported by mazeTester2 and constructing the recur generator and wall solver.
+    """
+    result = subprocess.run([sys.executable, '-c', IMPORT_CHECK], cwd=TESTER_DIR, check=True, capture_output=True,
+                            text=True)
+    return result.stdout.split()
+
+
+
+def checkImports(modules: List[str])->List[str]:
+    """
+    @returns Problems with the imported modules: heavy modules, and generators and solvers that weren't selected.
+    """
+    expected: List[str] = ['generation.mazeGenerator', 'generation.recurBackGenerator', 'solving.mazeSolver',
+                           'solving.wallFollowingSolver', 'solving.solverPathRecorder', 'solving.directionTables']
+    problems: List[str] = list()
+    for module in modules:
+        if module in HEAVY_MODULES:
+            problems.append('{} imported at start up'.format(module))
+        elif any([module.startswith(package) for package in ALGORITHM_PACKAGES]) and module not in expected:
+            problems.append('{} imported, but not selected'.format(module))
+    return problems
+
+
+
+if __name__ == '__main__':
+    runNum: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as configFile:
+        json.dump(SMALL_CONFIG, configFile)
+    try:
+        baseline: float = timeRuns([sys.executable, '-c', 'pass'], runNum)
+        importTime: float = timeRuns([sys.executable, '-c', 'import mazeTester2'], runNum)
+        runTime: float = timeRuns([sys.executable, 'mazeTester2.py', configFile.name], runNum)
+    finally:
+        os.remove(configFile.name)
+
+    print('Median of {} runs:'.format(runNum))
+    print('  python start up:          {:.1f} ms'.format(baseline * 1000))
+    print('  import mazeTester2:       {:.1f} ms ({:.1f} ms over python)'.format(importTime * 1000, (importTime - baseline) * 1000))
+    print('  5x5 maze, no visualising: {:.1f} ms ({:.1f} ms over python)'.format(runTime * 1000, (runTime - baseline) * 1000))
+
+    problems: List[str] = checkImports(importedModules())
+    for problem in problems:
+        print('FAIL: ' + problem)
+    if len(problems) > 0:
+        sys.exit(1)
+    print('Only the selected generator and solver were imported.')
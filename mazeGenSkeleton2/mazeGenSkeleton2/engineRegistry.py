@@ -0,0 +1,281 @@
+# -------------------------------------------------------------------
+# Registry of maze generators and solvers ("engines") and their metadata.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import json
+import os
+import sys
+from importlib import import_module
+from typing import Dict, List
+
+
+# kinds of engines
+GENERATOR: str = 'generator'
+SOLVER: str = 'solver'
+
+# maze representations an engine can run on: Maze3D with its adjacency list graph, or the compact view of just the
+# passage masks (maze.sharedMaze.MaskMaze3D, as used by solving.batchSolver)
+BACKEND_ADJ_LIST: str = 'adjList'
+BACKEND_MASK: str = 'mask'
+
+# memory an engine uses beyond the maze and the solver path: constant, or growing with the number of cells
+MEMORY_CONSTANT: str = 'O(1)'
+MEMORY_CELLS: str = 'O(cells)'
+
+# entry point group external packages register engines with.  Each entry point is a function taking the registry, e.g.,
+#   [project.entry-points."mazeGenerators.engines"]
+#   fastSolvers = "fastmaze.plugin:registerEngines"
+# where registerEngines(registry) calls registry.register(SOLVER, 'astar', 'fastmaze.astar:FastAStarSolver', ...).
+ENTRY_POINT_GROUP: str = 'mazeGenerators.engines'
+
+
+
+class EngineInfo:
+    """
+    A registered engine: its name and metadata, and where its implementation is.  The implementation is only imported
+    the first time an engine is constructed.
+    """
+
+    def __init__(self, kind: str, name: str, target, deterministic: bool, memoryClass: str, graphBackends: List[str],
+                 priority: int, description: str):
+        """
+        Constructor, see EngineRegistry.register().
+        """
+        self.m_kind = kind
+        self.m_name = name
+        self.m_target = target
+        self.m_deterministic = deterministic
+        self.m_memoryClass = memoryClass
+        self.m_graphBackends = graphBackends
+        self.m_priority = priority
+        self.m_description = description
+        # class (or factory) of the engine, once imported
+        self.m_class = None if isinstance(target, str) else target
+
+
+
+    def engineClass(self):
+        """
+        @returns Class (or factory) of the engine, importing it if this is the first use.
+        """
+        if self.m_class == None:
+            (moduleName, className) = self.m_target.split(':')
+            self.m_class = getattr(import_module(moduleName), className)
+        return self.m_class
+
+
+
+    def construct(self):
+        """
+        @returns New instance of the engine.
+        """
+        return self.engineClass()()
+
+
+
+    def isLoaded(self)->bool:
+        """
+        @returns True if the implementation has been imported.
+        """
+        return self.m_class != None
+
+
+
+class EngineRegistry:
+    """
+    Registry of the generators and solvers, by name.  Each engine declares whether it is deterministic (same maze
+    gives the same result), its memory class and the maze representations (graph backends) it runs on, and names its
+    implementation as a "module:Class" string, so nothing is imported until an engine is used.
+
+    Engines of external packages are registered through the ENTRY_POINT_GROUP entry points, loaded the first time the
+    registry is queried, or by calling register() directly.  Registering a name that is already taken replaces the
+    engine, unless the existing one has a higher priority; so a package can provide a faster implementation of a
+    built-in engine under the same name.
+    """
+
+    def __init__(self):
+        self.m_engines: Dict[str, Dict[str, EngineInfo]] = {GENERATOR: dict(), SOLVER: dict()}
+        self.m_pluginsLoaded: bool = False
+
+
+
+    def register(self, kind: str, name: str, target, deterministic: bool = False, memoryClass: str = MEMORY_CELLS,
+                 graphBackends: List[str] = None, priority: int = 0, description: str = '')->bool:
+        """
+        Registers an engine.
+
+        @param kind: GENERATOR or SOLVER.
+        @param name: Name the engine is selected by, e.g., in configuration files.
+        @param target: Implementation, either a "module:Class" string, imported on first use, or a class or factory
+            function taking no arguments.
+        @param deterministic: Whether the engine always gives the same result for the same maze (and entrance).
+        @param memoryClass: Memory the engine uses beyond the maze and solver path, e.g., MEMORY_CONSTANT.
+        @param graphBackends: Maze representations the engine runs on.  Default is None, which is [BACKEND_ADJ_LIST].
+        @param priority: Priority over other engines of the same name.  Default is 0, as for the built-in engines.
+        @param description: Short description of the engine.
+
+        @returns True if the engine was registered, False if an engine of the same name and higher priority was.
+        """
+        assert(kind in self.m_engines)
+        existing: EngineInfo = self.m_engines[kind].get(name)
+        if existing != None and existing.m_priority > priority:
+            return False
+
+        self.m_engines[kind][name] = EngineInfo(kind, name, target, deterministic, memoryClass,
+                                                [BACKEND_ADJ_LIST] if graphBackends == None else graphBackends,
+                                                priority, description)
+        return True
+
+
+
+    def info(self, kind: str, name: str)->EngineInfo:
+        """
+        @returns The engine registered as name, or None if there is none.
+        """
+        self.loadPlugins()
+        return self.m_engines[kind].get(name)
+
+
+
+    def names(self, kind: str)->List[str]:
+        """
+        @returns Names of the engines of a kind, in order of registration.
+        """
+        self.loadPlugins()
+        return list(self.m_engines[kind].keys())
+
+
+
+    def construct(self, kind: str, name: str):
+        """
+        @returns New instance of the engine registered as name, or None if there is none.
+        """
+        engine: EngineInfo = self.info(kind, name)
+        if engine == None:
+            return None
+        return engine.construct()
+
+
+
+    def loadPlugins(self):
+        """
+        Lets the packages with ENTRY_POINT_GROUP entry points register their engines, the first time it is called.
+        A plugin that fails to load is reported and skipped.
+        """
+        if self.m_pluginsLoaded:
+            return
+        self.m_pluginsLoaded = True
+        if not hasPluginEntryPoints():
+            return
+
+        # importing importlib.metadata takes longer than a small run, so only done when there are plugins
+        from importlib.metadata import entry_points
+        for entryPoint in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                entryPoint.load()(self)
+            except Exception as e:
+                print('Engine plugin {} could not be loaded: {}'.format(entryPoint.name, e))
+
+
+
+    def describe(self, benchmarkFile: str = None)->List[str]:
+        """
+        Describes the registered engines, with the benchmark numbers recorded for them.
+
+        @param benchmarkFile: Results file of the benchmark suite (benchmarks/benchmarkSuite.py) to take the numbers
+            from, or None for none.  For each engine, the median time over the runs on the largest maze it was run on
+            is given.
+
+        @returns Lines of the description.
+        """
+        from statistics import median
+
+        runs: List[dict] = list()
+        if benchmarkFile != None:
+            try:
+                with open(benchmarkFile, 'r') as resultsFile:
+                    runs = json.load(resultsFile)['runs']
+            except (OSError, ValueError, KeyError) as e:
+                print('Benchmark results {} could not be read: {}'.format(benchmarkFile, e))
+
+        lines: List[str] = list()
+        for (kind, phase) in [(GENERATOR, 'generateMaze'), (SOLVER, 'solveMaze')]:
+            lines.append('{}s:'.format(kind.capitalize()))
+            for name in self.names(kind):
+                engine: EngineInfo = self.m_engines[kind][name]
+                benchmark: str = 'no benchmark'
+                engineRuns = [run for run in runs if run.get(kind) == name and phase in run.get('phases', dict())]
+                if len(engineRuns) > 0:
+                    cells: int = max([run['cells'] for run in engineRuns])
+                    seconds: float = median([run['phases'][phase] for run in engineRuns if run['cells'] == cells])
+                    benchmark = '{:.4f} s for {:,} cells'.format(seconds, cells)
+                lines.append('  {:10} {:13} {:9} {:13} {:32} {}'.format(
+                    name, 'deterministic' if engine.m_deterministic else 'random', engine.m_memoryClass,
+                    ','.join(engine.m_graphBackends), benchmark, engine.m_description).rstrip())
+
+        return lines
+
+
+
+def hasPluginEntryPoints()->bool:
+    """
+    Quick check for installed packages with ENTRY_POINT_GROUP entry points, by looking for the group in the
+    entry_points.txt metadata files on sys.path.
+
+    @returns True if there may be plugins to load.
+    """
+    header: str = '[{}]'.format(ENTRY_POINT_GROUP)
+    for path in sys.path:
+        try:
+            entries = list(os.scandir(path if path != '' else '.'))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.endswith(('.dist-info', '.egg-info')):
+                try:
+                    with open(os.path.join(entry.path, 'entry_points.txt'), 'r') as entryPointsFile:
+                        if header in entryPointsFile.read():
+                            return True
+                except OSError:
+                    pass
+    return False
+
+
+
+def registerBuiltins(engineRegistry: EngineRegistry):
+    """
+    Registers the generators and solvers of this package.
+    """
+    engineRegistry.register(GENERATOR, 'recur', 'generation.recurBackGenerator:RecurBackMazeGenerator',
+                            description='Recursive backtracking')
+    engineRegistry.register(GENERATOR, 'prim', 'generation.primGenerator:PrimMazeGenerator', description="Prim's")
+    engineRegistry.register(GENERATOR, 'wilson', 'generation.wilsonGenerator:WilsonMazeGenerator',
+                            description="Wilson's")
+    engineRegistry.register(GENERATOR, 'taskD', 'generation.taskDMazeGenerator:TaskDMazeGenerator',
+                            description='Task D')
+
+    # solvers that only look at the open neighbours of cells run as well on the compact view; the depth first ones
+    # work on it too, but see neighbours in another order (see solving.batchSolver)
+    engineRegistry.register(SOLVER, 'recur', 'solving.recurBackMazeSolver:RecurBackMazeSolver', deterministic=False,
+                            graphBackends=[BACKEND_ADJ_LIST, BACKEND_MASK], description='Recursive backtracking')
+    engineRegistry.register(SOLVER, 'wall', 'solving.wallFollowingSolver:WallFollowingMazeSolver', deterministic=True,
+                            memoryClass=MEMORY_CONSTANT, graphBackends=[BACKEND_ADJ_LIST, BACKEND_MASK],
+                            description='Wall following')
+    engineRegistry.register(SOLVER, 'pledge', 'solving.pledgeSolver:PledgeMazeSolver', deterministic=True,
+                            memoryClass=MEMORY_CONSTANT, graphBackends=[BACKEND_ADJ_LIST, BACKEND_MASK],
+                            description='Pledge')
+    engineRegistry.register(SOLVER, 'taskC', 'solving.taskCMazeSolver:TaskCMazeSolver', deterministic=True,
+                            graphBackends=[BACKEND_ADJ_LIST, BACKEND_MASK], description='Task C, picks the entrance')
+    engineRegistry.register(SOLVER, 'astar', 'solving.aStarSolver:AStarMazeSolver', deterministic=True,
+                            graphBackends=[BACKEND_ADJ_LIST, BACKEND_MASK], description='A*')
+    engineRegistry.register(SOLVER, 'deadend', 'solving.deadEndSolver:DeadEndFillingSolver', deterministic=True,
+                            graphBackends=[BACKEND_ADJ_LIST, BACKEND_MASK], description='Dead end filling')
+
+
+
+# the registry used by the selectors
+registry: EngineRegistry = EngineRegistry()
+registerBuiltins(registry)
@@ -9,6 +9,7 @@
 import random
 from maze.maze3D import Maze3D
 from maze.util import Coordinates3D
+from maze.tracing import tracer, TRACE_DEBUG
 from generation.mazeGenerator import MazeGenerator
 
 
@@ -29,14 +30,14 @@ class PrimMazeGenerator(MazeGenerator):
         startRow = random.randint(0, maze.rowNum(startLevel) - 1)
         startCol = random.randint(0, maze.colNum(startLevel) - 1)
         startCell = Coordinates3D(startLevel, startRow, startCol)
-        print(f"Starting at cell: {startCell}")
+        tracer.log(TRACE_DEBUG, "Starting at cell: {}", startCell)
 
         # Set of visited cells
         visited = set([startCell])
 
         # List to hold walls that are potential passages
         walls = self.getNeighbourWalls(maze, startCell)
-        print(f"Initial walls: {walls}")
+        tracer.log(TRACE_DEBUG, "Initial walls: {}", walls)
 
         # Prim's algorithm to generate the maze
         while walls:
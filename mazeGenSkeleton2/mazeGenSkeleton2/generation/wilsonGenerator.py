@@ -8,6 +8,7 @@
 import random
 from maze.maze3D import Maze3D
 from maze.util import Coordinates3D
+from maze.tracing import tracer, TRACE_DEBUG
 from generation.mazeGenerator import MazeGenerator
 
 
@@ -51,7 +52,7 @@ class WilsonMazeGenerator(MazeGenerator):
                 # Filter valid neighbours
                 valid_neighbours = [n for n in neighbours if self.isValid(n, maze)]
                 if not valid_neighbours:
-                    print(f"No valid neighbors for {current_cell}. Breaking out of the loop.")
+                    tracer.log(TRACE_DEBUG, "No valid neighbors for {}. Breaking out of the loop.", current_cell)
                     break
                 next_cell = random.choice(valid_neighbours)
                 if next_cell in path:
@@ -8,16 +8,15 @@
 
 
 from generation.mazeGenerator import MazeGenerator
-from generation.recurBackGenerator import RecurBackMazeGenerator
-from generation.primGenerator import PrimMazeGenerator
-from generation.wilsonGenerator import WilsonMazeGenerator
-from generation.taskDMazeGenerator import TaskDMazeGenerator
 from solving.mazeSolver import MazeSolver
+from engineRegistry import registry, GENERATOR
 
 
 class GeneratorSelector:
     """
     Class used to select and construct appropriate maze generator.
+    Generators are looked up in the engine registry (see engineRegistry.py), which only imports a generator's module
+    when it is constructed, so short runs don't pay for the ones not used.
     """
 
 
@@ -30,15 +29,8 @@ class GeneratorSelector:
         
         @return: Instance of a maze generator.
         """
-        generator: MazeGenerator = None
-
-        if genApproach == 'recur':
-            generator = RecurBackMazeGenerator()
-        elif genApproach == 'prim':
-            generator = PrimMazeGenerator()
-        elif genApproach == 'wilson':
-            generator = WilsonMazeGenerator()
-        # TODO: If you implement other generators, you can add them here
+        # TODO: If you implement other generators, register them in engineRegistry.registerBuiltins()
+        generator: MazeGenerator = registry.construct(GENERATOR, genApproach)
 
         return generator
 
@@ -64,6 +56,6 @@ class GeneratorSelector:
         # TODO: Default option is to use Task D generator.  Note you do not have to use this, but this is provided in case
         # you wanted to build a custom generator, rather than select an existing one.
         # Remove / comment this out once if you not using this.
-        generator = TaskDMazeGenerator()
+        generator = registry.construct(GENERATOR, 'taskD')
 
         return generator
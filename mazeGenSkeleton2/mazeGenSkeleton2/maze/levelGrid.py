@@ -0,0 +1,126 @@
+# -------------------------------------------------------------------
+# Per-level wall and stair grids of a maze, as NumPy arrays, for renderers.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+try:
+    import numpy as np
+except:
+    np = None
+
+from math import ceil
+from typing import List, Tuple
+
+from maze.maze3D import Maze3D
+
+
+# passage mask bits of the directions renderers care about
+BIT_ROW_UP: int = 1 << Maze3D.DIRECTIONS.index((0, 1, 0))
+BIT_COL_UP: int = 1 << Maze3D.DIRECTIONS.index((0, 0, 1))
+BIT_ROW_DOWN: int = 1 << Maze3D.DIRECTIONS.index((0, -1, 0))
+BIT_COL_DOWN: int = 1 << Maze3D.DIRECTIONS.index((0, 0, -1))
+BIT_LEVEL_UP: int = 1 << Maze3D.DIRECTIONS.index((1, 0, 0))
+BIT_LEVEL_DOWN: int = 1 << Maze3D.DIRECTIONS.index((-1, 0, 0))
+
+
+
+def levelMasks(maze: Maze3D, level: int):
+    """
+    @param maze: Maze.
+    @param level: Level we want the masks of.
+
+    @returns (rowNum, colNum) uint8 array of the passage masks of the cells of the level (see Maze3D.openMasks()).  It
+        is a view of the maze's masks, not a copy.
+    """
+    masks = np.frombuffer(maze.openMasks(), dtype=np.uint8)[:maze.cellIdNum()]
+    rowStride: int = maze.directionOffsets()[Maze3D.DIRECTIONS.index((0, 1, 0))]
+    grid = masks.reshape(maze.levelNum(), -1, rowStride)[level]
+    return grid[1:maze.rowNum(level) + 1, 1:maze.colNum(level) + 1]
+
+
+
+def cellCoordinates(maze: Maze3D, cellIds):
+    """
+    Vectorised Maze3D.cellFromId().
+
+    @param maze: Maze.
+    @param cellIds: Array of flat cell ids.
+
+    @returns Tuple of arrays (levels, rows, cols) of the cells.
+    """
+    offsets: List[int] = maze.directionOffsets()
+    levelStride: int = offsets[Maze3D.DIRECTIONS.index((1, 0, 0))]
+    rowStride: int = offsets[Maze3D.DIRECTIONS.index((0, 1, 0))]
+    (levels, rest) = np.divmod(np.asarray(cellIds, dtype=np.int64), levelStride)
+    (rows, cols) = np.divmod(rest, rowStride)
+    return (levels, rows - 1, cols - 1)
+
+
+
+def levelWalls(maze: Maze3D, level: int):
+    """
+    Computes where the walls and stairs of a level are, vectorised over the whole level.
+
+    @param maze: Maze.
+    @param level: Level to compute for.
+
+    @returns Tuple of boolean arrays (horizontal, vertical, down, up), see gridWalls().
+    """
+    return gridWalls(levelMasks(maze, level))
+
+
+
+def gridWalls(grid):
+    """
+    Computes where the walls and stairs of a block of cells are, from their passage masks.  As the masks of
+    neighbouring cells agree, any (non empty) block of a level can be done on its own.
+
+    @param grid: (rowNum, colNum) uint8 array of the passage masks of the block, e.g., a slice of levelMasks().
+
+    @returns Tuple of boolean arrays (horizontal, vertical, down, up).  horizontal is (rowNum+1, colNum), where
+        horizontal[r, c] is True if there is a wall below cell (r, c), i.e., between rows r-1 and r (row rowNum is the
+        far boundary).  vertical is (rowNum, colNum+1), where vertical[r, c] is True if there is a wall between columns
+        c-1 and c.  down and up are (rowNum, colNum), True where a cell has a stair to the level below/above.
+    """
+    (rowNum, colNum) = grid.shape
+
+    horizontal = np.empty((rowNum + 1, colNum), dtype=bool)
+    horizontal[:rowNum] = (grid & BIT_ROW_DOWN) == 0
+    horizontal[rowNum] = (grid[rowNum - 1] & BIT_ROW_UP) == 0
+
+    vertical = np.empty((rowNum, colNum + 1), dtype=bool)
+    vertical[:, :colNum] = (grid & BIT_COL_DOWN) == 0
+    vertical[:, colNum] = (grid[:, colNum - 1] & BIT_COL_UP) == 0
+
+    return (horizontal, vertical, (grid & BIT_LEVEL_DOWN) != 0, (grid & BIT_LEVEL_UP) != 0)
+
+
+
+def levelLayout(maze: Maze3D, cellSize: float)->List[Tuple[float, float]]:
+    """
+    Layout of the levels when drawn side by side: two columns, the first ceil(levelNum/2) levels in the left one,
+    each level (rowNum+5) cells below the previous one.
+
+    @param maze: Maze.
+    @param cellSize: Size of a cell.
+
+    @returns The (x, y) shift of each level.
+    """
+    layout: List[Tuple[float, float]] = list()
+    firstColMazeNum: int = ceil(maze.levelNum() / 2)
+
+    shiftX: float = 0
+    shiftY: float = 0
+    for level in range(0, firstColMazeNum):
+        layout.append((0, shiftY))
+        shiftY += (maze.rowNum(level) + 5) * cellSize
+        shiftX = max(shiftX, (maze.rowNum(level) + 5) * cellSize)
+
+    shiftY = 0
+    for level in range(firstColMazeNum, maze.levelNum()):
+        layout.append((shiftX, shiftY))
+        shiftY += (maze.rowNum(level) + 5) * cellSize
+
+    return layout
@@ -30,6 +30,26 @@ class Maze3D:
         COL_NUM = 1
 
 
+    # (level, row, col) offsets of the six directions a cell can have a passage in.  The index of a direction in this
+    # list is also the bit used for it in the open passage masks (see openMasks()).
+    DIRECTIONS: List[Tuple[int, int, int]] = [(0, 1, 0), (0, 0, 1), (0, -1, 0), (0, 0, -1), (1, 0, 0), (-1, 0, 0)]
+    # index of the opposite direction of each direction
+    OPPOSITE: List[int] = [2, 3, 0, 1, 5, 4]
+    # whether moving in each direction increases the cell id
+    IS_POSITIVE: List[bool] = [sum(delta) > 0 for delta in DIRECTIONS]
+
+    # flags used in the per-cell entrance/exit index (see isEntrance() and isExit())
+    ENTRANCE_FLAG: int = 1
+    EXIT_FLAG: int = 2
+
+    # Zobrist keys are indexed by cellId * ZOBRIST_SLOTS + slot, where the slot is the direction of a passage (only
+    # the ones with a positive id offset, so each passage has one key), or one of the entrance/exit slots.
+    ZOBRIST_SLOTS: int = 8
+    ZOBRIST_ENTRANCE: int = 6
+    ZOBRIST_EXIT: int = 7
+    ZOBRIST_MASK: int = (1 << 64) - 1
+
+
 
     def __init__(self, levelDims: List[Tuple[int, int]]):
         """
@@ -51,6 +71,27 @@ class Maze3D:
         # self.m_graph: We use an adjacency list representation to store our neighbourhoods and wall information.
         self.m_graph : Graph = AdjListGraph()
 
+        # Compact view of the maze, used by solvers that want to avoid the overhead of Coordinates3D.
+        # Every cell (including the boundary ones) has a flat integer id, laid out as a padded grid of
+        # (maxRowNum+2) x (maxColNum+2) cells per level, so moving in any of the six directions is a fixed integer offset.
+        self.m_rowStride: int = max([colNum for (_, colNum) in levelDims], default=0) + 2
+        self.m_levelStride: int = (max([rowNum for (rowNum, _) in levelDims], default=0) + 2) * self.m_rowStride
+        self.m_cellIdNum: int = len(levelDims) * self.m_levelStride
+        # self.m_openMask: for each cell id, bit d is set if there is a passage (edge without a wall) in direction
+        # DIRECTIONS[d].  Kept up to date by initCells(), addWall() and removeWall().
+        self.m_openMask: bytearray = bytearray(self.m_cellIdNum)
+
+        # Indexes of the entrances and exits, so checking whether a cell is one is O(1) rather than a scan of the lists.
+        # self.m_entranceIds/self.m_exitIds: hashed sets of cell ids.
+        self.m_entranceIds: set[int] = set()
+        self.m_exitIds: set[int] = set()
+        # self.m_cellFlags: ENTRANCE_FLAG/EXIT_FLAG bits for each cell id.
+        self.m_cellFlags: bytearray = bytearray(self.m_cellIdNum)
+
+        # self.m_zobrist: 64-bit Zobrist hash of the maze, the xor of the keys of the level specifications, of every
+        # passage and of every entrance and exit.  Updated in O(1) as walls, entrances and exits change.
+        self.m_zobrist: int = self.recomputeFingerprint()
+
 
 
     def initCells(self, addWallFlag:bool = False):
@@ -107,6 +148,12 @@ class Maze3D:
                     # then in both cases, whether there is an existing cell or just added a vertex for upper boundary,
                     # add the edge
                     self.m_graph.addEdge(Coordinates3D(level+1,rowU,colU), Coordinates3D(level,rowU,colU), addWallFlag)
+
+        # bring the compact passage masks in line with the graph
+        self.m_openMask = bytearray(self.m_cellIdNum)
+        if not addWallFlag:
+            self.rebuildOpenMasks()
+        self.m_zobrist = self.recomputeFingerprint()
                         
                         
 
@@ -121,7 +168,8 @@ class Maze3D:
         # checks if Coordinates3D are valid
         assert(self.checkCoordinates(cell1) and self.checkCoordinates(cell2))
         
-        self.m_graph.updateWall(cell1, cell2, True)
+        if self.m_graph.updateWall(cell1, cell2, True):
+            self.updateOpenMask(cell1, cell2, False)
 
 
 
@@ -137,7 +185,56 @@ class Maze3D:
         # checks if Coordinates3D are valid
         assert(self.checkCoordinates(cell1) and self.checkCoordinates(cell2))
 
-        self.m_graph.updateWall(cell1, cell2, False)
+        if self.m_graph.updateWall(cell1, cell2, False):
+            self.updateOpenMask(cell1, cell2, True)
+
+
+
+    def updateOpenMask(self, cell1:Coordinates3D, cell2:Coordinates3D, isOpen:bool):
+        """
+        Updates the compact passage masks of both sides of the wall between cell1 and cell2.
+
+        @param cell1: Coordinates of cell1.
+        @param cell2: Coordinates of cell2.
+        @param isOpen: True if there is now a passage between them, False if there is a wall.
+        """
+        direction: int = self.direction(cell1, cell2)
+        if direction < 0:
+            return
+
+        id1: int = self.cellId(cell1)
+        id2: int = self.cellId(cell2)
+        if (self.m_openMask[id1] & (1 << direction) != 0) == isOpen:
+            # no change
+            return
+
+        # the passage's key is that of the side it is in a positive direction from
+        if self.IS_POSITIVE[direction]:
+            self.m_zobrist ^= self.zobristKey(id1 * self.ZOBRIST_SLOTS + direction)
+        else:
+            self.m_zobrist ^= self.zobristKey(id2 * self.ZOBRIST_SLOTS + self.OPPOSITE[direction])
+        if isOpen:
+            self.m_openMask[id1] |= 1 << direction
+            self.m_openMask[id2] |= 1 << self.OPPOSITE[direction]
+        else:
+            self.m_openMask[id1] &= ~(1 << direction)
+            self.m_openMask[id2] &= ~(1 << self.OPPOSITE[direction])
+
+
+
+    def rebuildOpenMasks(self):
+        """
+        Recomputes the compact passage masks of all cells from the graph.
+        """
+        self.m_openMask = bytearray(self.m_cellIdNum)
+        for cell in self.allCells():
+            cellId: int = self.cellId(cell)
+            for neigh in self.neighbours(cell):
+                if not self.hasWall(cell, neigh):
+                    direction: int = self.direction(cell, neigh)
+                    if direction >= 0:
+                        self.m_openMask[cellId] |= 1 << direction
+        self.m_zobrist = self.recomputeFingerprint()
 
 
 
@@ -174,7 +271,7 @@ class Maze3D:
         Adds an entrance to the maze.  A maze can have more than one entrance, so this method can be called more than once.
         This does not remove the wall between entrance and maze.
 
-        @returns: True if successfully added an entrance, otherwise False.
+        @returns: True if successfully added an entrance, otherwise False (not on the boundary, or already an entrance).
         """
 
         # check if cell of entrance is valid
@@ -182,7 +279,15 @@ class Maze3D:
 
         # check if cell of the entrance is on the boundary of the maze, as an entrance should only be added along the boundary
         if self.isBoundary(cell):
+            cellId: int = self.cellId(cell)
+            # already stored
+            if cellId in self.m_entranceIds:
+                return False
+
             self.m_entrance.append(cell)
+            self.m_entranceIds.add(cellId)
+            self.m_cellFlags[cellId] |= self.ENTRANCE_FLAG
+            self.m_zobrist ^= self.zobristKey(cellId * self.ZOBRIST_SLOTS + self.ZOBRIST_ENTRANCE)
 
             return True
         else:
@@ -196,7 +301,7 @@ class Maze3D:
         Adds an exit to the maze.  A maze can have more than one exit, so this method can be called more than once.
         This does not remove the wall between maze and exit.
 
-        @returns True if successfully added an exit, otherwise False.
+        @returns True if successfully added an exit, otherwise False (not on the boundary, or already an exit).
         """
 
         # check if cell of exit is valid
@@ -204,7 +309,15 @@ class Maze3D:
 
         # check if cell of exit is on the boundary of the maze, as an exit should only be added along the boundary
         if self.isBoundary(cell):
+            cellId: int = self.cellId(cell)
+            # already stored
+            if cellId in self.m_exitIds:
+                return False
+
             self.m_exit.append(cell)
+            self.m_exitIds.add(cellId)
+            self.m_cellFlags[cellId] |= self.EXIT_FLAG
+            self.m_zobrist ^= self.zobristKey(cellId * self.ZOBRIST_SLOTS + self.ZOBRIST_EXIT)
 
             return True
         else:
@@ -271,7 +384,7 @@ class Maze3D:
 
     def getEntrances(self)->List[Coordinates3D]:
         """
-        @returns: List of entrances that the maze has.
+        @returns: List of entrances that the maze has, in the order they were stored.
         """
         return self.m_entrance
     
@@ -279,12 +392,52 @@ class Maze3D:
 
     def getExits(self)->List[Coordinates3D]:
         """
-        @returns: List of exits that the maze has.
+        @returns: List of exits that the maze has, in the order they were stored.
         """
         return self.m_exit
 
 
 
+    def isEntrance(self, cell:Coordinates3D)->bool:
+        """
+        @param cell: Cell to check.
+
+        @returns True if cell is one of the entrances of the maze.  O(1), unlike searching getEntrances().
+        """
+        return self.hasCellId(cell) and self.m_cellFlags[self.cellId(cell)] & self.ENTRANCE_FLAG != 0
+
+
+
+    def isExit(self, cell:Coordinates3D)->bool:
+        """
+        @param cell: Cell to check.
+
+        @returns True if cell is one of the exits of the maze.  O(1), unlike searching getExits().
+        """
+        return self.hasCellId(cell) and self.m_cellFlags[self.cellId(cell)] & self.EXIT_FLAG != 0
+
+
+
+    def isEntranceId(self, cellId:int)->bool:
+        """
+        @param cellId: Flat id of cell to check.
+
+        @returns True if the cell is one of the entrances of the maze.
+        """
+        return 0 <= cellId < self.m_cellIdNum and self.m_cellFlags[cellId] & self.ENTRANCE_FLAG != 0
+
+
+
+    def isExitId(self, cellId:int)->bool:
+        """
+        @param cellId: Flat id of cell to check.
+
+        @returns True if the cell is one of the exits of the maze.
+        """
+        return 0 <= cellId < self.m_cellIdNum and self.m_cellFlags[cellId] & self.EXIT_FLAG != 0
+
+
+
     def hasCell(self, cell:Coordinates3D)->bool:
         """
         Checks if cell exists in maze.
@@ -399,4 +552,138 @@ class Maze3D:
 
 
 
-    
\ No newline at end of file
+    def cellId(self, cell:Coordinates3D)->int:
+        """
+        @param cell: Cell (can be a boundary cell) we want the flat id of.
+
+        @returns The flat integer id of cell in the compact view of the maze.
+        """
+        return cell.getLevel() * self.m_levelStride + (cell.getRow() + 1) * self.m_rowStride + cell.getCol() + 1
+
+
+
+    def hasCellId(self, cell:Coordinates3D)->bool:
+        """
+        @param cell: Cell to check.
+
+        @returns True if cell lies within the compact view of the maze, i.e., cellId(cell) is a valid id of that cell.
+        """
+        return 0 <= cell.getLevel() < len(self.m_levelDims) and 0 <= cell.getRow() + 1 < self.m_levelStride // self.m_rowStride and\
+            0 <= cell.getCol() + 1 < self.m_rowStride
+
+
+
+    def cellFromId(self, cellId:int)->Coordinates3D:
+        """
+        @param cellId: Flat id of a cell.
+
+        @returns The coordinates of the cell with flat id cellId.
+        """
+        (level, rest) = divmod(cellId, self.m_levelStride)
+        (row, col) = divmod(rest, self.m_rowStride)
+        return Coordinates3D(level, row - 1, col - 1)
+
+
+
+    def cellIdNum(self)->int:
+        """
+        @returns The number of flat cell ids, i.e., the size of arrays indexed by cell id.
+        """
+        return self.m_cellIdNum
+
+
+
+    def directionOffsets(self)->List[int]:
+        """
+        @returns For each direction in DIRECTIONS, the offset to add to a cell id to move in that direction.
+        """
+        return [level * self.m_levelStride + row * self.m_rowStride + col for (level, row, col) in self.DIRECTIONS]
+
+
+
+    def passageOffsetTable(self)->List[List[int]]:
+        """
+        @returns For each of the 64 possible passage masks, the list of cell id offsets of the open directions.
+            Indexing this table with openMasks()[cellId] gives the moves available from a cell without any bit tests.
+        """
+        offsets: List[int] = self.directionOffsets()
+        return [[offsets[d] for d in range(len(self.DIRECTIONS)) if mask & (1 << d)] for mask in range(1 << len(self.DIRECTIONS))]
+
+
+
+    def direction(self, cell1:Coordinates3D, cell2:Coordinates3D)->int:
+        """
+        @param cell1: Cell we move from.
+        @param cell2: Cell we move to.
+
+        @returns The index (in DIRECTIONS) of the direction from cell1 to cell2, or -1 if they are not adjacent.
+        """
+        delta = (cell2.getLevel() - cell1.getLevel(), cell2.getRow() - cell1.getRow(), cell2.getCol() - cell1.getCol())
+        if delta in self.DIRECTIONS:
+            return self.DIRECTIONS.index(delta)
+        return -1
+
+
+
+    def openMasks(self)->bytearray:
+        """
+        @returns The compact passage masks, indexed by cell id.  Bit d of a mask is set if the cell has a passage in
+            direction DIRECTIONS[d].  Should be treated as read only; use addWall() and removeWall() to change walls.
+        """
+        return self.m_openMask
+
+
+
+    def fingerprint(self)->int:
+        """
+        @returns The 64-bit Zobrist hash of the maze, covering the level specifications, the walls (passages) and the
+            entrances and exits.  Mazes with the same fingerprint can be treated as the same maze, e.g., as part of a
+            cache key.  It is maintained incrementally, so this is O(1).
+        """
+        return self.m_zobrist
+
+
+
+    def recomputeFingerprint(self)->int:
+        """
+        Computes the Zobrist hash from scratch, in time linear in the size of the maze, e.g., to verify the one
+        maintained incrementally (fingerprint()).
+
+        @returns The 64-bit Zobrist hash of the maze.
+        """
+        zobrist: int = 0
+        for (level, (rowNum, colNum)) in enumerate(self.m_levelDims):
+            # negative indices, so the keys of level specifications never clash with those of cells
+            zobrist ^= self.zobristKey(-1 - ((level << 40) | (rowNum << 20) | colNum))
+
+        # directions with positive id offsets, each passage is counted once, from its lower id side
+        positiveBits = [(d, 1 << d) for d in range(len(self.DIRECTIONS)) if self.IS_POSITIVE[d]]
+        for (cellId, mask) in enumerate(self.m_openMask):
+            if mask:
+                for (d, bit) in positiveBits:
+                    if mask & bit:
+                        zobrist ^= self.zobristKey(cellId * self.ZOBRIST_SLOTS + d)
+
+        for cellId in self.m_entranceIds:
+            zobrist ^= self.zobristKey(cellId * self.ZOBRIST_SLOTS + self.ZOBRIST_ENTRANCE)
+        for cellId in self.m_exitIds:
+            zobrist ^= self.zobristKey(cellId * self.ZOBRIST_SLOTS + self.ZOBRIST_EXIT)
+
+        return zobrist
+
+
+
+    @staticmethod
+    def zobristKey(index: int)->int:
+        """
+        @param index: Index of the key.
+
+        @returns The 64-bit Zobrist key of index.  Keys are derived with the SplitMix64 finaliser rather than drawn
+            from a random table, so they take no memory, don't disturb the seeded random generator and are the same in
+            every process.
+        """
+        mask: int = Maze3D.ZOBRIST_MASK
+        z: int = (index * 0x9E3779B97F4A7C15 + 0x632BE59BD9B4E019) & mask
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & mask
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & mask
+        return z ^ (z >> 31)
@@ -33,14 +33,14 @@
 
 try:
     import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection, EllipseCollection
+    import numpy as np
 except:
     plt = None
     
 
-from math import ceil
-
 from maze.maze3D import Maze3D
-from maze.util import Coordinates3D
+from maze.levelGrid import levelWalls, levelLayout, cellCoordinates
 
 from solving.mazeSolver import MazeSolver
 
@@ -102,111 +102,47 @@ class Visualizer(object):
     def plot_walls(self):
         """ 
         Plots the walls of a maze. This is used when generating the maze image.
+        The levels are plotted in two columns (see levelLayout()).  The wall segments of all levels are gathered into
+        one array and drawn as a single LineCollection, and the stairs as one marker-only line per direction, rather than an
+        artist per wall, which is what makes large mazes slow to draw.
         """
-        
-        # plot levels
-        # plot them in two rows
-        firstColMazeNum = ceil(self.m_maze.levelNum() / 2)
-        # first column/left column 
-        shiftPixelX: int = 0
-        shiftPixelY: int = 0
-        for level in range(0, firstColMazeNum):
-            # plot each level/floor of maze
-            for r in range(0, self.m_maze.rowNum(level)):
-                for c in range(0, self.m_maze.colNum(level)):
-                    # top
-                    if self.m_maze.hasWall(Coordinates3D(level, r-1, c), Coordinates3D(level, r, c)):
-                        self.m_ax.plot([(c+1)*self.m_cellSize, (c+1+1)*self.m_cellSize],
-                                    [(r+1)*self.m_cellSize + shiftPixelY, (r+1)*self.m_cellSize + shiftPixelY], color="k")    
-                    # left
-                    if self.m_maze.hasWall(Coordinates3D(level, r, c-1), Coordinates3D(level, r, c)):
-                        self.m_ax.plot([(c+1)*self.m_cellSize, (c+1)*self.m_cellSize],
-                                    [(r+1)*self.m_cellSize + shiftPixelY, (r+1+1)*self.m_cellSize + shiftPixelY], color="k")  
-            
-                    # do up and down passages
-                    if level-1 >= 0:
-                        if not self.m_maze.hasWall(Coordinates3D(level, r, c), Coordinates3D(level-1, r, c)):
-                            self.m_ax.plot([(c+1.5)*self.m_cellSize], [(r+1.5)*self.m_cellSize + shiftPixelY], 'vb')
-                            
-
-                    if level+1 < self.m_maze.levelNum():
-                        if not self.m_maze.hasWall(Coordinates3D(level, r, c), Coordinates3D(level+1, r, c)):
-                            self.m_ax.plot([(c+1.5)*self.m_cellSize], [(r+1.5)*self.m_cellSize + shiftPixelY], '^r')
-                            
-
-
-            # do bottom boundary 
-            for c in range(0, self.m_maze.colNum(level)):
-                # top
-                if self.m_maze.hasWall(Coordinates3D(level, self.m_maze.rowNum(level)-1, c), Coordinates3D(level, self.m_maze.rowNum(level), c)):
-                    self.m_ax.plot([(c+1)*self.m_cellSize, (c+1+1)*self.m_cellSize],
-                                    [(self.m_maze.rowNum(level)+1)*self.m_cellSize + shiftPixelY, (self.m_maze.rowNum(level)+1)*self.m_cellSize + shiftPixelY], color="k")    
-
-            # do right boundary 
-            for r in range(0, self.m_maze.rowNum(level)):
-                # left
-                if self.m_maze.hasWall(Coordinates3D(level, r, self.m_maze.colNum(level)-1), Coordinates3D(level, r, self.m_maze.colNum(level))):
-                    self.m_ax.plot([(self.m_maze.colNum(level)+1)*self.m_cellSize, (self.m_maze.colNum(level)+1)*self.m_cellSize],
-                                    [(r+1)*self.m_cellSize + shiftPixelY, (r+1+1)*self.m_cellSize + shiftPixelY], color="k")  
-
+        cellSize = self.m_cellSize
+        self.m_levelAdjust = levelLayout(self.m_maze, cellSize)
+
+        segments = list()
+        downStairs = list()
+        upStairs = list()
+        for level in range(0, self.m_maze.levelNum()):
+            (shiftX, shiftY) = self.m_levelAdjust[level]
+            (horizontal, vertical, down, up) = levelWalls(self.m_maze, level)
+
+            # horizontal walls run from (c+1, r+1) to (c+2, r+1), vertical ones from (c+1, r+1) to (c+1, r+2)
+            (rows, cols) = np.nonzero(horizontal)
+            x = (cols + 1) * cellSize + shiftX
+            y = (rows + 1) * cellSize + shiftY
+            segments.append(np.stack([x, y, x + cellSize, y], axis=1))
+            (rows, cols) = np.nonzero(vertical)
+            x = (cols + 1) * cellSize + shiftX
+            y = (rows + 1) * cellSize + shiftY
+            segments.append(np.stack([x, y, x, y + cellSize], axis=1))
+
+            # stairs are marked in the middle of the cell
+            for (stairs, points) in [(down, downStairs), (up, upStairs)]:
+                (rows, cols) = np.nonzero(stairs)
+                points.append(np.stack([(cols + 1.5) * cellSize + shiftX, (rows + 1.5) * cellSize + shiftY], axis=1))
 
             # print out level label
-            self.m_ax.text(-0.5, shiftPixelY, "Level " + str(level), fontsize=10, weight="bold")
-
-            self.m_levelAdjust.append((0, shiftPixelY))
-
-            shiftPixelY += (self.m_maze.rowNum(level)+5) * self.m_cellSize
-            shiftPixelX = max(shiftPixelX, (self.m_maze.rowNum(level)+5) * self.m_cellSize)
-
-
-        # second column/right column
-        shiftPixelY = 0
-        for level in range(firstColMazeNum, self.m_maze.levelNum()):
-            # plot each level/floor of maze
-            for r in range(0, self.m_maze.rowNum(level)):
-                for c in range(0, self.m_maze.colNum(level)):
-                    # top
-                    if self.m_maze.hasWall(Coordinates3D(level, r-1, c), Coordinates3D(level, r, c)):
-                        self.m_ax.plot([(c+1)*self.m_cellSize + shiftPixelX, (c+1+1)*self.m_cellSize + shiftPixelX],
-                                    [(r+1)*self.m_cellSize + shiftPixelY, (r+1)*self.m_cellSize + shiftPixelY], color="k")    
-                    # left
-                    if self.m_maze.hasWall(Coordinates3D(level, r,c-1), Coordinates3D(level, r,c)):
-                        self.m_ax.plot([(c+1)*self.m_cellSize + shiftPixelX, (c+1)*self.m_cellSize + shiftPixelX],
-                                    [(r+1)*self.m_cellSize + shiftPixelY, (r+1+1)*self.m_cellSize + shiftPixelY], color="k")  
-                        
-                    # do up and down passages
-                    if level-1 >= 0:
-                        if not self.m_maze.hasWall(Coordinates3D(level, r, c), Coordinates3D(level-1, r, c)):
-                            self.m_ax.plot([(c+1.5)*self.m_cellSize + shiftPixelX], [(r+1.5)*self.m_cellSize + shiftPixelY], 'vb')
-                                    
-
-                    if level+1 < self.m_maze.levelNum():
-                        if not self.m_maze.hasWall(Coordinates3D(level, r, c), Coordinates3D(level+1, r, c)):
-                            self.m_ax.plot([(c+1.5)*self.m_cellSize + shiftPixelX], [(r+1.5)*self.m_cellSize + shiftPixelY], '^r')   
-                 
-                        
-            # do bottom boundary 
-            for c in range(0, self.m_maze.colNum(level)):
-                # top
-                if self.m_maze.hasWall(Coordinates3D(level, self.m_maze.rowNum(level)-1, c), Coordinates3D(level, self.m_maze.rowNum(level), c)):
-                    self.m_ax.plot([(c+1)*self.m_cellSize + shiftPixelX, (c+1+1)*self.m_cellSize + shiftPixelX],
-                                    [(self.m_maze.rowNum(level)+1)*self.m_cellSize + shiftPixelY, (self.m_maze.rowNum(level)+1)*self.m_cellSize + shiftPixelY], color="k")    
-
-            # do right boundary 
-            for r in range(0, self.m_maze.rowNum(level)):
-                # left
-                if self.m_maze.hasWall(Coordinates3D(level, r, self.m_maze.colNum(level)-1), Coordinates3D(level, r, self.m_maze.colNum(level))):
-                    self.m_ax.plot([(self.m_maze.colNum(level)+1)*self.m_cellSize + shiftPixelX, (self.m_maze.colNum(level)+1)*self.m_cellSize + shiftPixelX],
-                                    [(r+1)*self.m_cellSize + shiftPixelY, (r+1+1)*self.m_cellSize + shiftPixelY], color="k")  
-            
-     
-            # print out level label
-            self.m_ax.text(-0.5+shiftPixelX, shiftPixelY, "Level " + str(level), fontsize=10, weight="bold")
-            
-
-            self.m_levelAdjust.append((shiftPixelX, shiftPixelY))
+            self.m_ax.text(-0.5 + shiftX, shiftY, "Level " + str(level), fontsize=10, weight="bold")
 
-            shiftPixelY += (self.m_maze.rowNum(level)+5) * self.m_cellSize
+        # same styling as lines and markers drawn by plot()
+        self.m_ax.add_collection(LineCollection(np.concatenate(segments).reshape(-1, 2, 2), colors="k",
+                                                linewidths=plt.rcParams['lines.linewidth'], capstyle='projecting', snap=True))
+        for (points, style) in [(downStairs, 'vb'), (upStairs, '^r')]:
+            points = np.concatenate(points)
+            if len(points) > 0:
+                # a single marker-only line per direction, which rasterises the markers exactly as before
+                self.m_ax.plot(points[:, 0], points[:, 1], style, linestyle='None')
+        self.m_ax.autoscale_view()
 
 
 
@@ -252,38 +188,43 @@ class Visualizer(object):
 
     def plotSolverPath(self):
         """
-        Draw the path that the solver used to solve the maze.  They are displayed as a series of circles.
+        Draw the path that the solver used to solve the maze.  They are displayed as a series of circles, getting
+        greener along the path.  All circles are one EllipseCollection (sized in data units, like the circle patches it
+        replaces), with the colours computed for the whole path at once.
         """
 
-        # retrieved the stored solver path
-        solverPath: list[tuple[Coordinates3D, bool]] = self.m_solver.getSolverPath()
+        # retrieved the stored solver path.  It is streamed rather than loaded, as it may have been spilled to disk.
+        solverPath = self.m_solver.getSolverPath()
         # if no path, then just return
         if len(solverPath) == 0:
             return
-        
-        # cells that are backtrackers, used to help determine the colour fill of it.
-        list_of_backtrackers = [pathElement[0] for pathElement in solverPath if pathElement[1]]
 
-        # Keeps track of how many circles have been drawn
-        circle_num = 0
+        # one pass over the path, into arrays of cell ids and backtracking flags
+        if solverPath.m_maze != None:
+            steps = solverPath.iterIds()
+        else:
+            steps = ((self.m_maze.cellId(cell), isBacktrack) for (cell, isBacktrack) in solverPath)
+        path = np.fromiter(steps, dtype=[('cellId', np.int64), ('isBacktrack', bool)], count=len(solverPath))
+
+        # draw the initial circle at entrance, then each subsequent cell if it isn't a backtracking one
+        drawn = ~path['isBacktrack']
+        drawn[0] = True
+        (levels, rows, cols) = cellCoordinates(self.m_maze, path['cellId'][drawn])
+
+        # number of cells that aren't backtrackers, used to help determine the colour fill of it.
+        nonBacktrackNum = int(np.count_nonzero(~path['isBacktrack']))
+        colours = np.zeros((len(levels), 4))
+        colours[:, 1] = np.minimum(np.arange(len(levels)) / max(nonBacktrackNum, 1), 1)
+        colours[:, 3] = 0.4
 
         # pixel shift at each level
-        (shiftX, shiftY) = self.m_levelAdjust[solverPath[0][0].getLevel()]
-
-        # draw initial circle at entrance
-        self.m_ax.add_patch(plt.Circle(((solverPath[0][0].getCol() + 1.5)*self.m_cellSize + shiftX,
-                                      (solverPath[0][0].getRow() + 1.5)*self.m_cellSize + shiftY), 0.2*self.m_cellSize,
-                                     fc=(0, circle_num/(len(solverPath) - len(list_of_backtrackers)),
-                                         0), alpha=0.4))
-
-        # for each subsequent cell, draw it if it isn't a backtracking one
-        for i in range(1, solverPath.__len__()):
-            if not solverPath[i][1]:
-                (shiftX, shiftY) = self.m_levelAdjust[solverPath[i][0].getLevel()]
-                circle_num += 1
-                self.m_ax.add_patch(plt.Circle(((solverPath[i][0].getCol() + 1.5)*self.m_cellSize + shiftX,
-                    (solverPath[i][0].getRow() + 1.5)*self.m_cellSize + shiftY), 0.2*self.m_cellSize,
-                    fc = (0, circle_num/(len(solverPath) - len(list_of_backtrackers)), 0), alpha = 0.4))
+        shifts = np.array(self.m_levelAdjust, dtype=float)
+        centres = np.stack([(cols + 1.5) * self.m_cellSize + shifts[levels, 0],
+                            (rows + 1.5) * self.m_cellSize + shifts[levels, 1]], axis=1)
+        diameters = np.full(len(levels), 0.4 * self.m_cellSize)
+        self.m_ax.add_collection(EllipseCollection(diameters, diameters, 0, units='xy', offsets=centres,
+                                                   offset_transform=self.m_ax.transData, facecolors=colours,
+                                                   edgecolors='none'))
 
 
     
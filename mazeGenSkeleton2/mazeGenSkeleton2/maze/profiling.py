@@ -0,0 +1,159 @@
+# -------------------------------------------------------------------
+# Profiling of the phases of a run (initCells, generateMaze, carving, solveMaze, visualisation) with cProfile.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import os
+from typing import Dict, List
+
+
+# number of hot functions listed per phase in the summary
+DEFAULT_TOP_NUM: int = 15
+# name of the summary file written to the output directory, next to the <phase>.pstats files
+SUMMARY_FILE: str = 'summary.txt'
+
+
+
+class PhaseProfiler:
+    """
+    Profiles each phase of a run with its own cProfile profiler, so the time of e.g. generateMaze can be told apart
+    from that of the initCells it calls.  Phases can be nested: the enclosing phase's profiler is paused while a
+    nested phase runs, so each profile only holds the calls of its own phase.  A phase run more than once accumulates
+    into the same profile.
+
+    A profiler without an output directory is disabled, and start() and stop() do nothing, so they can be left in the
+    code of the run.  cProfile and pstats are only imported when profiling.
+    """
+
+    def __init__(self, outDir: str = None, topNum: int = DEFAULT_TOP_NUM):
+        """
+        Constructor.
+
+        @param outDir: Directory to write the profiles and summary to, created if needed.  Default is None, which
+            disables profiling.
+        @param topNum: Number of hot functions to list per phase in the summary.  Default is DEFAULT_TOP_NUM.
+        """
+        self.m_outDir = outDir
+        self.m_topNum = topNum
+        # profiler of each phase, in the order they were first run
+        self.m_profiles: Dict[str, object] = dict()
+        # phases running, innermost last
+        self.m_running: List[str] = list()
+
+
+
+    def isEnabled(self)->bool:
+        """
+        @returns True if profiling.
+        """
+        return self.m_outDir != None
+
+
+
+    def start(self, phase: str):
+        """
+        Starts (or resumes) profiling a phase, pausing the phase it is nested in, if any.
+        """
+        if self.m_outDir == None:
+            return
+        if phase not in self.m_profiles:
+            import cProfile
+            self.m_profiles[phase] = cProfile.Profile()
+        if len(self.m_running) > 0:
+            self.m_profiles[self.m_running[-1]].disable()
+        self.m_running.append(phase)
+        self.m_profiles[phase].enable()
+
+
+
+    def stop(self, phase: str):
+        """
+        Stops profiling a phase, resuming the phase it is nested in, if any.
+        """
+        if self.m_outDir == None:
+            return
+        self.m_profiles[phase].disable()
+        assert(self.m_running.pop() == phase)
+        if len(self.m_running) > 0:
+            self.m_profiles[self.m_running[-1]].enable()
+
+
+
+    def wrap(self, obj, methodName: str, phase: str = None):
+        """
+        Profiles every call of a method of an object as a phase, e.g., the initCells() generators call on the maze.
+
+        @param obj: Object whose method to profile; only this instance is affected.
+        @param methodName: Name of method.
+        @param phase: Name of phase.  Default is None, which is methodName.
+        """
+        if self.m_outDir == None:
+            return
+        method = getattr(obj, methodName)
+        phase = methodName if phase == None else phase
+
+        def profiledMethod(*args, **kwargs):
+            self.start(phase)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.stop(phase)
+
+        setattr(obj, methodName, profiledMethod)
+
+
+
+    def save(self)->List[str]:
+        """
+        Writes each phase's profile as <phase>.pstats, for pstats or viewers like snakeviz, and the summary of the hot
+        functions of every phase as SUMMARY_FILE.
+
+        @returns Lines of the summary, empty if profiling is disabled.
+        """
+        if self.m_outDir == None:
+            return list()
+        import pstats
+
+        os.makedirs(self.m_outDir, exist_ok=True)
+        lines: List[str] = list()
+        for (phase, profile) in self.m_profiles.items():
+            stats = pstats.Stats(profile)
+            stats.dump_stats(os.path.join(self.m_outDir, phase + '.pstats'))
+            lines.extend(self.summarise(phase, stats))
+
+        with open(os.path.join(self.m_outDir, SUMMARY_FILE), 'w') as summaryFile:
+            summaryFile.write('\n'.join(lines) + '\n')
+        return lines
+
+
+
+    def summarise(self, phase: str, stats)->List[str]:
+        """
+        @returns Lines summarising a phase: its total time and number of calls, then its topNum hot functions, the
+            ones that took the most time in their own code (excluding the functions they called).
+        """
+        lines: List[str] = ['{}: {:.4f} s in {:,} calls'.format(phase, stats.total_tt, stats.total_calls),
+                            '  {:>10} {:>10} {:>12}  {}'.format('own s', 'total s', 'calls', 'function')]
+        # stats.stats maps (file, line, function) to (primitive calls, calls, own time, total time, callers)
+        hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.m_topNum]
+        for ((fileName, lineNum, funcName), (_, callNum, ownTime, totalTime, _)) in hottest:
+            if fileName == '~':
+                # built-in functions have no file
+                location: str = funcName
+            else:
+                location = '{}:{}({})'.format(self.shortPath(fileName), lineNum, funcName)
+            lines.append('  {:10.4f} {:10.4f} {:12,}  {}'.format(ownTime, totalTime, callNum, location))
+        lines.append('')
+        return lines
+
+
+
+    def shortPath(self, fileName: str)->str:
+        """
+        @returns Path of a source file relative to the working directory if it is under it, e.g., maze/adjListGraph.py,
+            otherwise just the file name.
+        """
+        relPath: str = os.path.relpath(fileName) if os.path.isabs(fileName) else fileName
+        return os.path.basename(fileName) if relPath.startswith('..') else relPath
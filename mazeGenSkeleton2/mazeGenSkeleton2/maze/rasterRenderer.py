@@ -0,0 +1,297 @@
+# -------------------------------------------------------------------
+# Matplotlib free renderer, painting mazes into a NumPy pixel buffer and writing PNG files.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+try:
+    import numpy as np
+except:
+    np = None
+
+import struct
+import zlib
+from typing import List, Tuple
+
+from maze.maze3D import Maze3D
+from maze.levelGrid import levelWalls, levelLayout, cellCoordinates
+from solving.mazeSolver import MazeSolver
+
+
+# colours (RGB) of the parts of the maze
+BACKGROUND: Tuple[int, int, int] = (255, 255, 255)
+WALL: Tuple[int, int, int] = (0, 0, 0)
+STAIR_DOWN: Tuple[int, int, int] = (0, 0, 255)
+STAIR_UP: Tuple[int, int, int] = (255, 0, 0)
+ENTRANCE: Tuple[int, int, int] = (255, 140, 0)
+EXIT: Tuple[int, int, int] = (128, 0, 128)
+
+# number of solver path steps (and of cells) processed at a time when painting the solver path
+PATH_CHUNK_STEPS: int = 1 << 16
+
+
+
+def writePng(fileName: str, pixels, compressLevel: int = 6):
+    """
+    Writes an RGB image as a PNG file, using only zlib.  The image is compressed a block of rows at a time, so
+    apart from the compressed data, no copy of the whole image is made.
+
+    @param fileName: Name of file to write.
+    @param pixels: (height, width, 3) uint8 array, with the first row at the top of the image.
+    @param compressLevel: zlib compression level, 1 (fastest) to 9 (smallest).  Default is 6.
+    """
+    (height, width, _) = pixels.shape
+    compressor = zlib.compressobj(compressLevel)
+    compressed: List[bytes] = list()
+    # about 4MB of scanlines per block
+    blockRows: int = max(1, (1 << 22) // (width * 3 + 1))
+    for start in range(0, height, blockRows):
+        block = pixels[start:start + blockRows]
+        # every scanline starts with its filter type, 0 (none)
+        scanlines = np.zeros((len(block), width * 3 + 1), dtype=np.uint8)
+        scanlines[:, 1:] = block.reshape(len(block), width * 3)
+        compressed.append(compressor.compress(scanlines.tobytes()))
+    compressed.append(compressor.flush())
+
+    def chunk(chunkType: bytes, data: bytes)->bytes:
+        return struct.pack('>I', len(data)) + chunkType + data + struct.pack('>I', zlib.crc32(chunkType + data))
+
+    with open(fileName, 'wb') as pngFile:
+        pngFile.write(b'\x89PNG\r\n\x1a\n')
+        # 8 bits per channel, colour type 2 (RGB), no interlacing
+        pngFile.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        pngFile.write(chunk(b'IDAT', b''.join(compressed)))
+        pngFile.write(chunk(b'IEND', b''))
+
+
+
+def readPng(fileName: str):
+    """
+    Reads a PNG file written by writePng().  Only that format (8 bit RGB, not interlaced, no scanline filters) is
+    supported, not PNG files in general.
+
+    @param fileName: Name of file to read.
+
+    @returns (height, width, 3) uint8 array of the image, with the first row at the top.
+    """
+    with open(fileName, 'rb') as pngFile:
+        data: bytes = pngFile.read()
+
+    (width, height) = struct.unpack('>II', data[16:24])
+    compressed: List[bytes] = list()
+    pos: int = 8
+    while pos < len(data):
+        (length,) = struct.unpack('>I', data[pos:pos + 4])
+        if data[pos + 4:pos + 8] == b'IDAT':
+            compressed.append(data[pos + 8:pos + 8 + length])
+        pos += length + 12
+
+    scanlines = np.frombuffer(zlib.decompress(b''.join(compressed)), dtype=np.uint8).reshape(height, width * 3 + 1)
+    return scanlines[:, 1:].reshape(height, width, 3)
+
+
+
+def paintWalls(region, walls, cellPixels: int, stamps):
+    """
+    Paints the walls and stairs of a block of cells.
+
+    @param region: (rowNum*cellPixels+1, colNum*cellPixels+1, 3) pixel array to paint, with y going up; its first row
+        and column are the first grid lines of the block.
+    @param walls: Tuple of (horizontal, vertical, down, up) arrays of the block, see levelGrid.gridWalls().
+    @param cellPixels: Width of each cell, in pixels.
+    @param stamps: Tuple of (down, up) stair stamps, see stairStamps().
+    """
+    cp: int = cellPixels
+    (horizontal, vertical, down, up) = walls
+    (rowNum, colNum) = down.shape
+
+    # stairs, as cp x cp stamps repeated over the cells that have them
+    cells = region[:rowNum * cp, :colNum * cp]
+    for (stairs, stamp, colour) in [(down, stamps[0], STAIR_DOWN), (up, stamps[1], STAIR_UP)]:
+        mask = (stairs[:, None, :, None] & stamp[None, :, None, :]).reshape(rowNum * cp, colNum * cp)
+        cells[mask] = colour
+
+    # wall c of a grid line covers pixels c*cp to (c+1)*cp, inclusive
+    lines = np.zeros((rowNum + 1, colNum * cp + 1), dtype=bool)
+    lines[:, :colNum * cp] = np.repeat(horizontal, cp, axis=1)
+    lines[:, cp::cp] |= horizontal
+    region[::cp][lines] = WALL
+
+    lines = np.zeros((rowNum * cp + 1, colNum + 1), dtype=bool)
+    lines[:rowNum * cp] = np.repeat(vertical, cp, axis=0)
+    lines[cp::cp] |= vertical
+    region[:, ::cp][lines] = WALL
+
+
+
+def stairStamps(cellPixels: int):
+    """
+    @param cellPixels: Width of each cell, in pixels.
+
+    @returns Tuple of (down, up) cellPixels x cellPixels boolean triangles marking stairs, in the middle half of a
+        cell, with y going up.
+    """
+    cp: int = cellPixels
+    (y, x) = np.mgrid[0:cp, 0:cp] + 0.5
+    centre: float = cp / 2
+    size: float = cp / 4
+    # up triangle: apex at the top (y goes up), base at the bottom
+    up = (y >= centre - size) & (y <= centre + size) & (np.abs(x - centre) <= (centre + size - y) / 2)
+    if not up.any():
+        up[cp // 2, cp // 2] = True
+    return (up[::-1].copy(), up)
+
+
+
+class RasterRenderer:
+    """
+    Renders a maze, and optionally the path of a solver, straight into a uint8 pixel buffer with NumPy, for headless
+    use where matplotlib isn't wanted.  The levels are laid out as in Visualizer (two columns, see levelLayout()), with
+    each cell cellPixels wide.  Everything is painted a level at a time with vectorised operations, so memory is
+    bounded by the size of the image rather than the number of walls.
+
+    Walls are black, stairs are triangles (blue for down, red for up, as in Visualizer), entrances are orange and exits
+    purple squares in their boundary cells, and the solver path is a series of dots getting greener along the path.
+    Level labels are not drawn, as that needs a font.
+    """
+
+    def __init__(self, maze: Maze3D, solver: MazeSolver = None, cellPixels: int = 8):
+        """
+        Constructor.
+
+        @param maze: Maze to render.
+        @param solver: Solver whose path to render, or None.
+        @param cellPixels: Width of each cell, in pixels.  Default is 8.
+        """
+        self.m_maze = maze
+        self.m_solver = solver
+        self.m_cellPixels = cellPixels
+        self.m_levelAdjust: List[Tuple[int, int]] = levelLayout(maze, cellPixels)
+
+
+
+    def render(self):
+        """
+        @returns (height, width, 3) uint8 array of the image, with the first row at the top.
+        """
+        cp: int = self.m_cellPixels
+        width: int = max([shiftX + (self.m_maze.colNum(level) + 2) * cp + 1 for (level, (shiftX, _)) in enumerate(self.m_levelAdjust)])
+        height: int = max([shiftY + (self.m_maze.rowNum(level) + 2) * cp + 1 for (level, (_, shiftY)) in enumerate(self.m_levelAdjust)])
+
+        # painted with y going up, as in Visualizer, and flipped at the end
+        canvas = np.empty((height, width, 3), dtype=np.uint8)
+        canvas[:, :] = BACKGROUND
+
+        stamps = stairStamps(cp)
+        for level in range(self.m_maze.levelNum()):
+            self.paintLevel(canvas, level, stamps)
+        self.paintEntExit(canvas)
+        if self.m_solver != None:
+            self.paintSolverPath(canvas)
+
+        return canvas[::-1]
+
+
+
+    def save(self, fileName: str):
+        """
+        Renders the maze and writes it to a PNG file.
+
+        @param fileName: Name of file to write.
+        """
+        # provide an error message if numpy isn't installed.
+        if np == None:
+            print("NumPy not available on this computer.  Raster rendering is not possible.")
+            return
+
+        writePng(fileName, self.render())
+
+
+
+    def paintLevel(self, canvas, level: int, stamps):
+        """
+        Paints the walls and stairs of a level.
+        """
+        cp: int = self.m_cellPixels
+        (shiftX, shiftY) = self.m_levelAdjust[level]
+        walls = levelWalls(self.m_maze, level)
+        (rowNum, colNum) = walls[2].shape
+        # the level's grid lines, cells are the cp x cp squares between them
+        region = canvas[shiftY + cp:shiftY + cp + rowNum * cp + 1, shiftX + cp:shiftX + cp + colNum * cp + 1]
+        paintWalls(region, walls, cp, stamps)
+
+
+
+    def paintEntExit(self, canvas):
+        """
+        Paints the entrances and exits, as squares in their boundary cells.
+        """
+        cp: int = self.m_cellPixels
+        inset: int = max(1, cp // 4)
+        for (cells, colour) in [(self.m_maze.getEntrances(), ENTRANCE), (self.m_maze.getExits(), EXIT)]:
+            for cell in cells:
+                (shiftX, shiftY) = self.m_levelAdjust[cell.getLevel()]
+                x: int = shiftX + (cell.getCol() + 1) * cp
+                y: int = shiftY + (cell.getRow() + 1) * cp
+                canvas[y + inset:y + cp - inset + 1, x + inset:x + cp - inset + 1] = colour
+
+
+
+    def paintSolverPath(self, canvas):
+        """
+        Paints the solver path: a dot per cell that isn't a backtracking one (and the first cell), blended in with
+        40% opacity and getting greener along the path, as in Visualizer.plotSolverPath().  A cell drawn more than once
+        takes the colour of its last dot.
+
+        The path is read PATH_CHUNK_STEPS steps at a time, keeping only the position of each cell's last dot, and the
+        dots are then painted a chunk of cells at a time; so memory is bounded by the size of the maze (hence the
+        image), however long the path is.
+        """
+        solverPath = self.m_solver.getSolverPath()
+        stepNum: int = len(solverPath)
+        if stepNum == 0:
+            return
+
+        if solverPath.m_maze != None:
+            steps = solverPath.iterIds()
+        else:
+            steps = ((self.m_maze.cellId(cell), isBacktrack) for (cell, isBacktrack) in solverPath)
+
+        # position among the dots of the last dot of each cell, -1 for cells without a dot
+        lastDot = np.full(self.m_maze.cellIdNum(), -1, dtype=np.int64)
+        dotNum: int = 0
+        forwardNum: int = 0
+        for start in range(0, stepNum, PATH_CHUNK_STEPS):
+            chunkSteps: int = min(PATH_CHUNK_STEPS, stepNum - start)
+            path = np.fromiter(steps, dtype=[('cellId', np.int64), ('isBacktrack', bool)], count=chunkSteps)
+            drawn = ~path['isBacktrack']
+            forwardNum += int(np.count_nonzero(drawn))
+            if start == 0:
+                drawn[0] = True
+            cellIds = path['cellId'][drawn]
+            lastDot[cellIds] = np.arange(dotNum, dotNum + len(cellIds))
+            dotNum += len(cellIds)
+
+        # dot of diameter 0.4 cells around the centre of each cell
+        cp: int = self.m_cellPixels
+        radius: float = max(0.2 * cp, 0.5)
+        offsets = np.arange(-int(radius), int(radius) + 1)
+        (dy, dx) = np.meshgrid(offsets, offsets, indexing='ij')
+        inside = dy ** 2 + dx ** 2 <= radius ** 2
+        (dy, dx) = (dy[inside], dx[inside])
+
+        shifts = np.array(self.m_levelAdjust, dtype=np.int64)
+        dotCells = np.flatnonzero(lastDot >= 0)
+        for start in range(0, len(dotCells), PATH_CHUNK_STEPS):
+            cellIds = dotCells[start:start + PATH_CHUNK_STEPS]
+            (levels, rows, cols) = cellCoordinates(self.m_maze, cellIds)
+            centreX = shifts[levels, 0] + (cols + 1) * cp + cp // 2
+            centreY = shifts[levels, 1] + (rows + 1) * cp + cp // 2
+            ys = (centreY[:, None] + dy[None, :]).ravel()
+            xs = (centreX[:, None] + dx[None, :]).ravel()
+            # the dots of different cells don't overlap, so each pixel is blended once
+            colours = np.zeros((len(cellIds), 3))
+            colours[:, 1] = np.minimum(lastDot[cellIds] / max(forwardNum, 1), 1) * 255
+            colours = np.repeat(colours, len(dy), axis=0)
+            canvas[ys, xs] = (canvas[ys, xs] * 0.6 + colours * 0.4).astype(np.uint8)
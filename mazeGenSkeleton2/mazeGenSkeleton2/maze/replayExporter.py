@@ -0,0 +1,246 @@
+# -------------------------------------------------------------------
+# Export of animated replays of solvers, as GIFs or numbered frames.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+try:
+    import numpy as np
+except:
+    np = None
+
+import os
+import struct
+from typing import Iterator, List, Tuple
+
+from maze.maze3D import Maze3D
+from maze.rasterRenderer import RasterRenderer, writePng, BACKGROUND, WALL, STAIR_DOWN, STAIR_UP, ENTRANCE, EXIT
+from solving.mazeSolver import MazeSolver
+
+
+# colours of the replay, the background ones first; frames are kept as indices into this palette
+PALETTE: List[Tuple[int, int, int]] = [BACKGROUND, WALL, STAIR_DOWN, STAIR_UP, ENTRANCE, EXIT,
+                                       (0, 160, 0), (200, 200, 200), (0, 200, 255)]
+# palette indices of cells visited going forward, cells backtracked from and the cell the solver is at
+VISITED: int = 6
+BACKTRACKED: int = 7
+HEAD: int = 8
+
+# GIF palettes have a power of two colours; bits per palette index
+GIF_COLOUR_BITS: int = 4
+# literals written between LZW clear codes, so the code table never grows past GIF_COLOUR_BITS+1 bit codes
+GIF_CLEAR_EVERY: int = (1 << GIF_COLOUR_BITS) - 2
+
+
+
+def gifImageData(indices)->bytes:
+    """
+    Encodes palette indices as GIF image data, without compression: every pixel is written as a literal code and a
+    clear code is sent often enough that the codes stay GIF_COLOUR_BITS+1 bits wide.  This is a valid LZW stream that
+    can be built with a few vectorised operations rather than a Python loop per pixel; the replay frames only hold the
+    cells that changed, so they are small anyway.
+
+    @param indices: Array of palette indices, less than 1 << GIF_COLOUR_BITS, in row major order.
+
+    @returns LZW minimum code size byte, then the data sub-blocks and the block terminator.
+    """
+    clearCode: int = 1 << GIF_COLOUR_BITS
+    pixels = np.asarray(indices, dtype=np.uint16).ravel()
+    # groups of a clear code followed by GIF_CLEAR_EVERY literals; the last group is padded, and the padding cut off
+    groupNum: int = -(-len(pixels) // GIF_CLEAR_EVERY)
+    groups = np.zeros((groupNum, GIF_CLEAR_EVERY + 1), dtype=np.uint16)
+    groups[:, 0] = clearCode
+    groups[:, 1:].flat[:len(pixels)] = pixels
+    codes = groups.ravel()[:groupNum * (GIF_CLEAR_EVERY + 1) - (groupNum * GIF_CLEAR_EVERY - len(pixels))]
+    # end of information code
+    codes = np.append(codes, np.uint16(clearCode + 1))
+
+    codeBits: int = GIF_COLOUR_BITS + 1
+    bits = ((codes[:, None] >> np.arange(codeBits, dtype=np.uint16)) & 1).astype(np.uint8)
+    data: bytes = np.packbits(bits.ravel(), bitorder='little').tobytes()
+
+    blocks: List[bytes] = [bytes([GIF_COLOUR_BITS])]
+    for start in range(0, len(data), 255):
+        chunk: bytes = data[start:start + 255]
+        blocks.append(bytes([len(chunk)]) + chunk)
+    blocks.append(b'\x00')
+    return b''.join(blocks)
+
+
+
+class ReplayExporter:
+    """
+    Exports how a solver progressed through a maze (its solver path, see MazeSolver.getSolverPath()) as an animated
+    GIF, or as numbered PNG frames.  The maze is laid out and drawn as RasterRenderer does; each step marks its cell
+    with a dot: green if the step went forward, grey if it backtracked, and blue for the cell the solver is at.
+
+    The background (the maze without the solver) is rendered once, when first needed, and reused by every export.
+    Frames are then made by updating one working image in place: a frame only repaints the cells its steps changed, and
+    a GIF frame only holds the rectangle around them.  So exporting long replays stays fast, and memory does not grow
+    with the number of steps or frames.
+    """
+
+    def __init__(self, maze: Maze3D, solver: MazeSolver, cellPixels: int = 8, stepsPerFrame: int = 1):
+        """
+        Constructor.
+
+        @param maze: Maze the solver solved.
+        @param solver: Solver whose path to replay.
+        @param cellPixels: Width of each cell, in pixels.  Default is 8.
+        @param stepsPerFrame: Number of solver steps each frame advances by.  Default is 1.
+        """
+        self.m_maze = maze
+        self.m_solver = solver
+        self.m_cellPixels = cellPixels
+        self.m_stepsPerFrame = max(1, stepsPerFrame)
+        self.m_renderer = RasterRenderer(maze, None, cellPixels)
+        # palette indices of the background, with the first row at the top; rendered by background()
+        self.m_background = None
+
+
+
+    def background(self):
+        """
+        @returns (height, width) uint8 array of the palette indices of the maze without the solver, rendered on the
+            first call and cached.
+        """
+        if self.m_background is None:
+            pixels = self.m_renderer.render()
+            self.m_background = np.zeros(pixels.shape[:2], dtype=np.uint8)
+            for (index, colour) in enumerate(PALETTE):
+                self.m_background[(pixels == colour).all(axis=2)] = index
+        return self.m_background
+
+
+
+    def frames(self)->Iterator[Tuple[object, Tuple[int, int, int, int]]]:
+        """
+        Replays the solver path, updating one working image in place.
+
+        @returns Iterator of (image, (top, left, bottom, right)) per frame: the working image, as palette indices with
+            the first row at the top, and the rectangle of it changed since the previous frame.  The first frame is the
+            background, with the whole image as its rectangle.  The image is only valid until the next frame.
+        """
+        canvas = self.background().copy()
+        (height, width) = canvas.shape
+        yield (canvas, (0, 0, height, width))
+
+        cp: int = self.m_cellPixels
+        # dot of diameter about 0.5 cells, in a cell's (cp+1) x (cp+1) block of pixels (grid lines included)
+        (dy, dx) = np.mgrid[0:cp + 1, 0:cp + 1] - cp / 2
+        dot = dy ** 2 + dx ** 2 <= max(0.25 * cp, 0.5) ** 2
+        offsets: List[int] = self.m_maze.directionOffsets()
+        levelStride: int = offsets[Maze3D.DIRECTIONS.index((1, 0, 0))]
+        rowStride: int = offsets[Maze3D.DIRECTIONS.index((0, 1, 0))]
+        levelAdjust = self.m_renderer.m_levelAdjust
+
+        def cellTop(cellId: int)->Tuple[int, int]:
+            # top left pixel of the cell's block (see RasterRenderer), in the image with the first row at the top
+            (level, rest) = divmod(cellId, levelStride)
+            (row, col) = divmod(rest, rowStride)
+            (shiftX, shiftY) = levelAdjust[level]
+            return (height - 1 - (shiftY + row * cp + cp), shiftX + col * cp)
+
+        solverPath = self.m_solver.getSolverPath()
+        if solverPath.m_maze != None:
+            steps = solverPath.iterIds()
+        else:
+            steps = ((self.m_maze.cellId(cell), isBacktrack) for (cell, isBacktrack) in solverPath)
+
+        head: int = -1
+        headColour: int = VISITED
+        changed: List[Tuple[int, int]] = list()
+        for (i, (cellId, isBacktrack)) in enumerate(steps):
+            if head >= 0:
+                (top, left) = cellTop(head)
+                canvas[top:top + cp + 1, left:left + cp + 1][dot] = headColour
+                changed.append((top, left))
+            (head, headColour) = (cellId, BACKTRACKED if isBacktrack else VISITED)
+            (top, left) = cellTop(head)
+            canvas[top:top + cp + 1, left:left + cp + 1][dot] = HEAD
+            changed.append((top, left))
+
+            if (i + 1) % self.m_stepsPerFrame == 0:
+                yield (canvas, self.changedRect(changed))
+                changed = list()
+
+        if len(changed) > 0:
+            yield (canvas, self.changedRect(changed))
+
+
+
+    def changedRect(self, changed: List[Tuple[int, int]])->Tuple[int, int, int, int]:
+        """
+        @returns (top, left, bottom, right) of the rectangle around the blocks of pixels of the changed cells.
+        """
+        cp: int = self.m_cellPixels
+        tops = [top for (top, _) in changed]
+        lefts = [left for (_, left) in changed]
+        return (min(tops), min(lefts), max(tops) + cp + 1, max(lefts) + cp + 1)
+
+
+
+    def saveGif(self, fileName: str, frameMs: int = 40)->int:
+        """
+        Writes the replay as an animated GIF, looping forever.  Frames after the first only hold the rectangle of the
+        image that changed, drawn over the previous frame.
+
+        @param fileName: Name of file to write.
+        @param frameMs: Time each frame shows for, in milliseconds.  Default is 40; GIFs count in hundredths of a
+            second, and most viewers slow down delays under 20 ms.
+
+        @returns Number of frames written.
+        """
+        # provide an error message if numpy isn't installed.
+        if np == None:
+            print("NumPy not available on this computer.  Replay export is not possible.")
+            return 0
+
+        (height, width) = self.background().shape
+        palette: bytes = b''.join([bytes(colour) for colour in PALETTE]) + bytes(3 * ((1 << GIF_COLOUR_BITS) - len(PALETTE)))
+        delay: int = max(1, round(frameMs / 10))
+        frameNum: int = 0
+
+        with open(fileName, 'wb') as gifFile:
+            # header and screen descriptor, with a global palette of 1 << GIF_COLOUR_BITS colours
+            gifFile.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0xF0 | (GIF_COLOUR_BITS - 1), 0, 0))
+            gifFile.write(palette)
+            # loop forever
+            gifFile.write(b'\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+            for (canvas, (top, left, bottom, right)) in self.frames():
+                # graphic control extension: leave the frame in place (disposal 1) for the next one to draw over
+                gifFile.write(b'\x21\xF9\x04' + struct.pack('<BHBB', 1 << 2, delay, 0, 0))
+                gifFile.write(b'\x2C' + struct.pack('<HHHHB', left, top, right - left, bottom - top, 0))
+                gifFile.write(gifImageData(canvas[top:bottom, left:right]))
+                frameNum += 1
+
+            gifFile.write(b'\x3B')
+
+        return frameNum
+
+
+
+    def saveFrames(self, dirName: str)->int:
+        """
+        Writes the replay as numbered PNG frames, frame_000000.png onwards.  Every file is a whole image, but each
+        frame only repaints the cells that changed before it is written.
+
+        @param dirName: Directory to write the frames to, created if needed.
+
+        @returns Number of frames written.
+        """
+        # provide an error message if numpy isn't installed.
+        if np == None:
+            print("NumPy not available on this computer.  Replay export is not possible.")
+            return 0
+
+        os.makedirs(dirName, exist_ok=True)
+        colours = np.array(PALETTE, dtype=np.uint8)
+        frameNum: int = 0
+        for (canvas, _) in self.frames():
+            writePng(os.path.join(dirName, 'frame_{:06d}.png'.format(frameNum)), colours[canvas])
+            frameNum += 1
+
+        return frameNum
@@ -0,0 +1,90 @@
+# -------------------------------------------------------------------
+# Maze backed only by its passage masks, e.g., attached to shared memory.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+from typing import List, Tuple
+
+from maze.maze3D import Maze3D
+from maze.util import Coordinates3D
+
+
+class MaskMaze3D(Maze3D):
+    """
+    A maze that only has the compact view of a generated maze: its level specifications and the passage masks
+    (see Maze3D.openMasks()), without the adjacency list graph.  The masks can be any buffer of bytes, e.g., the
+    buffer of a multiprocessing.shared_memory block, so many processes can solve the same maze without each building
+    or copying its own graph.
+
+    Queries are answered from the masks, so neighbours() only returns the neighbours that can be moved to (there is no
+    wall in between), which is all the solvers look at.  Changing walls updates the masks, and is hence seen by every
+    process attached to the same buffer.
+    """
+
+    def __init__(self, levelDims: List[Tuple[int, int]], openMasks):
+        """
+        Constructor.
+
+        @param levelDims: Specifications of each level, as for Maze3D.
+        @param openMasks: Passage masks of the maze, indexed by cell id; must be cellIdNum() bytes long.
+        """
+        super().__init__(levelDims)
+        assert(len(openMasks) >= self.m_cellIdNum)
+        self.m_openMask = openMasks
+        self.m_zobrist = self.recomputeFingerprint()
+        self.m_offsets: List[int] = self.directionOffsets()
+
+
+
+    def initCells(self, addWallFlag:bool = False):
+        # cells are implied by the masks, nothing to initialise
+        pass
+
+
+
+    def addWall(self, cell1:Coordinates3D, cell2:Coordinates3D):
+        self.updateOpenMask(cell1, cell2, False)
+
+
+
+    def removeWall(self, cell1:Coordinates3D, cell2:Coordinates3D):
+        self.updateOpenMask(cell1, cell2, True)
+
+
+
+    def neighbours(self, cell:Coordinates3D)->List[Coordinates3D]:
+        if not self.hasCellId(cell):
+            return []
+
+        cellId: int = self.cellId(cell)
+        mask: int = self.m_openMask[cellId]
+        return [self.cellFromId(cellId + self.m_offsets[d]) for d in range(len(self.DIRECTIONS)) if mask & (1 << d)]
+
+
+
+    def hasWall(self, cell1:Coordinates3D, cell2:Coordinates3D)->bool:
+        direction: int = self.direction(cell1, cell2)
+        if direction < 0 or not self.hasCellId(cell1):
+            return False
+
+        return self.m_openMask[self.cellId(cell1)] & (1 << direction) == 0
+
+
+
+    def hasCell(self, cell:Coordinates3D)->bool:
+        return 0 <= cell.getLevel() < self.levelNum() and self.checkCoordinates(cell)
+
+
+
+    def allCells(self)->List[Coordinates3D]:
+        """
+        @returns: All cells of each level, including the boundary cells around it (but not the corners).
+        """
+        cells: List[Coordinates3D] = list()
+        for level in range(self.levelNum()):
+            (rowNum, colNum) = (self.rowNum(level), self.colNum(level))
+            cells += [Coordinates3D(level, r, c) for r in range(-1, rowNum + 1) for c in range(-1, colNum + 1)
+                      if (0 <= r < rowNum) or (0 <= c < colNum)]
+        return cells
@@ -0,0 +1,215 @@
+# -------------------------------------------------------------------
+# Streaming SVG renderer of mazes.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+try:
+    import numpy as np
+except:
+    np = None
+
+from typing import List, Tuple
+
+from maze.maze3D import Maze3D
+from maze.levelGrid import levelWalls, levelLayout, cellCoordinates
+from solving.mazeSolver import MazeSolver
+
+
+# number of colour bands the solver path is split into, each band is one <path>
+PATH_BANDS: int = 16
+# number of path commands formatted and written at a time
+WRITE_CHUNK: int = 1 << 16
+# number of solver path steps read at a time
+PATH_CHUNK_STEPS: int = 1 << 16
+
+
+
+def wallRuns(lines):
+    """
+    Merges adjacent walls along each grid line into runs.
+
+    @param lines: Boolean array, lines[i, j] is True if grid line i has a wall at position j.
+
+    @returns Tuple of arrays (line, start, end) of the runs, where the run covers positions start to end-1 of line.
+    """
+    padded = np.zeros((lines.shape[0], lines.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = lines
+    changes = np.diff(padded, axis=1)
+    # starts and ends come out in the same (row major) order, so they pair up
+    (lineIndex, starts) = np.nonzero(changes == 1)
+    (_, ends) = np.nonzero(changes == -1)
+    return (lineIndex, starts, ends)
+
+
+
+def writeCommands(svgFile, command: str, *columns):
+    """
+    Writes a path command for each row of columns, a chunk at a time, so memory doesn't grow with the number of
+    commands.
+
+    @param svgFile: File to write to.
+    @param command: Format string of a command, with a {} for each column.
+    @param columns: Integer arrays of the same length, the values of the commands.
+    """
+    for start in range(0, len(columns[0]), WRITE_CHUNK):
+        values = zip(*[column[start:start + WRITE_CHUNK].tolist() for column in columns])
+        svgFile.write(''.join([command.format(*value) for value in values]))
+
+
+
+class SvgRenderer:
+    """
+    Renders a maze, and optionally the path of a solver, as an SVG file, using the same layout as Visualizer (see
+    levelLayout()).  The file is written as it is generated, a level at a time: adjacent collinear walls are merged
+    into runs, and all the runs of a level are one <path>, so the file size and the time to write it grow with the
+    number of wall runs rather than the number of cells.  Stairs are one <path> per direction and level, and the solver
+    path a few <path>s of dots, one per shade of green.
+    """
+
+    def __init__(self, maze: Maze3D, solver: MazeSolver = None, cellSize: int = 10):
+        """
+        Constructor.
+
+        @param maze: Maze to render.
+        @param solver: Solver whose path to render, or None.
+        @param cellSize: Size of each cell, in SVG user units.  Default is 10.
+        """
+        self.m_maze = maze
+        self.m_solver = solver
+        self.m_cellSize = cellSize
+        self.m_levelAdjust: List[Tuple[int, int]] = levelLayout(maze, cellSize)
+        self.m_width: int = max([shiftX + (maze.colNum(level) + 2) * cellSize for (level, (shiftX, _)) in enumerate(self.m_levelAdjust)])
+        self.m_height: int = max([shiftY + (maze.rowNum(level) + 2) * cellSize for (level, (_, shiftY)) in enumerate(self.m_levelAdjust)])
+
+
+
+    def save(self, fileName: str):
+        """
+        Writes the SVG file.
+
+        @param fileName: Name of file to write.
+        """
+        # provide an error message if numpy isn't installed.
+        if np == None:
+            print("NumPy not available on this computer.  SVG rendering is not possible.")
+            return
+
+        cs: int = self.m_cellSize
+        with open(fileName, 'w') as svgFile:
+            # the level labels sit above and left of the levels, make room for them
+            svgFile.write('<svg xmlns="http://www.w3.org/2000/svg" viewBox="{} {} {} {}">\n'.format(
+                -cs, -cs, self.m_width + 2 * cs, self.m_height + 2 * cs))
+            svgFile.write('<rect x="{}" y="{}" width="{}" height="{}" fill="white"/>\n'.format(
+                -cs, -cs, self.m_width + 2 * cs, self.m_height + 2 * cs))
+            for level in range(self.m_maze.levelNum()):
+                self.writeLevel(svgFile, level)
+            self.writeEntExit(svgFile)
+            if self.m_solver != None:
+                self.writeSolverPath(svgFile)
+            svgFile.write('</svg>\n')
+
+
+
+    def writeLevel(self, svgFile, level: int):
+        """
+        Writes the walls, stairs and label of a level.
+        """
+        cs: int = self.m_cellSize
+        (shiftX, shiftY) = self.m_levelAdjust[level]
+        (horizontal, vertical, down, up) = levelWalls(self.m_maze, level)
+        # x and y of the level's first grid lines; y is flipped, so row 0 is at the bottom as in Visualizer
+        x0: int = shiftX + cs
+        y0: int = self.m_height - shiftY - cs
+
+        svgFile.write('<text x="{}" y="{}" font-size="{}" font-weight="bold">Level {}</text>\n'.format(
+            shiftX - cs // 2, self.m_height - shiftY, cs, level))
+
+        svgFile.write('<path stroke="black" stroke-linecap="square" fill="none" d="')
+        (rows, starts, ends) = wallRuns(horizontal)
+        writeCommands(svgFile, 'M{} {}h{}', x0 + starts * cs, y0 - rows * cs, (ends - starts) * cs)
+        (cols, starts, ends) = wallRuns(vertical.T)
+        writeCommands(svgFile, 'M{} {}v{}', x0 + cols * cs, y0 - starts * cs, (starts - ends) * cs)
+        svgFile.write('"/>\n')
+
+        # stairs, as triangles in the middle half of the cell; each is a move to the centre of its cell, then the
+        # same relative triangle
+        half: float = cs / 4
+        for (stairs, colour, tip) in [(down, 'blue', 1), (up, 'red', -1)]:
+            (rows, cols) = np.nonzero(stairs)
+            if len(rows) == 0:
+                continue
+            triangle: str = 'm0 {:g}l{:g} {:g}h{:g}z'.format(tip * half, -half, -2 * tip * half, 2 * half)
+            svgFile.write('<path fill="{}" d="'.format(colour))
+            writeCommands(svgFile, 'M{} {}' + triangle, x0 + cols * cs + cs // 2, y0 - rows * cs - cs // 2)
+            svgFile.write('"/>\n')
+
+
+
+    def writeEntExit(self, svgFile):
+        """
+        Writes the entrances and exits, as squares in their boundary cells.
+        """
+        cs: int = self.m_cellSize
+        for (cells, colour) in [(self.m_maze.getEntrances(), 'darkorange'), (self.m_maze.getExits(), 'purple')]:
+            for cell in cells:
+                (shiftX, shiftY) = self.m_levelAdjust[cell.getLevel()]
+                svgFile.write('<rect x="{:g}" y="{:g}" width="{:g}" height="{:g}" fill="{}"/>\n'.format(
+                    shiftX + (cell.getCol() + 1.25) * cs, self.m_height - shiftY - (cell.getRow() + 1.75) * cs,
+                    cs / 2, cs / 2, colour))
+
+
+
+    def writeSolverPath(self, svgFile):
+        """
+        Writes the solver path: a dot per cell that isn't a backtracking one (and the first cell), getting greener
+        along the path as in Visualizer.plotSolverPath().  Dots are zero length round capped strokes, grouped into
+        PATH_BANDS paths of the same colour.  The path is streamed PATH_CHUNK_STEPS steps at a time, so memory does not
+        grow with its length, e.g., when it has been spilled to disk.
+        """
+        solverPath = self.m_solver.getSolverPath()
+        stepNum: int = len(solverPath)
+        if stepNum == 0:
+            return
+
+        if solverPath.m_maze != None:
+            steps = solverPath.iterIds()
+        else:
+            steps = ((self.m_maze.cellId(cell), isBacktrack) for (cell, isBacktrack) in solverPath)
+        # the band of each dot depends on the length of the whole path
+        forwardNum: int = max(stepNum - solverPath.countBacktracks(), 1)
+
+        cs: int = self.m_cellSize
+        shifts = np.array(self.m_levelAdjust, dtype=np.int64)
+        # band whose <path> is open, -1 for none
+        openBand: int = -1
+        dotNum: int = 0
+        for start in range(0, stepNum, PATH_CHUNK_STEPS):
+            chunk = np.fromiter(steps, dtype=[('cellId', np.int64), ('isBacktrack', bool)],
+                                count=min(PATH_CHUNK_STEPS, stepNum - start))
+            drawn = ~chunk['isBacktrack']
+            if start == 0:
+                drawn[0] = True
+            (levels, rows, cols) = cellCoordinates(self.m_maze, chunk['cellId'][drawn])
+            xs = shifts[levels, 0] + (cols + 1) * cs + cs // 2
+            ys = self.m_height - shifts[levels, 1] - (rows + 1) * cs - cs // 2
+            bands = np.minimum(np.arange(dotNum, dotNum + len(levels)) * PATH_BANDS // forwardNum, PATH_BANDS - 1)
+            bounds = np.searchsorted(bands, np.arange(PATH_BANDS + 1))
+            dotNum += len(levels)
+
+            for band in range(PATH_BANDS):
+                (bandStart, bandEnd) = (bounds[band], bounds[band + 1])
+                if bandStart == bandEnd:
+                    continue
+                if band != openBand:
+                    if openBand >= 0:
+                        svgFile.write('"/>\n')
+                    green: int = int(255 * band / max(PATH_BANDS - 1, 1))
+                    svgFile.write('<path stroke="rgb(0,{},0)" stroke-opacity="0.4" stroke-width="{:g}" stroke-linecap="round" d="'.format(
+                        green, 0.4 * cs))
+                    openBand = band
+                writeCommands(svgFile, 'M{} {}h0', xs[bandStart:bandEnd], ys[bandStart:bandEnd])
+
+        if openBand >= 0:
+            svgFile.write('"/>\n')
@@ -0,0 +1,380 @@
+# -------------------------------------------------------------------
+# Tiled, zoomable image pyramid of mazes, rendered in parallel.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+try:
+    import numpy as np
+except:
+    np = None
+
+import hashlib
+import json
+import os
+from math import ceil, log2
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+from typing import Dict, List, Set, Tuple
+
+from maze.maze3D import Maze3D
+from maze.levelGrid import gridWalls
+from maze.rasterRenderer import BACKGROUND, writePng, readPng, paintWalls, stairStamps
+
+
+# passage masks of the maze being tiled, one view per worker process (set by attachTileMasks())
+workerMasks = None
+# shared memory block workerMasks is a view of, kept open for the lifetime of the worker
+workerBlock: shared_memory.SharedMemory = None
+# (levelDims, rowStride, levelStride, cellPixels, tileSize, outDir) of the maze being tiled
+workerSpec: tuple = None
+
+# name of the file recording what the tiles in a directory were rendered from
+MANIFEST_FILE: str = 'manifest.json'
+# name of the viewer page
+VIEWER_FILE: str = 'index.html'
+# zlib compression level of tiles; there are many of them, so favour speed
+TILE_COMPRESSION: int = 1
+
+
+
+def attachTileMasks(blockName: str, spec: tuple):
+    """
+    Pool initialiser: attaches the worker to the published passage masks, without copying them.
+
+    @param blockName: Name of the shared memory block holding the passage masks.
+    @param spec: Tuple of (levelDims, rowStride, levelStride, cellPixels, tileSize, outDir).
+    """
+    global workerMasks, workerBlock, workerSpec
+
+    # pool workers share the resource tracker of the publishing process, which unlinks the block
+    workerBlock = shared_memory.SharedMemory(name=blockName)
+    workerSpec = spec
+    (levelDims, _, levelStride, _, _, _) = spec
+    workerMasks = np.frombuffer(workerBlock.buf, dtype=np.uint8)[:len(levelDims) * levelStride]
+
+
+
+def levelPixels(levelDims: List[Tuple[int, int]], level: int, cellPixels: int)->Tuple[int, int]:
+    """
+    @returns (height, width) of the image of a level at the deepest zoom, with a cell of margin around the level.
+    """
+    (rowNum, colNum) = levelDims[level]
+    return ((rowNum + 2) * cellPixels, (colNum + 2) * cellPixels)
+
+
+
+def tileCells(levelDims: List[Tuple[int, int]], level: int, x: int, y: int, cellPixels: int,
+              tileSize: int)->Tuple[int, int, int, int]:
+    """
+    @returns (firstRow, endRow, firstCol, endCol) of the block of cells whose walls can show in tile (x, y) at the
+        deepest zoom.  The block is empty if the tile is all margin.
+    """
+    (rowNum, colNum) = levelDims[level]
+    (height, _) = levelPixels(levelDims, level, cellPixels)
+    # tiles count from the top, the image y goes up; cell c covers pixels (c+1)*cp to (c+2)*cp, inclusive
+    pixelY: int = height - (y + 1) * tileSize
+    pixelX: int = x * tileSize
+    firstRow: int = max(0, pixelY // cellPixels - 2)
+    firstCol: int = max(0, pixelX // cellPixels - 2)
+    return (firstRow, max(firstRow, min(rowNum, (pixelY + tileSize) // cellPixels)),
+            firstCol, max(firstCol, min(colNum, (pixelX + tileSize) // cellPixels)))
+
+
+
+def tileFileName(outDir: str, level: int, zoom: int, x: int, y: int)->str:
+    """
+    @returns Name of the file of a tile, in the z/x/y layout of each level's directory.
+    """
+    return os.path.join(outDir, str(level), str(zoom), str(x), '{}.png'.format(y))
+
+
+
+def renderBaseTile(job: Tuple[int, int, int, int, str])->Tuple[int, int, int, str, bool]:
+    """
+    Renders a tile at the deepest zoom, in a worker, unless the cells it shows are the same as when it was last
+    rendered.
+
+    @param job: Tuple of (level, deepest zoom, x, y, hash of the tile's cells when it was last rendered, or None).
+
+    @returns Tuple of (level, x, y, hash of the tile's cells, whether the tile was (re)written).
+    """
+    (level, zoom, x, y, oldHash) = job
+    (levelDims, rowStride, levelStride, cellPixels, tileSize, outDir) = workerSpec
+    (firstRow, endRow, firstCol, endCol) = tileCells(levelDims, level, x, y, cellPixels, tileSize)
+
+    grid = workerMasks[level * levelStride:(level + 1) * levelStride].reshape(-1, rowStride)
+    block = grid[firstRow + 1:endRow + 1, firstCol + 1:endCol + 1]
+    tileHash: str = hashlib.blake2b(np.ascontiguousarray(block).tobytes(), digest_size=8).hexdigest()
+    fileName: str = tileFileName(outDir, level, zoom, x, y)
+    if tileHash == oldHash and os.path.exists(fileName):
+        return (level, x, y, tileHash, False)
+
+    tile = np.empty((tileSize, tileSize, 3), dtype=np.uint8)
+    tile[:, :] = BACKGROUND
+    if endRow > firstRow and endCol > firstCol:
+        cp: int = cellPixels
+        region = np.empty(((endRow - firstRow) * cp + 1, (endCol - firstCol) * cp + 1, 3), dtype=np.uint8)
+        region[:, :] = BACKGROUND
+        paintWalls(region, gridWalls(block), cp, stairStamps(cp))
+
+        # copy the part of the block that falls in the tile, both with y going up
+        (height, _) = levelPixels(levelDims, level, cellPixels)
+        (offsetY, offsetX) = ((firstRow + 1) * cp - (height - (y + 1) * tileSize), (firstCol + 1) * cp - x * tileSize)
+        (top, left) = (max(0, offsetY), max(0, offsetX))
+        (bottom, right) = (min(tileSize, offsetY + region.shape[0]), min(tileSize, offsetX + region.shape[1]))
+        if bottom > top and right > left:
+            tile[top:bottom, left:right] = region[top - offsetY:bottom - offsetY, left - offsetX:right - offsetX]
+
+    os.makedirs(os.path.dirname(fileName), exist_ok=True)
+    writePng(fileName, tile[::-1], TILE_COMPRESSION)
+    return (level, x, y, tileHash, True)
+
+
+
+def renderParentTile(job: Tuple[int, int, int, int, int, int])->Tuple[int, int, int]:
+    """
+    Renders a tile from the four tiles of the next zoom it covers, each shrunk to half size, in a worker.
+
+    @param job: Tuple of (level, zoom, x, y, number of tiles across and down at the next zoom).
+
+    @returns Tuple of (level, x, y) of the tile.
+    """
+    (level, zoom, x, y, childCols, childRows) = job
+    (_, _, _, _, tileSize, outDir) = workerSpec
+
+    children = np.empty((2 * tileSize, 2 * tileSize, 3), dtype=np.uint8)
+    children[:, :] = BACKGROUND
+    for (i, j) in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+        if 2 * x + i < childCols and 2 * y + j < childRows:
+            children[j * tileSize:(j + 1) * tileSize, i * tileSize:(i + 1) * tileSize] = \
+                readPng(tileFileName(outDir, level, zoom + 1, 2 * x + i, 2 * y + j))
+
+    tile = children.reshape(tileSize, 2, tileSize, 2, 3).mean(axis=(1, 3)).astype(np.uint8)
+    fileName: str = tileFileName(outDir, level, zoom, x, y)
+    os.makedirs(os.path.dirname(fileName), exist_ok=True)
+    writePng(fileName, tile, TILE_COMPRESSION)
+    return (level, x, y)
+
+
+
+class TileRenderer:
+    """
+    Renders each level of a maze as a pyramid of fixed size PNG tiles, in the usual z/x/y layout
+    (<outDir>/<level>/<zoom>/<x>/<y>.png, tile (0, 0) at the top left), so huge mazes can be panned and zoomed in a
+    viewer rather than opened as one image.  At the deepest zoom each cell is cellPixels wide; each zoom out halves
+    that, down to zoom 0 where the whole level fits in one tile.
+
+    Tiles are rendered in a process pool.  The passage masks of the maze are published once to shared memory, so the
+    workers neither pickle nor copy the maze.  The deepest tiles are painted straight from the masks (walls and stairs,
+    as RasterRenderer), the other zooms are averaged down from the tiles below them.
+
+    A manifest of the cells each deepest tile was rendered from is kept with the tiles.  Rendering into the same
+    directory again only rewrites the tiles whose cells changed, and the tiles above them, so a small change to a huge
+    maze is cheap to re-tile.  A static viewer page, index.html, is written alongside.
+    """
+
+    def __init__(self, maze: Maze3D, outDir: str, cellPixels: int = 8, tileSize: int = 256):
+        """
+        Constructor.
+
+        @param maze: Maze to render.
+        @param outDir: Directory to write the tiles to, created if needed.
+        @param cellPixels: Width of each cell at the deepest zoom, in pixels.  Default is 8.
+        @param tileSize: Width and height of each tile, in pixels.  Default is 256.
+        """
+        self.m_maze = maze
+        self.m_outDir = outDir
+        self.m_cellPixels = cellPixels
+        self.m_tileSize = tileSize
+
+
+
+    def render(self, processNum: int = None)->int:
+        """
+        Renders the tiles that are missing or out of date, and the viewer.
+
+        @param processNum: Number of worker processes.  Default is None, which uses the number of CPUs.
+
+        @returns Number of tiles written.
+        """
+        # provide an error message if numpy isn't installed.
+        if np == None:
+            print("NumPy not available on this computer.  Tile rendering is not possible.")
+            return 0
+
+        maze: Maze3D = self.m_maze
+        os.makedirs(self.m_outDir, exist_ok=True)
+        levelDims: List[Tuple[int, int]] = [(maze.rowNum(level), maze.colNum(level)) for level in range(maze.levelNum())]
+        settings: dict = {'levelDims': levelDims, 'cellPixels': self.m_cellPixels, 'tileSize': self.m_tileSize}
+        oldHashes: Dict[str, str] = self.loadManifest(settings)
+
+        grids: List[Tuple[int, int, int]] = [self.tileGrid(levelDims, level) for level in range(maze.levelNum())]
+        baseJobs = [(level, maxZoom, x, y, oldHashes.get('{}/{}/{}'.format(level, x, y)))
+                    for (level, (maxZoom, cols, rows)) in enumerate(grids) for x in range(cols) for y in range(rows)]
+
+        offsets: List[int] = maze.directionOffsets()
+        spec: tuple = (levelDims, offsets[Maze3D.DIRECTIONS.index((0, 1, 0))], offsets[Maze3D.DIRECTIONS.index((1, 0, 0))],
+                       self.m_cellPixels, self.m_tileSize, self.m_outDir)
+        masks = maze.openMasks()
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(masks)))
+        tileNum: int = 0
+        try:
+            block.buf[:len(masks)] = masks
+            with Pool(processNum, initializer=attachTileMasks, initargs=(block.name, spec)) as pool:
+                hashes: Dict[str, str] = dict()
+                changed: Set[Tuple[int, int, int]] = set()
+                for (level, x, y, tileHash, written) in pool.imap_unordered(renderBaseTile, baseJobs, chunksize=16):
+                    hashes['{}/{}/{}'.format(level, x, y)] = tileHash
+                    if written:
+                        changed.add((level, x, y))
+                tileNum += len(changed)
+
+                # zoom out a zoom at a time, redoing the tiles above changed ones
+                zoomGrids: List[Tuple[int, int]] = [(cols, rows) for (_, cols, rows) in grids]
+                for zoomOut in range(1, max([maxZoom for (maxZoom, _, _) in grids], default=0) + 1):
+                    parentJobs = list()
+                    for (level, x, y) in sorted(set([(level, x // 2, y // 2) for (level, x, y) in changed])):
+                        (maxZoom, _, _) = grids[level]
+                        if maxZoom >= zoomOut:
+                            (childCols, childRows) = zoomGrids[level]
+                            parentJobs.append((level, maxZoom - zoomOut, x, y, childCols, childRows))
+                    zoomGrids = [(ceil(cols / 2), ceil(rows / 2)) for (cols, rows) in zoomGrids]
+                    changed = set(pool.map(renderParentTile, parentJobs))
+                    tileNum += len(changed)
+        finally:
+            block.close()
+            block.unlink()
+
+        self.saveManifest(settings, hashes)
+        self.saveViewer(grids)
+        return tileNum
+
+
+
+    def tileGrid(self, levelDims: List[Tuple[int, int]], level: int)->Tuple[int, int, int]:
+        """
+        @returns Tuple of (deepest zoom, number of tiles across, number of tiles down at the deepest zoom) of a level.
+        """
+        (height, width) = levelPixels(levelDims, level, self.m_cellPixels)
+        (cols, rows) = (ceil(width / self.m_tileSize), ceil(height / self.m_tileSize))
+        return (ceil(log2(max(cols, rows))), cols, rows)
+
+
+
+    def loadManifest(self, settings: dict)->Dict[str, str]:
+        """
+        @param settings: Level specifications and tile settings of this rendering.
+
+        @returns Hashes of the cells of each deepest tile ('level/x/y') when last rendered, or an empty dictionary if
+            there are no tiles, or they were rendered with other settings.
+        """
+        try:
+            with open(os.path.join(self.m_outDir, MANIFEST_FILE), 'r') as manifestFile:
+                manifest: dict = json.load(manifestFile)
+        except (OSError, ValueError):
+            return dict()
+
+        if manifest.get('settings') != json.loads(json.dumps(settings)):
+            return dict()
+        return manifest.get('hashes', dict())
+
+
+
+    def saveManifest(self, settings: dict, hashes: Dict[str, str]):
+        """
+        Saves the settings and the hashes of the cells of each deepest tile.
+        """
+        fileName: str = os.path.join(self.m_outDir, MANIFEST_FILE)
+        with open(fileName + '.tmp', 'w') as manifestFile:
+            json.dump({'settings': settings, 'hashes': hashes}, manifestFile)
+        os.replace(fileName + '.tmp', fileName)
+
+
+
+    def saveViewer(self, grids: List[Tuple[int, int, int]]):
+        """
+        Writes the viewer page, with the tile grid of each level in it, so it works opened straight from disk.
+        """
+        levels = [{'maxZoom': maxZoom, 'cols': cols, 'rows': rows} for (maxZoom, cols, rows) in grids]
+        with open(os.path.join(self.m_outDir, VIEWER_FILE), 'w') as viewerFile:
+            viewerFile.write(VIEWER_HTML.replace('TILE_INFO', json.dumps({'tileSize': self.m_tileSize, 'levels': levels})))
+
+
+
+# viewer page: drag to pan, mouse wheel or buttons to zoom, one level at a time
+VIEWER_HTML: str = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Maze tiles</title>
+<style>
+body { margin: 0; font-family: sans-serif; }
+#bar { padding: 4px; background: #eee; }
+#view { position: absolute; top: 32px; bottom: 0; left: 0; right: 0; overflow: hidden; background: white; cursor: move; }
+#view img { position: absolute; image-rendering: pixelated; user-select: none; -webkit-user-drag: none; }
+</style>
+</head>
+<body>
+<div id="bar">Level <select id="level"></select> <button id="zoomOut">-</button> <button id="zoomIn">+</button> <span id="zoomText"></span></div>
+<div id="view"></div>
+<script>
+var info = TILE_INFO;
+var view = document.getElementById('view'), levelBox = document.getElementById('level');
+var level = 0, zoom = 0, left = 0, top = 0;
+info.levels.forEach(function (_, i) { levelBox.add(new Option(i, i)); });
+
+function gridSize(z) {
+    var l = info.levels[level], scale = Math.pow(2, l.maxZoom - z);
+    return [Math.ceil(l.cols / scale), Math.ceil(l.rows / scale)];
+}
+
+function draw() {
+    var size = info.tileSize, grid = gridSize(zoom), tiles = {};
+    for (var x = Math.max(0, Math.floor(left / size)); x < grid[0] && x * size < left + view.clientWidth; x++) {
+        for (var y = Math.max(0, Math.floor(top / size)); y < grid[1] && y * size < top + view.clientHeight; y++) {
+            tiles[level + '/' + zoom + '/' + x + '/' + y] = [x, y];
+        }
+    }
+    Array.from(view.children).forEach(function (img) {
+        if (!(img.dataset.key in tiles)) { view.removeChild(img); }
+    });
+    Object.keys(tiles).forEach(function (key) {
+        var img = view.querySelector('img[data-key="' + key + '"]');
+        if (!img) {
+            img = document.createElement('img');
+            img.dataset.key = key;
+            img.src = key + '.png';
+            view.appendChild(img);
+        }
+        img.style.left = (tiles[key][0] * size - left) + 'px';
+        img.style.top = (tiles[key][1] * size - top) + 'px';
+    });
+    document.getElementById('zoomText').textContent = 'zoom ' + zoom + ' of ' + info.levels[level].maxZoom;
+}
+
+function setZoom(z, atX, atY) {
+    z = Math.max(0, Math.min(info.levels[level].maxZoom, z));
+    var factor = Math.pow(2, z - zoom);
+    left = (left + atX) * factor - atX;
+    top = (top + atY) * factor - atY;
+    zoom = z;
+    draw();
+}
+
+levelBox.onchange = function () { level = +levelBox.value; zoom = 0; left = 0; top = 0; draw(); };
+document.getElementById('zoomIn').onclick = function () { setZoom(zoom + 1, view.clientWidth / 2, view.clientHeight / 2); };
+document.getElementById('zoomOut').onclick = function () { setZoom(zoom - 1, view.clientWidth / 2, view.clientHeight / 2); };
+view.onwheel = function (e) { e.preventDefault(); setZoom(zoom + (e.deltaY < 0 ? 1 : -1), e.offsetX, e.offsetY); };
+view.onmousedown = function (e) {
+    var startX = e.clientX + left, startY = e.clientY + top;
+    window.onmousemove = function (e) { left = startX - e.clientX; top = startY - e.clientY; draw(); };
+    window.onmouseup = function () { window.onmousemove = null; };
+};
+window.onresize = draw;
+draw();
+</script>
+</body>
+</html>
+'''
@@ -0,0 +1,139 @@
+# -------------------------------------------------------------------
+# Tracing facility shared by the generators and solvers, replacing per-step print() calls.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import struct
+from typing import BinaryIO, Iterator, Tuple
+
+from maze.util import Coordinates3D
+
+
+# Trace levels, from least to most verbose.  Tracing is off by default.
+TRACE_OFF = 0
+# outcome of a run, e.g., whether the maze was solved
+TRACE_INFO = 1
+# decisions made along the way, e.g., turns and the final path
+TRACE_DEBUG = 2
+# every step and every check, only useful for small mazes
+TRACE_STEP = 3
+
+# Cell events that can be written to the binary trace sink.
+# a cell was moved to
+EVENT_VISIT = 0
+
+
+class Tracer:
+    """
+    Levelled tracer.  Messages are format strings with their arguments passed separately, and the level is tested
+    before anything is formatted, so a disabled trace call costs a comparison and nothing else.
+    Cell events can optionally be written to a compact binary file for offline analysis (see readTrace()); they are
+    recorded whatever the level printed to the console is.
+    """
+
+    # level, event, cell level, cell row, cell column
+    RECORD_FORMAT = '<BBiii'
+
+
+    def __init__(self):
+        self.m_level: int = TRACE_OFF
+        # binary sink, None if not recording cell events
+        self.m_sink: BinaryIO = None
+
+
+
+    def setLevel(self, level: int):
+        """
+        @param level: Most verbose level that is traced, e.g., TRACE_INFO.  TRACE_OFF disables tracing.
+        """
+        self.m_level = level
+
+
+
+    def isEnabled(self, level: int)->bool:
+        """
+        @returns True if messages of level are traced.  Use to guard any work done only to build trace arguments.
+        """
+        return level <= self.m_level
+
+
+
+    def log(self, level: int, message: str, *args):
+        """
+        Prints a message if its level is enabled.
+
+        @param level: Level of message.
+        @param message: Message, with {} placeholders for args.
+        @param args: Arguments of the message, only converted to strings if the message is printed.
+        """
+        if level <= self.m_level:
+            print(message.format(*args) if args else message)
+
+
+
+    def cell(self, level: int, event: int, cell: Coordinates3D):
+        """
+        Writes a cell event to the binary sink, if one is open.  The trace level only applies to the console, so a
+        sink records every event.
+
+        @param level: Level of event, recorded with it.
+        @param event: Type of event, e.g., EVENT_VISIT.
+        @param cell: Cell the event is about.
+        """
+        if self.m_sink != None:
+            self.m_sink.write(struct.pack(self.RECORD_FORMAT, level, event, cell.getLevel(), cell.getRow(), cell.getCol()))
+
+
+
+    def isRecording(self)->bool:
+        """
+        @returns True if a binary sink is open.  Use to guard any work done only to build cell events.
+        """
+        return self.m_sink != None
+
+
+
+    def openSink(self, fileName: str):
+        """
+        Starts recording cell events into a binary file.
+
+        @param fileName: Name of file to write to.
+        """
+        self.closeSink()
+        self.m_sink = open(fileName, 'wb')
+
+
+
+    def closeSink(self):
+        """
+        Stops recording cell events and closes the binary file, if one is open.
+        """
+        if self.m_sink != None:
+            self.m_sink.close()
+            self.m_sink = None
+
+
+
+def readTrace(fileName: str)->Iterator[Tuple[int, int, Coordinates3D]]:
+    """
+    Reads back a binary trace written by Tracer, one record at a time.
+
+    @param fileName: Name of trace file.
+
+    @returns Iterator of (level, event, cell) tuples.
+    """
+    recordSize = struct.calcsize(Tracer.RECORD_FORMAT)
+    with open(fileName, 'rb') as traceFile:
+        while True:
+            record = traceFile.read(recordSize)
+            if len(record) < recordSize:
+                return
+            (level, event, cellLevel, row, col) = struct.unpack(Tracer.RECORD_FORMAT, record)
+            yield (level, event, Coordinates3D(cellLevel, row, col))
+
+
+
+# Tracer shared by all generators and solvers.
+tracer = Tracer()
@@ -0,0 +1,232 @@
+# -------------------------------------------------------------------
+# Tree distance oracle for perfect mazes.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+from typing import Iterator, List, Tuple
+
+from maze.maze3D import Maze3D
+from maze.util import Coordinates3D
+
+
+class TreeDistanceOracle:
+    """
+    Preprocesses a generated (perfect) maze so that path lengths between any two cells can be answered in O(1).
+    The passages of a perfect maze form a spanning tree.  We root that tree, record an Euler tour of it and build a
+    sparse table over the tour for lowest common ancestor (LCA) queries.  The distance between two cells is then
+    depth(cell1) + depth(cell2) - 2 * depth(lca), and the actual path can be produced lazily by walking parent links.
+
+    Cells that are not connected by passages (e.g., boundary cells that were never carved) end up in different
+    trees of the forest, and their distance is reported as -1.
+    """
+
+    def __init__(self, maze: Maze3D):
+        """
+        Constructor.  Runs the preprocessing, so it should be constructed after the maze is generated and the
+        entrances and exits have been carved.
+
+        @param maze: Maze to preprocess.
+        """
+        # self.m_cells: index -> cell, and self.m_cellIndex: cell -> index.
+        self.m_cells: List[Coordinates3D] = list(maze.allCells())
+        self.m_cellIndex: dict[Coordinates3D, int] = {cell: i for i, cell in enumerate(self.m_cells)}
+
+        cellNum = len(self.m_cells)
+        # parent of each cell in the rooted tree (-1 for roots), its depth and which tree of the forest it is in.
+        self.m_parent: List[int] = [-1] * cellNum
+        self.m_depth: List[int] = [0] * cellNum
+        self.m_tree: List[int] = [-1] * cellNum
+        # position of the first occurrence of each cell in the Euler tour
+        self.m_first: List[int] = [0] * cellNum
+        # the Euler tour itself, stored as cell indices
+        self.m_euler: List[int] = list()
+        # whether the passages really form a forest, i.e., the maze is perfect.  If not, distances are only
+        # distances along the spanning tree found by the traversal.
+        self.m_perfect: bool = True
+
+        self.buildEulerTour(maze)
+        self.buildSparseTable()
+
+
+
+    def buildEulerTour(self, maze: Maze3D):
+        """
+        Roots every passage tree and records the Euler tour, iteratively so deep mazes do not hit the recursion limit.
+
+        @param maze: Maze to preprocess.
+        """
+        # adjacency over indices, only following passages (no wall)
+        adjacency: List[List[int]] = [[self.m_cellIndex[neigh] for neigh in maze.neighbours(cell) if not maze.hasWall(cell, neigh)]
+                                      for cell in self.m_cells]
+
+        for root in range(len(self.m_cells)):
+            if self.m_tree[root] != -1:
+                continue
+
+            self.m_tree[root] = root
+            self.m_first[root] = len(self.m_euler)
+            self.m_euler.append(root)
+            # stack of (cell, position of next neighbour to look at)
+            stack: List[List[int]] = [[root, 0]]
+
+            while stack:
+                top = stack[-1]
+                curr, pos = top
+                if pos < len(adjacency[curr]):
+                    top[1] += 1
+                    neigh = adjacency[curr][pos]
+                    if neigh == self.m_parent[curr]:
+                        continue
+                    if self.m_tree[neigh] != -1:
+                        # reached an already visited cell through a different passage, so there is a loop
+                        self.m_perfect = False
+                        continue
+
+                    self.m_tree[neigh] = root
+                    self.m_parent[neigh] = curr
+                    self.m_depth[neigh] = self.m_depth[curr] + 1
+                    self.m_first[neigh] = len(self.m_euler)
+                    self.m_euler.append(neigh)
+                    stack.append([neigh, 0])
+                else:
+                    stack.pop()
+                    if stack:
+                        # returning to the parent, which appears again in the tour
+                        self.m_euler.append(stack[-1][0])
+
+
+
+    def buildSparseTable(self):
+        """
+        Builds the sparse table over the Euler tour.  Row k stores, for each position i, the cell with the smallest
+        depth among the 2^k tour entries starting at i.
+        """
+        tourLen = len(self.m_euler)
+        self.m_log: List[int] = [0] * (tourLen + 1)
+        for i in range(2, tourLen + 1):
+            self.m_log[i] = self.m_log[i // 2] + 1
+
+        depth = self.m_depth
+        self.m_sparse: List[List[int]] = [self.m_euler]
+        k = 1
+        while (1 << k) <= tourLen:
+            prev = self.m_sparse[k-1]
+            half = 1 << (k-1)
+            self.m_sparse.append([prev[i] if depth[prev[i]] <= depth[prev[i + half]] else prev[i + half]
+                                  for i in range(tourLen - (1 << k) + 1)])
+            k += 1
+
+
+
+    def isPerfect(self)->bool:
+        """
+        @returns True if the passages formed a forest, so the answers of the oracle are exact shortest path lengths.
+        """
+        return self.m_perfect
+
+
+
+    def lcaIndex(self, index1: int, index2: int)->int:
+        """
+        @returns Index of the lowest common ancestor of two cell indices, which must be in the same tree.
+        """
+        left = self.m_first[index1]
+        right = self.m_first[index2]
+        if left > right:
+            left, right = right, left
+
+        k = self.m_log[right - left + 1]
+        cand1 = self.m_sparse[k][left]
+        cand2 = self.m_sparse[k][right - (1 << k) + 1]
+        return cand1 if self.m_depth[cand1] <= self.m_depth[cand2] else cand2
+
+
+
+    def lca(self, cell1: Coordinates3D, cell2: Coordinates3D)->Coordinates3D:
+        """
+        @param cell1: One cell.
+        @param cell2: Other cell.
+
+        @returns The lowest common ancestor of the two cells in the rooted passage tree, or None if they are not connected.
+        """
+        index1 = self.m_cellIndex[cell1]
+        index2 = self.m_cellIndex[cell2]
+        if self.m_tree[index1] != self.m_tree[index2]:
+            return None
+
+        return self.m_cells[self.lcaIndex(index1, index2)]
+
+
+
+    def distance(self, cell1: Coordinates3D, cell2: Coordinates3D)->int:
+        """
+        Path length (number of moves) between two cells, in O(1).
+
+        @param cell1: One cell.
+        @param cell2: Other cell.
+
+        @returns Length of the path between cell1 and cell2, or -1 if they are not connected.
+        """
+        index1 = self.m_cellIndex[cell1]
+        index2 = self.m_cellIndex[cell2]
+        if self.m_tree[index1] != self.m_tree[index2]:
+            return -1
+
+        return self.m_depth[index1] + self.m_depth[index2] - 2 * self.m_depth[self.lcaIndex(index1, index2)]
+
+
+
+    def path(self, cell1: Coordinates3D, cell2: Coordinates3D)->Iterator[Coordinates3D]:
+        """
+        Lazily produces the path from cell1 to cell2 (both inclusive).  The half from cell1 up to the LCA is
+        yielded as it is walked; only the half from the LCA down to cell2 needs to be buffered.
+        Nothing is produced if the two cells are not connected.
+
+        @param cell1: Start cell of path.
+        @param cell2: End cell of path.
+        """
+        index1 = self.m_cellIndex[cell1]
+        index2 = self.m_cellIndex[cell2]
+        if self.m_tree[index1] != self.m_tree[index2]:
+            return
+
+        ancestor = self.lcaIndex(index1, index2)
+
+        curr = index1
+        while curr != ancestor:
+            yield self.m_cells[curr]
+            curr = self.m_parent[curr]
+        yield self.m_cells[ancestor]
+
+        downward: List[int] = list()
+        curr = index2
+        while curr != ancestor:
+            downward.append(curr)
+            curr = self.m_parent[curr]
+        for index in reversed(downward):
+            yield self.m_cells[index]
+
+
+
+    def closestPair(self, sources: List[Coordinates3D], targets: List[Coordinates3D])->Tuple[Coordinates3D, Coordinates3D, int]:
+        """
+        Finds the source/target pair with the shortest path between them, e.g., the best entrance and exit pair of
+        Task C, using one O(1) distance query per pair instead of a search per entrance.
+
+        @param sources: Candidate start cells (e.g., entrances).
+        @param targets: Candidate end cells (e.g., exits).
+
+        @returns Tuple of (source, target, distance), or (None, None, -1) if no pair is connected.
+        """
+        best: Tuple[Coordinates3D, Coordinates3D, int] = (None, None, -1)
+        for source in sources:
+            for target in targets:
+                if source == target:
+                    continue
+                dist = self.distance(source, target)
+                if dist >= 0 and (best[2] < 0 or dist < best[2]):
+                    best = (source, target, dist)
+
+        return best
@@ -8,6 +8,7 @@
 # -------------------------------------------------------------------
 
 
+import os
 import sys
 import time
 import json
@@ -22,18 +23,24 @@ from generation.mazeGenerator import MazeGenerator
 
 from maze.util import Coordinates3D
 from maze.maze3D import Maze3D
+from maze.tracing import tracer, TRACE_OFF, TRACE_INFO, TRACE_DEBUG, TRACE_STEP
+from maze.profiling import PhaseProfiler, DEFAULT_TOP_NUM
 
 
 
-# this checks if Visualizer has been imported properly.
-# if not, likely missing some packages, e.g., matplotlib.
-# in that case, regardless of visualisation flag, we should set the canVisualise flag to False which will not call the visuslisation part.
-canVisualise = True
-try:
-	from maze.maze_viz import Visualizer
-except:
-	Visualizer = None
-	canVisualise = False
+def loadVisualizer():
+	"""
+	Imports Visualizer when it is needed, rather than at start up, as importing matplotlib takes longer than short runs
+	without visualisation do.
+	This checks if Visualizer can be imported properly.
+	If not, likely missing some packages, e.g., matplotlib; in that case None is returned, and the visualisation part
+	isn't called.
+	"""
+	try:
+		from maze.maze_viz import Visualizer
+	except:
+		return None
+	return Visualizer
 
 
 
@@ -44,10 +51,29 @@ def usage():
 
 	# On Teaching servers, use 'python3'
 	# On Windows, you may need to use 'python' instead of 'python3' to get this to work
-	print('python3 mazeTester2.py', '<configuration file>')
+	print('python3 mazeTester2.py', '<configuration file>', '[--profile [<output directory>]]')
+	print('python3 mazeTester2.py', '--engines [<benchmark results file>]')
 	sys.exit(1)
 
 
+
+def listEngines(benchmarkFile: str = None):
+	"""
+	Print the registered generators and solvers, with their metadata and recorded benchmark numbers.
+
+	@param benchmarkFile: Results of the benchmark suite to take the numbers from.  Default is None, which uses
+		benchmarks/results.json if there is one.
+	"""
+	from engineRegistry import registry
+
+	if benchmarkFile == None:
+		defaultFile: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'results.json')
+		if os.path.exists(defaultFile):
+			benchmarkFile = defaultFile
+	for line in registry.describe(benchmarkFile):
+		print(line)
+
+
 #
 # Main function, when the python script is executed, we execute this.
 #
@@ -55,7 +81,15 @@ if __name__ == '__main__':
 	# Fetch the command line arguments
 	args = sys.argv
 
-	if len(args) != 2:
+	if len(args) in [2, 3] and args[1] == '--engines':
+		listEngines(args[2] if len(args) == 3 else None)
+		sys.exit(0)
+
+	# Optional: --profile after the configuration file, the same as the profile key of the configuration
+	profileArg = None
+	if len(args) in [3, 4] and args[2] == '--profile':
+		profileArg = args[3] if len(args) == 4 else True
+	elif len(args) != 2:
 		print('Incorrect number of arguments.')
 		usage()
 
@@ -90,10 +124,66 @@ if __name__ == '__main__':
 		outFilename : str = None
 		if 'fileOutput' in configDict.keys():
 			outFilename = configDict['fileOutput']
+		# Optional: Renderer to visualise with, "matplotlib" (default) or "raster" (writes fileOutput as a PNG with
+		# NumPy only, for headless runs).  A fileOutput ending in .svg is always written with the SVG renderer.
+		renderer: str = 'matplotlib'
+		if 'renderer' in configDict.keys():
+			renderer = configDict['renderer']
+		# Optional: Directory to write a tiled, zoomable image pyramid of each level to, with a viewer page (index.html);
+		# rendering into the same directory again only redoes the tiles whose walls changed
+		tileDir: str = None
+		if 'tileOutput' in configDict.keys():
+			tileDir = configDict['tileOutput']
+		# Optional: Animated replay of the solver to export, a GIF if it ends with .gif, otherwise a directory of numbered
+		# PNG frames; replayStepsPerFrame (default 1) is how many solver steps each frame advances by
+		replayOutput: str = None
+		if 'replayOutput' in configDict.keys():
+			replayOutput = configDict['replayOutput']
+		replayStepsPerFrame: int = 1
+		if 'replayStepsPerFrame' in configDict.keys():
+			replayStepsPerFrame = configDict['replayStepsPerFrame']
 		# Optional: Seed to pass to random generator (used for validation)
 		randSeed: int = None
 		if 'randSeed' in configDict.keys():
 			randSeed = configDict['randSeed']
+		# Optional: File to load/save the landmark preprocessing of A* style solvers (e.g., 'astar')
+		landmarkFile: str = None
+		if 'landmarkFile' in configDict.keys():
+			landmarkFile = configDict['landmarkFile']
+
+
+		# Optional: Directory of cached results of deterministic solvers, reused when the same maze is solved again
+		# imported only when used, like the selected generator and solver, to keep start up fast
+		resultCache = None
+		if 'resultCache' in configDict.keys():
+			from solving.resultCache import SolverResultCache
+			resultCache = SolverResultCache(configDict['resultCache'])
+
+
+		# Optional: Trace level of generators and solvers ("off", "info", "debug" or "step").  Default is off, so timings
+		# measure the algorithms rather than the terminal.
+		traceLevel: str = 'off'
+		if 'traceLevel' in configDict.keys():
+			traceLevel = configDict['traceLevel']
+		tracer.setLevel({'off': TRACE_OFF, 'info': TRACE_INFO, 'debug': TRACE_DEBUG, 'step': TRACE_STEP}[traceLevel])
+		# Optional: Filename of binary trace of the cells visited, see maze.tracing.readTrace(); recorded whatever the
+		# traceLevel is
+		if 'traceFile' in configDict.keys():
+			tracer.openSink(configDict['traceFile'])
+
+
+		# Optional: Profile each phase of the run (initCells, generateMaze, carve, solveMaze and visualise) with cProfile,
+		# true to write the profiles to the directory 'profile' or the directory to write them to; each phase is saved as
+		# <phase>.pstats, with a summary of the profileTopNum (default 15) hottest functions of each phase.  Profiling
+		# slows the run down, so the times printed are only comparable to other profiled runs.
+		if profileArg == None and 'profile' in configDict.keys():
+			profileArg = configDict['profile']
+		profileDir: str = None
+		if profileArg == True:
+			profileDir = 'profile'
+		elif isinstance(profileArg, str):
+			profileDir = profileArg
+		profiler: PhaseProfiler = PhaseProfiler(profileDir, configDict.get('profileTopNum', DEFAULT_TOP_NUM))
 
 
 		# initialise the random seed generator 
@@ -105,6 +195,8 @@ if __name__ == '__main__':
 		# Initialise maze object.
 		#
 		maze: Maze3D = Maze3D(levelSpecs)
+		# the generators initialise the cells of the maze themselves, profile it as a phase of its own
+		profiler.wrap(maze, 'initCells')
 
 		# Store the entrances and exits.
 		for [l,r,c] in entrances:
@@ -126,6 +218,15 @@ if __name__ == '__main__':
 			print('{} is an unknown solver approach.'.format(solverApproach))
 			usage()  
 
+		# Optional: Number of solver path steps to keep in memory before spilling the rest to disk
+		if 'spillThreshold' in configDict.keys():
+			solver.setSpillThreshold(configDict['spillThreshold'])
+
+		# Optional: Budget of the solver, the maximum number of cells to explore and/or seconds to solve for
+		hasBudget: bool = 'maxCells' in configDict.keys() or 'maxSeconds' in configDict.keys()
+		if hasBudget:
+			solver.setBudget(configDict.get('maxCells'), configDict.get('maxSeconds'))
+
 
 		# 
 		# Construct maze generator.  There are two ways to call generator.match, depending if it is for taskD or
@@ -155,7 +256,9 @@ if __name__ == '__main__':
 		# timer for generation
 		startGenTime : float = time.perf_counter()
 
+		profiler.start('generateMaze')
 		generator.generateMaze(maze)
+		profiler.stop('generateMaze')
 
 		# stop timer
 		endGenTime: float = time.perf_counter()
@@ -163,8 +266,22 @@ if __name__ == '__main__':
 		print(f'Generation took {endGenTime - startGenTime:0.4f} seconds')
 
 		# carve out the entrances and exits
+		profiler.start('carve')
 		maze.carveEntrances()
 		maze.carveExits()
+		profiler.stop('carve')
+
+		# reuse the landmark preprocessing saved by a previous run on the same maze, or compute and save it
+		useLandmarks: bool = landmarkFile != None and generator.isMazeGenerated() and hasattr(solver, 'setHeuristic')
+		if useLandmarks:
+			from solving.altHeuristic import LandmarkTable
+			startLandmarkTime: float = time.perf_counter()
+			landmarkTable = LandmarkTable.load(landmarkFile, maze)
+			if landmarkTable == None:
+				landmarkTable = LandmarkTable(maze)
+				landmarkTable.save(landmarkFile)
+			solver.setHeuristic(landmarkTable.heuristic(maze.getExits()))
+			print(f'Landmark preprocessing took {time.perf_counter() - startLandmarkTime:0.4f} seconds')
 
 
 
@@ -182,17 +299,36 @@ if __name__ == '__main__':
 			# time for solving
 			startSolveTime : float = time.perf_counter()
 
+			# results of deterministic solvers can be reused; the landmark heuristic changes the cells A* explores
+			cacheKey: str = None
+			cachedResult: dict = None
+			if resultCache != None and solver.isDeterministic() and not hasBudget:
+				cacheKey = SolverResultCache.makeKey(maze, solverApproach + ('-alt' if useLandmarks else ''),
+					mazeEntrances[solverEntIndex] if solverEntIndex != None else None, randSeed)
+				cachedResult = resultCache.lookup(cacheKey)
+
+			profiler.start('solveMaze')
+			if cachedResult != None:
+				resultCache.restore(cachedResult, solver, maze)
+				print('Solver result loaded from cache.')
 			# Task A, B and D mode, where we specify the entrance
-			if solverEntIndex != None:
+			elif solverEntIndex != None:
 				solver.solveMaze(maze, mazeEntrances[solverEntIndex])
 			else:
 				# Task C, where it is part of the task to find the "best" entrances and exits
 				solver.solveMaze(maze)
+			profiler.stop('solveMaze')
+
 			
 			# stop timer
 			endSolveTime: float = time.perf_counter()
 
+			if cacheKey != None and cachedResult == None:
+				resultCache.store(cacheKey, solver)
+
 			print(f'Solving took {endSolveTime - startSolveTime:0.4f} seconds')
+			if solver.isBudgetExhausted():
+				print('Solver ran out of budget before solving the maze.')
 			print(f'Solver explored {solver.getCellsExplored()} number of cells.')
 			print('Solver used Entrance {entrance} and Exit {exit}.'.format(entrance=solver.getEntranceUsed(), exit=solver.getExitUsed()))
 		else:
@@ -202,13 +338,48 @@ if __name__ == '__main__':
 		#
 		# Display maze.
 		#
-		if bVisualise and canVisualise and generator.isMazeGenerated():
-			cellSize = 1
-			visualiser = Visualizer(maze, solver, cellSize) 
+		# renderers are imported only when used, to keep start up fast
+		profiler.start('visualise')
+		if bVisualise and outFilename != None and outFilename.lower().endswith('.svg') and generator.isMazeGenerated():
+			from maze.svgRenderer import SvgRenderer
+			SvgRenderer(maze, solver).save(outFilename)
+		elif bVisualise and renderer == 'raster' and generator.isMazeGenerated():
 			if outFilename == None:
-				visualiser.show_maze()
+				print('The raster renderer needs a fileOutput to write the image to.')
+			else:
+				from maze.rasterRenderer import RasterRenderer
+				RasterRenderer(maze, solver).save(outFilename)
+		elif bVisualise and generator.isMazeGenerated():
+			Visualizer = loadVisualizer()
+			if Visualizer != None:
+				cellSize = 1
+				visualiser = Visualizer(maze, solver, cellSize) 
+				if outFilename == None:
+					visualiser.show_maze()
+				else:
+					visualiser.show_maze(outFilename)
+
+		if tileDir != None and generator.isMazeGenerated():
+			from maze.tileRenderer import TileRenderer
+			tileNum: int = TileRenderer(maze, tileDir).render()
+			print(f'Wrote {tileNum} tiles to {tileDir}.')
+
+		if replayOutput != None and generator.isMazeGenerated():
+			from maze.replayExporter import ReplayExporter
+			replay = ReplayExporter(maze, solver, stepsPerFrame=replayStepsPerFrame)
+			if replayOutput.lower().endswith('.gif'):
+				frameNum: int = replay.saveGif(replayOutput)
 			else:
-				visualiser.show_maze(outFilename)
+				frameNum: int = replay.saveFrames(replayOutput)
+			print(f'Wrote {frameNum} replay frames to {replayOutput}.')
+		profiler.stop('visualise')
+
+		if profiler.isEnabled():
+			for line in profiler.save():
+				print(line)
+			print(f'Profiles of each phase written to {profileDir}.')
+
+		tracer.closeSink()
 
 
 
@@ -8,16 +8,15 @@
 
 
 
-from solving.recurBackMazeSolver import RecurBackMazeSolver
-from solving.wallFollowingSolver import WallFollowingMazeSolver
-from solving.pledgeSolver import PledgeMazeSolver
-from solving.taskCMazeSolver import TaskCMazeSolver
 from solving.mazeSolver import MazeSolver
+from engineRegistry import registry, SOLVER
 
 
 class SolverSelector:
     """
     Class used to select and construct appropriate maze solver.
+    Solvers are looked up in the engine registry (see engineRegistry.py), which only imports a solver's module when it
+    is constructed, so short runs don't pay for the ones not used.
     """
 
 
@@ -30,17 +29,8 @@ class SolverSelector:
         
         @return: Instance of a maze generator.
         """
-        solver: MazeSolver = None
-
-        if solverApproach == 'recur':
-            solver = RecurBackMazeSolver()
-        elif solverApproach == 'wall':
-            solver = WallFollowingMazeSolver()
-        elif solverApproach == 'pledge':
-            solver = PledgeMazeSolver()
-        elif solverApproach == 'taskC':
-            solver = TaskCMazeSolver()
-        # TODO: If you implement other solvers, you can add them here
+        # TODO: If you implement other solvers, register them in engineRegistry.registerBuiltins()
+        solver: MazeSolver = registry.construct(SOLVER, solverApproach)
 
         return solver
     
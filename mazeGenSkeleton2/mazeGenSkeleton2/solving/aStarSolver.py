@@ -0,0 +1,203 @@
+# -------------------------------------------------------------------
+# A* maze solver, over the compact (flat cell id) view of the maze.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+from heapq import heappush, heappop
+from typing import Iterator, List, Tuple
+
+from maze.maze3D import Maze3D
+from solving.mazeSolver import MazeSolver
+from maze.util import Coordinates3D
+
+
+class ManhattanExitHeuristic:
+    """
+    A* heuristic estimating the distance to the closest of several goals (e.g., all the exits), as the minimum over
+    the goals of the Manhattan distance.  Moving between levels can be weighted, as in practice a level change needs a
+    detour to a stair; a weight above 1 makes the search greedier at the cost of no longer guaranteeing shortest paths.
+    """
+
+    def __init__(self, maze: Maze3D, goals: List[Coordinates3D], levelWeight: float = 1):
+        """
+        Constructor.
+
+        @param maze: Maze the heuristic is for.
+        @param goals: Cells we want to estimate the distance to.
+        @param levelWeight: Weight of each level of distance.  Default is 1, which keeps the heuristic admissible.
+        """
+        offsets: List[int] = maze.directionOffsets()
+        self.m_levelStride: int = offsets[Maze3D.DIRECTIONS.index((1, 0, 0))]
+        self.m_rowStride: int = offsets[Maze3D.DIRECTIONS.index((0, 1, 0))]
+        # goals as (level, row, column) decoded from their cell ids the same way estimate() decodes cells, so both are
+        # shifted by the boundary cells alike
+        self.m_goals: List[Tuple[int, int, int]] = [self.decode(maze.cellId(goal)) for goal in goals]
+        # the only goal, as most mazes have a single exit, or None if there are several (or none)
+        self.m_goal: Tuple[int, int, int] = self.m_goals[0] if len(self.m_goals) == 1 else None
+        self.m_levelWeight = levelWeight
+
+
+
+    def decode(self, cellId: int)->Tuple[int, int, int]:
+        """
+        @returns (level, row + 1, column + 1) of the cell with flat id cellId.
+        """
+        (level, rest) = divmod(cellId, self.m_levelStride)
+        (row, col) = divmod(rest, self.m_rowStride)
+        return (level, row, col)
+
+
+
+    def estimate(self, cellId: int)->float:
+        """
+        @param cellId: Flat id of cell to estimate from.
+
+        @returns Estimated distance from the cell to the closest goal.
+        """
+        (level, rest) = divmod(cellId, self.m_levelStride)
+        (row, col) = divmod(rest, self.m_rowStride)
+        levelWeight: float = self.m_levelWeight
+        if self.m_goal != None:
+            (goalLevel, goalRow, goalCol) = self.m_goal
+            return levelWeight * abs(level - goalLevel) + abs(row - goalRow) + abs(col - goalCol)
+
+        best: float = None
+        for (goalLevel, goalRow, goalCol) in self.m_goals:
+            dist: float = levelWeight * abs(level - goalLevel) + abs(row - goalRow) + abs(col - goalCol)
+            if best == None or dist < best:
+                best = dist
+        return 0 if best == None else best
+
+
+
+def aStarExpansions(maze: Maze3D, startId: int, goalIds: set, heuristic, masks: bytearray = None, parents: dict = None)->Iterator[int]:
+    """
+    A* search over flat cell ids, only moving through passages (walls are respected), as a generator of the cells
+    it expands, in order.  The search stops after expanding the first goal, which is hence the last cell yielded.
+    The open list is a heapq of (f, tie breaker, cell id) tuples, where the tie breaker is an increasing integer, so
+    comparisons never fall back to anything but integers.
+
+    @param maze: Maze to search.
+    @param startId: Flat id of the start cell.
+    @param goalIds: Set of flat ids of goal cells; the search stops at the first one expanded.
+    @param heuristic: Object with an estimate(cellId) method, e.g., ManhattanExitHeuristic.
+    @param masks: Passage masks to search over instead of maze.openMasks(), e.g., a maze pruned by pruneDeadEnds().
+    @param parents: Dictionary to fill with the parent map over cell ids, if the caller wants to trace paths back.
+
+    @returns Generator of the cell ids expanded.
+    """
+    if masks == None:
+        masks = maze.openMasks()
+    if parents == None:
+        parents = dict()
+    offsetTable: List[List[int]] = maze.passageOffsetTable()
+
+    parents[startId] = -1
+    costs: dict[int, int] = {startId: 0}
+    closed: set[int] = set()
+
+    tieBreaker = 0
+    openList: List[Tuple[float, int, int]] = [(heuristic.estimate(startId), tieBreaker, startId)]
+
+    while openList:
+        _, _, curr = heappop(openList)
+        if curr in closed:
+            # stale entry, the cell was pushed again with a lower cost
+            continue
+        closed.add(curr)
+        yield curr
+
+        if curr in goalIds:
+            return
+
+        newCost = costs[curr] + 1
+        for offset in offsetTable[masks[curr]]:
+            neigh = curr + offset
+            if neigh not in closed and newCost < costs.get(neigh, newCost + 1):
+                costs[neigh] = newCost
+                parents[neigh] = curr
+                tieBreaker += 1
+                heappush(openList, (newCost + heuristic.estimate(neigh), tieBreaker, neigh))
+
+
+
+def aStarSearch(maze: Maze3D, startId: int, goalIds: set, heuristic, masks: bytearray = None)->Tuple[dict, int, List[int]]:
+    """
+    Runs a complete A* search, see aStarExpansions().
+
+    @returns Tuple of (parent map over cell ids, goal reached or -1 if none reachable, cell ids in expansion order).
+    """
+    parents: dict[int, int] = dict()
+    expanded: List[int] = list(aStarExpansions(maze, startId, goalIds, heuristic, masks, parents))
+    goalId: int = expanded[-1] if expanded and expanded[-1] in goalIds else -1
+    return parents, goalId, expanded
+
+
+
+def reconstructIdPath(parents: dict, goalId: int)->List[int]:
+    """
+    @param parents: Parent map returned by aStarSearch().
+    @param goalId: Cell id to trace back from.
+
+    @returns The path of cell ids from the start of the search to goalId.
+    """
+    path: List[int] = list()
+    curr = goalId
+    while curr != -1:
+        path.append(curr)
+        curr = parents[curr]
+    path.reverse()
+    return path
+
+
+
+class AStarMazeSolver(MazeSolver):
+    """
+    A* solver implementation.  Searches from the entrance towards whichever exit is closest, using the minimum
+    Manhattan distance over all exits as the heuristic unless another heuristic is provided via setHeuristic().
+    The solver path records the cells in the order A* expanded them.
+    """
+
+    def __init__(self, levelWeight: float = 1):
+        """
+        Constructor.
+
+        @param levelWeight: Weight of level distance in the default heuristic, see ManhattanExitHeuristic.
+        """
+        super().__init__()
+        self.m_name = "astar"
+        self.m_deterministic = True
+        self.m_levelWeight = levelWeight
+        # heuristic to use instead of the default one, should be built for the maze being solved
+        self.m_heuristic = None
+
+
+
+    def setHeuristic(self, heuristic):
+        """
+        Sets the heuristic to use in subsequent solves.
+
+        @param heuristic: Object with an estimate(cellId) method, or None to use the default heuristic.
+        """
+        self.m_heuristic = heuristic
+
+
+
+    def solveStepIds(self, maze: Maze3D, entrance: Coordinates3D):
+        self.m_solved = False
+        self.resetPathAndCellExplored(maze)
+        self.m_entranceUsed = entrance
+        self.m_exitUsed = None
+
+        exits: List[Coordinates3D] = maze.getExits()
+        heuristic = self.m_heuristic
+        if heuristic == None:
+            heuristic = ManhattanExitHeuristic(maze, exits, self.m_levelWeight)
+
+        exitIds: set = set([maze.cellId(ext) for ext in exits])
+        for cellId in aStarExpansions(maze, maze.cellId(entrance), exitIds, heuristic):
+            yield self.recordStepId(cellId, False)
+            if cellId in exitIds:
+                self.solved(entrance, maze.cellFromId(cellId))
@@ -0,0 +1,204 @@
+# -------------------------------------------------------------------
+# ALT (A*, Landmarks and Triangle inequality) heuristic for repeated queries on the same maze.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import struct
+import zlib
+from array import array
+from typing import List
+
+from maze.maze3D import Maze3D
+from maze.util import Coordinates3D
+
+
+class LandmarkTable:
+    """
+    Landmark preprocessing.  Picks k landmarks and stores the BFS (passage) distance from each landmark to every cell.
+    By the triangle inequality, |d(L, goal) - d(L, cell)| is a lower bound on d(cell, goal) for any landmark L, which
+    is a much tighter estimate than Manhattan distance once walls and level changes are taken into account.
+    The table can be saved to a file and loaded again by later runs on the same maze.
+    """
+
+    # identifies files written by save()
+    FILE_MAGIC = b'ALT1'
+    # magic, checksum of the passage masks, number of cell ids, number of landmarks
+    HEADER_FORMAT = '<4sIii'
+
+
+    def __init__(self, maze: Maze3D, landmarkNum: int = 8, landmarkIds: List[int] = None):
+        """
+        Constructor.  Runs the BFS from each landmark, so the maze should be generated and carved already.
+
+        @param maze: Maze to preprocess.
+        @param landmarkNum: Number of landmarks (k) to pick.  Default is 8.
+        @param landmarkIds: Cell ids of the landmarks to use, instead of picking them.  Default is None.
+        """
+        self.m_maze = maze
+        self.m_checksum: int = zlib.crc32(maze.openMasks())
+        if landmarkIds == None:
+            landmarkIds = self.pickLandmarks(maze, landmarkNum)
+        self.m_landmarks: List[int] = landmarkIds
+        # one distance array per landmark, indexed by cell id, -1 where a cell can't be reached from the landmark
+        self.m_distances: List[array] = [self.bfsDistances(maze, landmark) for landmark in landmarkIds]
+
+
+
+    @staticmethod
+    def pickLandmarks(maze: Maze3D, landmarkNum: int)->List[int]:
+        """
+        Picks landmarks among the entrances, exits and the corners of each level, in that order, skipping duplicates.
+        Landmarks at the periphery of the maze give the best bounds, as most shortest paths run "away" from them.
+
+        @param maze: Maze to pick landmarks for.
+        @param landmarkNum: Maximum number of landmarks to pick.
+
+        @returns Cell ids of the landmarks.
+        """
+        candidates: List[Coordinates3D] = list(maze.getEntrances()) + list(maze.getExits())
+        for level in range(maze.levelNum()):
+            lastRow = maze.rowNum(level) - 1
+            lastCol = maze.colNum(level) - 1
+            candidates += [Coordinates3D(level, 0, 0), Coordinates3D(level, lastRow, lastCol),
+                           Coordinates3D(level, 0, lastCol), Coordinates3D(level, lastRow, 0)]
+
+        landmarks: List[int] = list()
+        for cell in candidates:
+            cellId = maze.cellId(cell)
+            if cellId not in landmarks and len(landmarks) < landmarkNum:
+                landmarks.append(cellId)
+
+        return landmarks
+
+
+
+    @staticmethod
+    def bfsDistances(maze: Maze3D, sourceId: int)->array:
+        """
+        @param maze: Maze to search.
+        @param sourceId: Cell id to compute the distances from.
+
+        @returns Array of passage distances from sourceId, indexed by cell id (-1 if unreachable).
+        """
+        masks: bytearray = maze.openMasks()
+        offsetTable: List[List[int]] = maze.passageOffsetTable()
+        dist: array = array('i', [-1]) * maze.cellIdNum()
+
+        dist[sourceId] = 0
+        queue: List[int] = [sourceId]
+        head = 0
+        while head < len(queue):
+            curr = queue[head]
+            head += 1
+            nextDist = dist[curr] + 1
+            for offset in offsetTable[masks[curr]]:
+                neigh = curr + offset
+                if dist[neigh] < 0:
+                    dist[neigh] = nextDist
+                    queue.append(neigh)
+
+        return dist
+
+
+
+    def heuristic(self, goals: List[Coordinates3D]):
+        """
+        @param goals: Cells the heuristic should estimate the distance to (e.g., the exits).
+
+        @returns ALTHeuristic for these goals, which can be passed to any A* style solver (e.g., AStarMazeSolver.setHeuristic()).
+        """
+        return ALTHeuristic(self, [self.m_maze.cellId(goal) for goal in goals])
+
+
+
+    def save(self, fileName: str):
+        """
+        Saves the landmark table, so later runs on the same maze can load it instead of redoing the BFS.
+
+        @param fileName: Name of file to write to.
+        """
+        with open(fileName, 'wb') as outFile:
+            outFile.write(struct.pack(self.HEADER_FORMAT, self.FILE_MAGIC, self.m_checksum, self.m_maze.cellIdNum(), len(self.m_landmarks)))
+            array('i', self.m_landmarks).tofile(outFile)
+            for dist in self.m_distances:
+                dist.tofile(outFile)
+
+
+
+    @classmethod
+    def load(cls, fileName: str, maze: Maze3D):
+        """
+        Loads a landmark table saved by save().
+
+        @param fileName: Name of file to read from.
+        @param maze: Maze the table should be for.
+
+        @returns The loaded LandmarkTable, or None if the file doesn't exist or was saved for a different maze.
+        """
+        try:
+            with open(fileName, 'rb') as inFile:
+                header = inFile.read(struct.calcsize(cls.HEADER_FORMAT))
+                if len(header) != struct.calcsize(cls.HEADER_FORMAT):
+                    return None
+                (magic, checksum, cellIdNum, landmarkNum) = struct.unpack(cls.HEADER_FORMAT, header)
+                if magic != cls.FILE_MAGIC or checksum != zlib.crc32(maze.openMasks()) or cellIdNum != maze.cellIdNum():
+                    return None
+
+                landmarks: array = array('i')
+                landmarks.fromfile(inFile, landmarkNum)
+                distances: List[array] = list()
+                for _ in range(landmarkNum):
+                    dist: array = array('i')
+                    dist.fromfile(inFile, cellIdNum)
+                    distances.append(dist)
+        except (OSError, EOFError):
+            return None
+
+        # bypass the constructor, as we don't want to redo the BFS
+        table = cls.__new__(cls)
+        table.m_maze = maze
+        table.m_checksum = checksum
+        table.m_landmarks = list(landmarks)
+        table.m_distances = distances
+        return table
+
+
+
+class ALTHeuristic:
+    """
+    A* heuristic using the landmark distances of a LandmarkTable.  For several goals, the estimate is the minimum over
+    the goals of the best landmark lower bound, so it remains admissible.
+    """
+
+    def __init__(self, table: LandmarkTable, goalIds: List[int]):
+        """
+        Constructor.
+
+        @param table: Preprocessed landmark distances.
+        @param goalIds: Cell ids of the goals.
+        """
+        # keep (landmark distance array, landmark-to-goal distance) pairs for each goal, skipping unreachable goals
+        self.m_goalDists: List[List[tuple]] = [[(dist, dist[goal]) for dist in table.m_distances if dist[goal] >= 0]
+                                              for goal in goalIds]
+
+
+
+    def estimate(self, cellId: int)->int:
+        """
+        @param cellId: Flat id of cell to estimate from.
+
+        @returns Lower bound on the distance from the cell to the closest goal.
+        """
+        best = -1
+        for goalDists in self.m_goalDists:
+            bound = 0
+            for (dist, goalDist) in goalDists:
+                cellDist = dist[cellId]
+                if cellDist >= 0 and abs(goalDist - cellDist) > bound:
+                    bound = abs(goalDist - cellDist)
+            if best < 0 or bound < best:
+                best = bound
+
+        return max(best, 0)
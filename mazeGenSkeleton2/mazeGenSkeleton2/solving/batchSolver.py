@@ -0,0 +1,135 @@
+# -------------------------------------------------------------------
+# Parallel batch solving of one maze, shared between worker processes.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import random
+import time
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+from maze.maze3D import Maze3D
+from maze.sharedMaze import MaskMaze3D
+from maze.util import Coordinates3D
+from solverSelector import SolverSelector
+
+
+# maze attached to the shared passage masks, one per worker process (set by attachSharedMaze())
+workerMaze: MaskMaze3D = None
+# shared memory block workerMaze is attached to, kept open for the lifetime of the worker
+workerBlock: shared_memory.SharedMemory = None
+# (maxCells, maxSeconds) budget of every job, see MazeSolver.setBudget()
+workerBudget: Tuple[int, float] = (None, None)
+
+
+
+def attachSharedMaze(blockName: str, levelDims: List[Tuple[int, int]], entrances: List[Tuple[int, int, int]],
+                     exits: List[Tuple[int, int, int]], budget: Tuple[int, float] = (None, None)):
+    """
+    Pool initialiser: attaches the worker to the published passage masks, without copying them, and builds the
+    maze view the jobs of this worker solve.
+
+    @param blockName: Name of the shared memory block holding the passage masks.
+    @param levelDims: Specifications of each level of the maze.
+    @param entrances: Entrances of the maze, as (level, row, col) tuples.
+    @param exits: Exits of the maze, as (level, row, col) tuples.
+    @param budget: (maxCells, maxSeconds) budget of each job.
+    """
+    global workerMaze, workerBlock, workerBudget
+
+    workerBudget = budget
+
+    # pool workers share the resource tracker of the publishing process, which unlinks the block
+    workerBlock = shared_memory.SharedMemory(name=blockName)
+    workerMaze = MaskMaze3D(levelDims, workerBlock.buf)
+    for (level, row, col) in entrances:
+        workerMaze.storeEntrance(Coordinates3D(level, row, col))
+    for (level, row, col) in exits:
+        workerMaze.storeExit(Coordinates3D(level, row, col))
+
+
+
+def solveJob(job: Tuple[str, Tuple[int, int, int], int])->dict:
+    """
+    Solves the shared maze once, in a worker.
+
+    @param job: Tuple of (solver name, entrance as (level, row, col) or None for Task C solving, seed).
+
+    @returns Dictionary with the job's solver, entrance, seed, outcome ('solved', 'unsolved', or 'budget' if it ran
+        out of budget), whether it solved the maze, the cells explored, the entrance and exit used (as (level, row, col)
+        tuples, or None) and the time taken to solve, in seconds.
+    """
+    (solverName, entrance, seed) = job
+    solver = SolverSelector().construct(solverName)
+    result: dict = {'solver': solverName, 'entrance': entrance, 'seed': seed}
+    if solver == None:
+        result['error'] = 'unknown solver'
+        return result
+
+    solver.setBudget(*workerBudget)
+    random.seed(seed)
+    startTime = time.perf_counter()
+    if entrance == None:
+        solver.solveMazeTaskC(workerMaze)
+    else:
+        solver.solveMaze(workerMaze, Coordinates3D(*entrance))
+    result['seconds'] = time.perf_counter() - startTime
+
+    result['outcome'] = 'solved' if solver.isSolved() else 'budget' if solver.isBudgetExhausted() else 'unsolved'
+    result['solved'] = solver.isSolved()
+    result['cellsExplored'] = solver.getCellsExplored()
+    result['entranceUsed'] = cellTuple(solver.getEntranceUsed())
+    result['exitUsed'] = cellTuple(solver.getExitUsed())
+    solver.getSolverPath().close()
+
+    return result
+
+
+
+def cellTuple(cell: Coordinates3D)->Tuple[int, int, int]:
+    """
+    @returns The (level, row, col) tuple of cell, or None if cell is None.
+    """
+    if cell == None:
+        return None
+    return (cell.getLevel(), cell.getRow(), cell.getCol())
+
+
+
+def batchSolve(maze: Maze3D, jobs: List[Tuple[str, Coordinates3D, int]], processNum: int = None, maxCells: int = None,
+               maxSeconds: float = None)->List[dict]:
+    """
+    Solves the same maze for many (solver name, entrance, seed) jobs in a process pool.
+    The passage masks of the maze (one byte per cell, see Maze3D.openMasks()) are published once to shared memory,
+    and every worker attaches to them when it starts, so neither the maze nor its graph is pickled or copied per job.
+    Workers solve over the masks, so the jobs should use the solvers that work on the compact view (wall, pledge,
+    astar, deadend); the others work too, but more slowly, and as they see neighbours in passage order rather than
+    graph order, may explore in a different order than on the original maze.
+
+    @param maze: Generated maze to solve.
+    @param jobs: List of (solver name, entrance, seed) tuples.  The entrance is a Coordinates3D, a (level, row, col)
+        tuple, or None to solve as in Task C.  The seed seeds Python's random number generator before solving.
+    @param processNum: Number of worker processes.  Default is None, which uses the number of CPUs.
+    @param maxCells: Maximum number of cells each job may explore.  Default is None, no limit.
+    @param maxSeconds: Maximum time each job may solve for, in seconds.  Default is None, no limit.  A job running out
+        of budget stops with outcome 'budget' rather than holding up the batch.
+
+    @returns One result dictionary per job, in the order of jobs, see solveJob().
+    """
+    masks = maze.openMasks()
+    block = shared_memory.SharedMemory(create=True, size=len(masks))
+    try:
+        block.buf[:len(masks)] = masks
+        initArgs = (block.name, maze.m_levelDims, [cellTuple(cell) for cell in maze.getEntrances()],
+                    [cellTuple(cell) for cell in maze.getExits()], (maxCells, maxSeconds))
+        jobTuples = [(solverName, cellTuple(entrance) if isinstance(entrance, Coordinates3D) else entrance, seed)
+                     for (solverName, entrance, seed) in jobs]
+
+        with Pool(processNum, initializer=attachSharedMaze, initargs=initArgs) as pool:
+            return pool.map(solveJob, jobTuples)
+    finally:
+        block.close()
+        block.unlink()
@@ -0,0 +1,150 @@
+# -------------------------------------------------------------------
+# Dead end filling maze solver, and dead end pruning of mazes.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+try:
+    import numpy as np
+except:
+    np = None
+
+import time
+from collections import deque
+from typing import List, Tuple
+
+from maze.maze3D import Maze3D
+from solving.mazeSolver import MazeSolver
+from maze.util import Coordinates3D
+
+
+def pruneDeadEnds(maze: Maze3D, deadline: float = None, maxFilled: int = None)->Tuple[bytearray, int, bool]:
+    """
+    Removes all dead ends of the maze with vectorised sweeps, leaving only the corridors that connect the entrances
+    and exits.  The number of open passages (degree) of each cell is computed from the passage masks; every sweep
+    removes all the degree 1 cells that are not entrances or exits at once, and the next sweep only has to look at the
+    neighbours of the cells just removed.  All levels are processed together, since stairs join them.
+
+    Requires NumPy.  The maze itself is not changed.
+
+    @param maze: Maze to prune, with its entrances and exits carved.
+    @param deadline: time.perf_counter() time to stop at, checked between sweeps, or None for no limit (the
+        default).
+    @param maxFilled: Maximum number of cells to fill in, or None for no limit (the default).
+
+    @returns Tuple of (passage masks of the pruned maze, number of cells filled in, whether all dead ends were filled
+        in before the deadline or maxFilled was reached).  The masks are in the same layout as maze.openMasks(), so any
+        solver working on passage masks can run on the much smaller remaining graph; removed cells have a mask of 0.
+    """
+    directionNum = len(Maze3D.DIRECTIONS)
+    masks = np.frombuffer(bytes(maze.openMasks()), dtype=np.uint8).copy()
+    offsets = np.array(maze.directionOffsets(), dtype=np.int64)
+    opposite = np.array(Maze3D.OPPOSITE, dtype=np.int64)
+    bits = np.left_shift(1, np.arange(directionNum)).astype(np.uint8)
+
+    # degree of each cell, via a popcount lookup table of the 64 possible masks
+    popcount = np.array([bin(mask).count('1') for mask in range(1 << directionNum)], dtype=np.int8)
+    degree = popcount[masks]
+    # entrances and exits are never filled in
+    protected = np.zeros(maze.cellIdNum(), dtype=bool)
+    protected[[maze.cellId(cell) for cell in list(maze.getEntrances()) + list(maze.getExits())]] = True
+
+    filledNum: int = 0
+    complete: bool = True
+    candidates = np.flatnonzero((degree == 1) & ~protected)
+    while candidates.size > 0:
+        if deadline != None and time.perf_counter() > deadline:
+            complete = False
+            break
+        # a cell can become a dead end more than once in a sweep only via duplicates, which unique() drops
+        deadEnds = np.unique(candidates[(degree[candidates] == 1) & ~protected[candidates]])
+        if deadEnds.size == 0:
+            break
+        # the dead ends of a sweep are independent, so the sweep can stop part way
+        if maxFilled != None and filledNum + deadEnds.size > maxFilled:
+            deadEnds = deadEnds[:maxFilled - filledNum]
+            complete = False
+
+        # each dead end has exactly one passage, find which direction it is in
+        deadMasks = masks[deadEnds]
+        direction = np.argmax((deadMasks[:, None] & bits[None, :]) != 0, axis=1)
+        neighbours = deadEnds + offsets[direction]
+
+        # close the passage from both sides
+        masks[deadEnds] = 0
+        degree[deadEnds] = 0
+        np.bitwise_and.at(masks, neighbours, ~bits[opposite[direction]])
+        np.subtract.at(degree, neighbours, 1)
+
+        filledNum += deadEnds.size
+        if not complete:
+            break
+        candidates = neighbours
+
+    return (bytearray(masks.tobytes()), filledNum, complete)
+
+
+
+class DeadEndFillingSolver(MazeSolver):
+    """
+    Dead end filling solver implementation.  Fills in every dead end of the maze (see pruneDeadEnds()), then walks from
+    the entrance through what remains, which only contains corridors between the entrances and exits.
+    The solver path is the path from the entrance to the exit found in the pruned maze.  Every cell filled in had to be
+    looked at, so the cells explored are the cells filled in plus the cells of the path.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.m_name = "deadend"
+        self.m_deterministic = True
+
+
+
+    def solveStepIds(self, maze: Maze3D, entrance: Coordinates3D):
+        self.m_solved = False
+        self.resetPathAndCellExplored(maze)
+        self.m_entranceUsed = entrance
+        self.m_exitUsed = None
+
+        # provide an error message if numpy isn't installed.
+        if np == None:
+            print("NumPy not available on this computer.  Dead end filling is not possible.")
+            return
+
+        # the filling runs before the first step, so it enforces the budget itself
+        deadline: float = None if self.m_maxSeconds == None else time.perf_counter() + self.m_maxSeconds
+        (masks, filledNum, complete) = pruneDeadEnds(maze, deadline, self.m_maxCells)
+        self.m_cellsExplored = filledNum
+        if not complete:
+            self.m_budgetExhausted = True
+            return
+        offsetTable: List[List[int]] = maze.passageOffsetTable()
+
+        # breadth first search over the remaining corridors, which are few in number
+        startId: int = maze.cellId(entrance)
+        parents: dict[int, int] = {startId: -1}
+        frontier: deque = deque([startId])
+        exitId: int = -1
+        while frontier:
+            curr = frontier.popleft()
+            if maze.isExitId(curr):
+                exitId = curr
+                break
+            for offset in offsetTable[masks[curr]]:
+                if curr + offset not in parents:
+                    parents[curr + offset] = curr
+                    frontier.append(curr + offset)
+
+        if exitId == -1:
+            return
+
+        path: List[int] = list()
+        curr = exitId
+        while curr != -1:
+            path.append(curr)
+            curr = parents[curr]
+        for cellId in reversed(path):
+            yield self.recordStepId(cellId, False)
+
+        self.solved(entrance, maze.cellFromId(exitId))
@@ -0,0 +1,58 @@
+# -------------------------------------------------------------------
+# Precomputed direction tables for the wall following style solvers.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+from typing import List
+
+from maze.maze3D import Maze3D
+
+
+# Directions are indices into Maze3D.DIRECTIONS: 0 is row+1, 1 is col+1, 2 is row-1, 3 is col-1, 4 is level+1 and
+# 5 is level-1.
+
+# Cyclic order of the directions around a cell.  The planar directions are counterclockwise, so the successor of the
+# direction we came from is the right turn, then straight on, then the left turn (the right hand rule).  Stairs sit at
+# a fixed place in the cycle, which keeps the walk a consistent traversal of the maze when moving between levels.
+WALL_FOLLOW_CYCLE: List[int] = [0, 3, 2, 1, 4, 5]
+
+# Planar quarter turns, (d - heading) % 4 -> turn, clockwise positive: straight, right, back (two left turns), left.
+QUARTER_TURNS: List[int] = [0, 1, -2, -1]
+
+
+def compileWallFollowTable(cycle: List[int] = WALL_FOLLOW_CYCLE)->List[List[int]]:
+    """
+    Compiles the wall following rule into a state machine table.
+
+    @param cycle: Cyclic order of directions around a cell.  Default is WALL_FOLLOW_CYCLE.
+
+    @returns table where table[lastMove][openMask] is the direction of the next move for a solver that arrived at a
+        cell by moving in direction lastMove, and the cell has passage mask openMask (see Maze3D.openMasks()).
+        The next move is the first open direction after the one we came from in the cyclic order, so turning back
+        is the last resort.  The entry is -1 if no direction is open.
+    """
+    directionNum = len(Maze3D.DIRECTIONS)
+    table: List[List[int]] = list()
+    for lastMove in range(directionNum):
+        back = Maze3D.OPPOSITE[lastMove]
+        start = cycle.index(back)
+        order = [cycle[(start + i) % directionNum] for i in range(1, directionNum + 1)]
+
+        row: List[int] = list()
+        for mask in range(1 << directionNum):
+            row.append(next((d for d in order if mask & (1 << d)), -1))
+        table.append(row)
+
+    return table
+
+
+
+def compileTurnTable()->List[List[int]]:
+    """
+    @returns table where table[facing][direction] is the number of clockwise quarter turns needed to move in direction
+        when facing the planar direction facing (0 to 3).  Moving between levels doesn't turn.
+    """
+    return [[QUARTER_TURNS[(direction - facing) % 4] if direction < 4 else 0 for direction in range(len(Maze3D.DIRECTIONS))]
+            for facing in range(4)]
@@ -6,37 +6,123 @@
 # __copyright__ = 'Copyright 2024, RMIT University'
 # -------------------------------------------------------------------
 
-from typing import List, Tuple
+import time
+from typing import Iterator, Tuple
+
 from maze.maze3D import Maze3D
 from maze.util import Coordinates3D
+from maze.tracing import tracer, TRACE_STEP, EVENT_VISIT
+from solving.solverPathRecorder import SolverPathRecorder
 
 
 class MazeSolver:
 
+    # number of steps between checks of the time budget, as reading the clock costs more than a step of most solvers
+    BUDGET_CHECK_STEPS: int = 64
+
     def __init__(self):
         # self.m_solved: true if the solver has found the exit (maze "solved")
         self.m_solved = False
         # self.m_cellsExplored: Number of cells explored during the solving process.  Does not include backtracking.
         self.m_cellsExplored = 0    
         # self.m_solverPath: Set of cells that the solver visited.  This does include backtracking.
-        self.m_solverPath: List[Tuple[Coordinates3D, bool]] = list()
+        # Stored compactly as cell ids once the solver calls resetPathAndCellExplored(maze).
+        self.m_solverPath: SolverPathRecorder = SolverPathRecorder()
+        # self.m_compressBacktracks: whether the solver path run-length encodes backtracking flags.
+        self.m_compressBacktracks = False
+        # self.m_spillThreshold: number of solver path steps kept in memory before spilling to disk, None to never spill.
+        self.m_spillThreshold = None
         # self.m_entranceUsed: Entrance used to enter maze by the solver.
         self.m_entranceUsed = None
         # self.m_exitUsed: Exit found and used by maze solver as the exit.
         self.m_exitUsed = None
         # name of the solver
         self.m_name = ""
+        # self.m_deterministic: whether solving the same maze from the same entrance always gives the same result,
+        # regardless of the random seed.  Only results of deterministic solvers may be cached.
+        self.m_deterministic = False
+        # self.m_maxCells/self.m_maxSeconds: budget of a solve, None for no limit (see setBudget()).
+        self.m_maxCells = None
+        self.m_maxSeconds = None
+        # self.m_budgetExhausted: whether the last solve was stopped because it ran out of budget.
+        self.m_budgetExhausted = False
 
 
 
     def solveMaze(self, maze: Maze3D, entrance: Coordinates3D):
         """
-        Abstract method to solve the maze.  This is used by Tasks A, B and D, where the entrance is provided.
+        Solve the maze.  This is used by Tasks A, B and D, where the entrance is provided.
+        Runs the steps of solveStepIds() to completion or until the budget runs out, so solvers only need to implement
+        solveStepIds().
 
         @param maze: Instance of maze to solve.
         @param entrance: Entrance that the solver enters the maze.
         """
-        pass
+        self.runSteps(self.solveStepIds(maze, entrance))
+
+
+
+    def runSteps(self, steps: Iterator[Tuple[int, bool]]):
+        """
+        Runs the steps of a solve (see solveStepIds()) to completion, or until the budget set by setBudget() runs out.
+        The budget is checked before each step is taken (the time only every BUDGET_CHECK_STEPS steps), so no more
+        than the maximum number of cells is ever explored, and the solver stops cleanly: it isn't solved, keeps the
+        statistics and solver path of the steps taken, and isBudgetExhausted() is True.  If the last step taken reached
+        an exit, the solver is let finish instead, as it only has to mark the maze solved.
+
+        @param steps: Generator of the steps, as returned by solveStepIds().
+        """
+        self.m_budgetExhausted = False
+        if self.m_maxCells == None and self.m_maxSeconds == None:
+            for _ in steps:
+                pass
+            return
+
+        maxCells = self.m_maxCells
+        deadline: float = None if self.m_maxSeconds == None else time.perf_counter() + self.m_maxSeconds
+        stepNum: int = 0
+        lastId: int = None
+        while (maxCells == None or self.m_cellsExplored < maxCells) and \
+                (deadline == None or stepNum % self.BUDGET_CHECK_STEPS != 0 or time.perf_counter() <= deadline):
+            step = next(steps, None)
+            if step == None:
+                return
+            lastId = step[0]
+            stepNum += 1
+
+        maze: Maze3D = self.m_solverPath.m_maze
+        # the solvers mark the maze solved after the step reaching the exit, without taking any further step
+        if lastId != None and maze != None and maze.isExitId(lastId) and next(steps, None) == None:
+            return
+        steps.close()
+        self.m_budgetExhausted = True
+        self.m_solved = False
+
+
+
+    def solveStepIds(self, maze: Maze3D, entrance: Coordinates3D = None)->Iterator[Tuple[int, bool]]:
+        """
+        Abstract method, the resumable form of solveMaze().  Returns a generator that solves the maze one step at a
+        time: every cell visited is recorded on the solver path as in solveMaze(), and also yielded as soon as it is
+        recorded, as a (flat cell id, isBacktrack) tuple.  Once the generator is exhausted, the solver is in the same
+        state as after solveMaze().  Callers can stop iterating at any time, e.g., to enforce a step budget or to run
+        several solvers in turns; the solver then has the statistics of the steps taken so far, and isn't solved.
+
+        @param maze: Instance of maze to solve.
+        @param entrance: Entrance that the solver enters the maze.  None for Task C solvers, which pick one.
+
+        @returns Generator of (cell id, isBacktrack) tuples.
+        """
+        return iter(())
+
+
+
+    def solveSteps(self, maze: Maze3D, entrance: Coordinates3D = None)->Iterator[Tuple[Coordinates3D, bool]]:
+        """
+        Same as solveStepIds(), yielding (cell, isBacktrack) tuples, e.g., for a live renderer.
+        """
+        for (cellId, isBacktrack) in self.solveStepIds(maze, entrance):
+            yield (maze.cellFromId(cellId), isBacktrack)
 
 
 
@@ -86,16 +172,109 @@ class MazeSolver:
         # we don't update cells explored for backtracking
         if not isBacktrack:
             self.m_cellsExplored += 1
-        self.m_solverPath.append((cell, isBacktrack))
+        self.m_solverPath.append(cell, isBacktrack)
+        tracer.cell(TRACE_STEP, EVENT_VISIT, cell)
+
+
+
+    def solverPathAppendId(self, cellId: int, isBacktrack: bool = False):
+        """
+        Same as solverPathAppend(), for solvers working on flat cell ids, so no Coordinates3D needs to be created.
+        resetPathAndCellExplored(maze) must have been called first.
+
+        @param cellId: Flat id of cell to add to the path.
+        @param isBacktrack: Whether the cell is visited because of backtracking.  Default is False.
+        """
+        if not isBacktrack:
+            self.m_cellsExplored += 1
+        self.m_solverPath.appendId(cellId, isBacktrack)
+        if tracer.isRecording():
+            tracer.cell(TRACE_STEP, EVENT_VISIT, self.m_solverPath.m_maze.cellFromId(cellId))
 
 
 
-    def resetPathAndCellExplored(self):
+    def recordStep(self, cell: Coordinates3D, isBacktrack: bool = False)->Tuple[int, bool]:
         """
-        Reset the number of cells explored and solver path.
+        For solveStepIds() implementations: appends the cell to the solver path (see solverPathAppend()), and returns
+        the step to yield.  resetPathAndCellExplored(maze) must have been called first.
+
+        @returns Tuple of (cell id, isBacktrack).
+        """
+        self.solverPathAppend(cell, isBacktrack)
+        return (self.m_solverPath.m_maze.cellId(cell), isBacktrack)
+
+
+
+    def recordStepId(self, cellId: int, isBacktrack: bool = False)->Tuple[int, bool]:
+        """
+        Same as recordStep(), for solvers working on flat cell ids.
+        """
+        self.solverPathAppendId(cellId, isBacktrack)
+        return (cellId, isBacktrack)
+
+
+
+    def resetPathAndCellExplored(self, maze: Maze3D = None):
+        """
+        Reset the number of cells explored and solver path.  Solvers should call this at the start of solving, with
+        the maze, so the path can be recorded as compact cell ids.
+
+        @param maze: Maze about to be solved.  Default is None, in which case cells are recorded as is.
         """
         self.m_cellsExplored = 0
-        self.m_solverPath = list()
+        self.m_solverPath.close()
+        self.m_solverPath = SolverPathRecorder(maze, self.m_compressBacktracks, self.m_spillThreshold)
+
+
+
+    def setBacktrackCompression(self, compress: bool):
+        """
+        Sets whether the solver path of subsequent solves run-length encodes the backtracking flags, which saves
+        memory for solvers that backtrack in long runs.
+
+        @param compress: True to compress.
+        """
+        self.m_compressBacktracks = compress
+
+
+
+    def setSpillThreshold(self, threshold: int):
+        """
+        Sets the spill mode of the solver path of subsequent solves.  Once more than threshold steps are recorded,
+        they are written in chunks to a temporary binary file, so only counters and the current chunk stay in memory.
+        getSolverPath() still streams the whole path back.
+
+        @param threshold: Number of steps to keep in memory, or None to never spill (the default).
+        """
+        self.m_spillThreshold = threshold
+
+
+
+    def setBudget(self, maxCells: int = None, maxSeconds: float = None):
+        """
+        Sets the budget of subsequent solves.  A solve that runs out of budget stops cleanly, see runSteps().
+
+        @param maxCells: Maximum number of cells to explore, or None for no limit (the default).
+        @param maxSeconds: Maximum time to solve for, in seconds, or None for no limit (the default).
+        """
+        self.m_maxCells = maxCells
+        self.m_maxSeconds = maxSeconds
+
+
+
+    def isBudgetExhausted(self)->bool:
+        """
+        @return True if the last solve was stopped because it ran out of budget, so the maze may still be solvable.
+        """
+        return self.m_budgetExhausted
+
+
+
+    def isDeterministic(self)->bool:
+        """
+        @return True if the solver is declared deterministic, i.e., its results can be cached and reused.
+        """
+        return self.m_deterministic
 
 
 
@@ -109,9 +288,10 @@ class MazeSolver:
 	
 
 
-    def getSolverPath(self)->List[Tuple[Coordinates3D, bool]]:
+    def getSolverPath(self)->SolverPathRecorder:
         """
         @return The path that the solver went through, which includes both cells visited and cells traversed when backtracking.
+            Iterating over it lazily yields (Coordinates3D, isBacktrack) tuples; it also supports len() and indexing.
         """
         return self.m_solverPath
     
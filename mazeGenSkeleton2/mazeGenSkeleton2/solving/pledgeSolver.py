@@ -9,184 +9,106 @@
 from maze.maze3D import Maze3D
 from solving.mazeSolver import MazeSolver
 from maze.util import Coordinates3D
+from maze.tracing import tracer, TRACE_INFO, TRACE_DEBUG, TRACE_STEP
+from solving.directionTables import compileWallFollowTable, compileTurnTable
 
 class PledgeMazeSolver(MazeSolver):
     """
     Pledge solver implementation.
+    The solver heads in its preferred direction until it hits a wall, then follows the wall (right hand rule) while
+    summing the turns it makes, and leaves the wall once the sum is back to zero.  Both the wall following rule and
+    the turn amounts are precomputed tables, and the solver walks over flat cell ids.
     """
 
-    def __init__(self):
+    # Tables only depend on the direction order, so they are shared by all instances.
+    NEXT_MOVE = compileWallFollowTable()
+    TURNS = compileTurnTable()
+
+    def __init__(self, preferredDirection: int = 1):
+        """
+        Constructor.
+
+        @param preferredDirection: Planar direction (index into Maze3D.DIRECTIONS, 0 to 3) the solver prefers to head
+            in.  Default is 1 (increasing column, i.e., East).
+        """
         super().__init__()
         self.m_name = "pledge"
-        # Define the possible directions in a cyclic order (clockwise)
-        self.directions = [
-            (-1, 0, 0),  # North
-            (-1, 1, 0),  # North-East (Up)
-            (0, 1, 0),   # East
-            (1, 0, 0),   # South
-            (1, -1, 0),  # South-West (Down)
-            (0, -1, 0)   # West
-        ]
-        self.preferred_direction_index = 2  # Initially facing East
-        self.turns = 0  # Track total angle
-
-    def solveMaze(self, maze: Maze3D, entrance: Coordinates3D):
+        self.m_deterministic = True
+        self.preferred_direction_index = preferredDirection
+        self.turns = 0  # Sum of quarter turns (clockwise positive) made while following a wall
+
+    def solveStepIds(self, maze: Maze3D, entrance: Coordinates3D):
         """
-        Solves the maze using the Pledge algorithm starting from the entrance.
+        Solves the maze using the Pledge algorithm starting from the entrance, a step at a time (see
+        MazeSolver.solveStepIds()).
         """
         self.m_solved = False
-        self.visited = set()
-        self.m_cellsExplored = 0
+        self.resetPathAndCellExplored(maze)
         self.turns = 0
         self.m_entranceUsed = entrance  # Use the inherited attribute
         self.m_exitUsed = None
 
-        self.solve(maze, entrance)
+        yield from self.solve(maze, entrance)
 
     def solve(self, maze: Maze3D, entrance: Coordinates3D):
         """
-        Core logic for solving the maze using the Pledge algorithm.
+        Core logic for solving the maze using the Pledge algorithm, as a generator of the steps taken.
+        The solver stops if it walks back out of the entrance, or if it takes more steps than it takes to walk around
+        every wall of the maze twice, as with loops or sealed exits the turn sum may never settle.
         """
-        current_cell = entrance
-        self.visited.add(current_cell)
-        self.m_cellsExplored += 1  # Increment explored cells
-        path = [current_cell]
-
-        while current_cell not in maze.getExits():
-            print(f"Current cell: {current_cell}")
-            next_cell = self.getNextCell(maze, current_cell, self.directions[self.preferred_direction_index])
-            if next_cell:
-                current_cell = next_cell
-                self.visited.add(current_cell)
-                self.m_cellsExplored += 1  # Increment explored cells
-                path.append(current_cell)
-                self.solverPathAppend(current_cell, False)
-                # Check for exit at each step
-                if current_cell in maze.getExits():
-                    self.m_exitUsed = current_cell  # Set the exit point
-                    self.solved(entrance, current_cell)
-                    print("Maze solved.")
-                    print(f"Path: {path}")
-                    return
+        masks = maze.openMasks()
+        offsets = maze.directionOffsets()
+        nextMove = self.NEXT_MOVE
+        turnTable = self.TURNS
+        preferred = self.preferred_direction_index
+        stepTrace = tracer.isEnabled(TRACE_STEP)
+
+        entranceId = maze.cellId(entrance)
+        visited = bytearray(maze.cellIdNum())
+        visited[entranceId] = 1
+        yield self.recordStepId(entranceId, False)
+
+        current = entranceId
+        # last move made (which the wall following rule needs) and the planar direction we are facing
+        lastMove = preferred
+        facing = preferred
+        followingWall = False
+        maxSteps = 2 * len(offsets) * maze.cellIdNum()
+        steps = 0
+
+        while not maze.isExitId(current):
+            mask = masks[current]
+            if not followingWall and mask & (1 << preferred):
+                move = preferred
             else:
-                next_cell = self.wallFollow(maze, current_cell)
-                if next_cell:
-                    current_cell = next_cell
-                    self.visited.add(current_cell)
-                    self.m_cellsExplored += 1  # Increment explored cells
-                    path.append(current_cell)
-                    self.solverPathAppend(current_cell, False)
-                    # Check for exit at each step
-                    if current_cell in maze.getExits():
-                        self.m_exitUsed = current_cell  # Set the exit point
-                        self.solved(entrance, current_cell)
-                        print("Maze solved.")
-                        print(f"Path: {path}")
-                        return
-                else:
-                    print("Maze could not be solved.")
-                    break  # Prevent infinite loop by breaking out if no valid moves
-
-        if current_cell in maze.getExits():
-            self.m_exitUsed = current_cell  # Set the exit point
-            self.solved(entrance, current_cell)
-            print("Maze solved.")
-            print(f"Path: {path}")
-
-    def getNextCell(self, maze: Maze3D, current_cell: Coordinates3D, direction: tuple):
-        """
-        Determine the next cell to move to based on the current direction.
-        """
-        level, row, col = current_cell.getLevel(), current_cell.getRow(), current_cell.getCol()
-        dlevel, drow, dcol = direction
-        next_cell = Coordinates3D(level + dlevel, row + drow, col + dcol)
-        print(f"Trying to move from {current_cell} to {next_cell} in direction {direction}")
-        if self.isValidMove(maze, current_cell, next_cell):
-            return next_cell
-        return None
-
-    def isValidMove(self, maze: Maze3D, from_cell: Coordinates3D, to_cell: Coordinates3D):
-        """
-        Check if the move from one cell to another is valid.
-        """
-        return self.isValidCoordinate(to_cell, maze) and not maze.hasWall(from_cell, to_cell)
-
-    def isValidCoordinate(self, cell: Coordinates3D, maze: Maze3D) -> bool:
-        """
-        Check if the coordinates are within the bounds of the maze.
-        """
-        level = cell.getLevel()
-        row = cell.getRow()
-        col = cell.getCol()
-        valid = (
-                0 <= level < maze.levelNum() and
-                0 <= row < maze.rowNum(level) and
-                0 <= col < maze.colNum(level)
-        )
-        print(f"Checking validity of {cell}: {valid}")
-        return valid
-
-    def wallFollow(self, maze: Maze3D, current_cell: Coordinates3D):
-        """
-        Follow the wall using the right-hand rule until the solver is free to move in the preferred direction.
-        """
-        # Order of checks: North, North-East, East, South, South-West, West
-        directions = [
-            (-1, 0, 0),  # North
-            (-1, 1, 0),  # North-East (Up)
-            (0, 1, 0),   # East
-            (1, 0, 0),   # South
-            (1, -1, 0),  # South-West (Down)
-            (0, -1, 0)   # West
-        ]
-
-        for turn in range(1, len(directions) + 1):
-            direction_index = (self.preferred_direction_index + turn) % len(directions)  # Right-hand rule
-            dx, dy, dz = directions[direction_index]
-            next_cell = Coordinates3D(
-                current_cell.getLevel() + dz,
-                current_cell.getRow() + dx,
-                current_cell.getCol() + dy
-            )
-
-            print(f"Checking next cell: {next_cell}")
-
-            if next_cell in self.visited:
-                print(f"Cell {next_cell} is already visited.")
-                self.updateAngle(directions[direction_index])
-                continue
-
-            if not self.isValidCoordinate(next_cell, maze):
-                print(f"Cell {next_cell} is invalid.")
-                self.updateAngle(directions[direction_index])
-                continue
-
-            if maze.hasWall(current_cell, next_cell):
-                print(f"Wall exists between {current_cell} and {next_cell}.")
-                self.updateAngle(directions[direction_index])
-                continue
-
-            # If all checks pass, move to the next cell
-            self.preferred_direction_index = direction_index
-
-            print(f"Moved to: {next_cell} with angle difference: {self.turns}")
-
-            if self.turns == 0:
-                print("Turn count balanced, resuming preferred direction.")
-                # Continue in the initial direction
-                self.preferred_direction_index = 0  # Reset to initial direction (East)
-
-            return next_cell
-
-        print("No valid moves found, returning None.")
-        return None
-
-    def updateAngle(self, direction: tuple):
-        """
-        Update the angle based on the direction change.
-        """
-        if direction in [(0, 1, 0), (0, -1, 0),(1, 0, 0),(-1, 0, 0)]:  # East or West
-            self.turns += 1
-        else:
-            self.turns += 0.5
-        print(f"Angle updated to {self.turns} due to direction change.")
+                move = nextMove[lastMove][mask]
+                if move < 0:
+                    tracer.log(TRACE_INFO, "Maze could not be solved.")
+                    return
+                if not followingWall:
+                    tracer.log(TRACE_DEBUG, "Hit a wall at {}, following it.", maze.cellFromId(current))
+                    followingWall = True
+                self.turns += turnTable[facing][move]
+
+            current += offsets[move]
+            lastMove = move
+            if move < 4:
+                facing = move
+            if stepTrace:
+                tracer.log(TRACE_STEP, "Moved in direction {} to {}, turn sum {}", move, maze.cellFromId(current), self.turns)
+
+            steps += 1
+            if current == entranceId or steps > maxSteps:
+                yield self.recordStepId(current, True)
+                tracer.log(TRACE_INFO, "Maze could not be solved.")
+                return
+
+            yield self.recordStepId(current, visited[current] == 1)
+            visited[current] = 1
+
+            if followingWall and self.turns == 0:
+                tracer.log(TRACE_DEBUG, "Turn count balanced, resuming preferred direction.")
+                followingWall = False
+
+        self.solved(entrance, maze.cellFromId(current))
+        tracer.log(TRACE_INFO, "Maze solved.")
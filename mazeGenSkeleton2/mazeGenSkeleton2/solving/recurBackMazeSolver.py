@@ -25,22 +25,24 @@ class RecurBackMazeSolver(MazeSolver):
 
 
 
-    def solveMaze(self, maze: Maze3D, entrance: Coordinates3D):
+    def solveStepIds(self, maze: Maze3D, entrance: Coordinates3D):
         self.m_solved = False
+        self.resetPathAndCellExplored(maze)
 
 		# select starting cell
         startCoord: Coordinates3D = entrance
 
 		# run recursive backtracking/DFS from starting cell
+        # the stack holds the current path from the start, so backtracking is popping the top
         stack : deque = deque()
-        # stack.append(startCoord)
+        stack.append(startCoord)
         currCell : Coordinates3D = startCoord 
         visited : set[Coordinates3D] = set([startCoord])
 
-        self.solverPathAppend(startCoord, False)
+        yield self.recordStep(startCoord, False)
 
     
-        while currCell not in maze.getExits():
+        while not maze.isExit(currCell):
 			# find all neighbours of current cell
             neighbours : list[Coordinates3D] = maze.neighbours(currCell)
 
@@ -59,19 +61,21 @@ class RecurBackMazeSolver(MazeSolver):
 
 				# updated visited
                 visited.add(neigh)
-                self.solverPathAppend(neigh, False)
+                yield self.recordStep(neigh, False)
 
 				# update currCell
                 currCell = neigh
             else:
 				# backtrack
-                currCell = stack.pop()
-                currCell = stack.pop()
-                stack.append(currCell)
-                self.solverPathAppend(currCell, True)
+                stack.pop()
+                if len(stack) == 0:
+                    # back past the start, everything reachable has been visited without finding an exit
+                    break
+                currCell = stack[-1]
+                yield self.recordStep(currCell, True)
 
         # ensure we are currently at the exit
-        if currCell in maze.getExits():
+        if maze.isExit(currCell):
             self.solved(entrance, currCell)
 
 	
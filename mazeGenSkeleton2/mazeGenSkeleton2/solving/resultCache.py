@@ -0,0 +1,176 @@
+# -------------------------------------------------------------------
+# Cache of solver results, keyed by maze fingerprint.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import json
+import os
+import zlib
+from array import array
+from collections import OrderedDict
+
+from maze.maze3D import Maze3D
+from maze.util import Coordinates3D
+from solving.mazeSolver import MazeSolver
+
+
+class SolverResultCache:
+    """
+    Cache of the results of deterministic solvers: whether the maze was solved, the number of cells explored, the
+    entrance and exit used and the solver path.  The most recently used results are kept in memory (LRU), and if a
+    directory is given, every result is also saved there, one file per key, so later runs can reuse it.
+
+    A cache file is a line of JSON with the result, followed by the zlib compressed solver path: the cell ids (4 bytes
+    each), then the backtrack flags packed one bit per step.
+    """
+
+    def __init__(self, cacheDir: str = None, capacity: int = 64):
+        """
+        Constructor.
+
+        @param cacheDir: Directory to save results to and load them from, created if needed.  Default is None, which
+            only caches in memory.
+        @param capacity: Maximum number of results kept in memory.  Default is 64.
+        """
+        self.m_cacheDir = cacheDir
+        self.m_capacity = capacity
+        self.m_entries: OrderedDict = OrderedDict()
+        if cacheDir != None:
+            os.makedirs(cacheDir, exist_ok=True)
+
+
+
+    @staticmethod
+    def makeKey(maze: Maze3D, solverName: str, entrance: Coordinates3D, seed: int)->str:
+        """
+        @param maze: Maze being solved.
+        @param solverName: Name of solver (plus anything else that changes its results, e.g., its heuristic).
+        @param entrance: Entrance the solver starts from, or None if it picks one (Task C).
+        @param seed: Random seed, or None.
+
+        @returns Key of the result, which is also usable as a file name.
+        """
+        entranceStr = 'none' if entrance == None else '{}_{}_{}'.format(entrance.getLevel(), entrance.getRow(), entrance.getCol())
+        return '{:016x}-{}-{}-{}'.format(maze.fingerprint(), solverName, entranceStr, 'none' if seed == None else seed)
+
+
+
+    def lookup(self, key: str)->dict:
+        """
+        @param key: Key of result, see makeKey().
+
+        @returns The cached result, or None if there is none.
+        """
+        if key in self.m_entries:
+            self.m_entries.move_to_end(key)
+            return self.m_entries[key]
+
+        if self.m_cacheDir == None:
+            return None
+        try:
+            with open(self.cacheFileName(key), 'rb') as cacheFile:
+                entry: dict = json.loads(cacheFile.readline())
+                entry['path'] = cacheFile.read()
+        except (OSError, ValueError):
+            return None
+
+        self.remember(key, entry)
+        return entry
+
+
+
+    def store(self, key: str, solver: MazeSolver)->bool:
+        """
+        Caches the result of the solver's last solve.
+
+        @param key: Key of result, see makeKey().
+        @param solver: Solver that has just solved the maze the key is for.
+
+        @returns True if the result was cached, False if the solver isn't deterministic or ran out of budget.
+        """
+        if not solver.isDeterministic() or solver.isBudgetExhausted():
+            return False
+
+        cellIds: array = array('i')
+        flagBits: bytearray = bytearray()
+        for (i, (cellId, isBacktrack)) in enumerate(solver.getSolverPath().iterIds()):
+            cellIds.append(cellId)
+            if i % 8 == 0:
+                flagBits.append(0)
+            if isBacktrack:
+                flagBits[-1] |= 1 << (i % 8)
+
+        entry: dict = {'solved': solver.isSolved(), 'cellsExplored': solver.getCellsExplored(),
+                       'entrance': cellList(solver.getEntranceUsed()), 'exit': cellList(solver.getExitUsed()),
+                       'pathLength': len(cellIds)}
+        path: bytes = zlib.compress(cellIds.tobytes() + flagBits)
+
+        if self.m_cacheDir != None:
+            # write to a temporary file first, so other runs never read a partial result
+            fileName: str = self.cacheFileName(key)
+            with open(fileName + '.tmp', 'wb') as cacheFile:
+                cacheFile.write(json.dumps(entry).encode() + b'\n')
+                cacheFile.write(path)
+            os.replace(fileName + '.tmp', fileName)
+
+        entry['path'] = path
+        self.remember(key, entry)
+        return True
+
+
+
+    def restore(self, entry: dict, solver: MazeSolver, maze: Maze3D):
+        """
+        Puts a cached result into the solver, as if it had just solved the maze.
+
+        @param entry: Result returned by lookup().
+        @param solver: Solver to update.
+        @param maze: Maze the result is for.
+        """
+        solver.resetPathAndCellExplored(maze)
+        data: bytes = zlib.decompress(entry['path'])
+        pathLength: int = entry['pathLength']
+        cellIds: array = array('i')
+        cellIds.frombytes(data[:pathLength * cellIds.itemsize])
+        flagBits: bytes = data[pathLength * cellIds.itemsize:]
+
+        recorder = solver.getSolverPath()
+        for (i, cellId) in enumerate(cellIds):
+            recorder.appendId(cellId, flagBits[i // 8] & (1 << (i % 8)) != 0)
+
+        solver.m_cellsExplored = entry['cellsExplored']
+        solver.m_solved = entry['solved']
+        solver.m_budgetExhausted = False
+        solver.m_entranceUsed = None if entry['entrance'] == None else Coordinates3D(*entry['entrance'])
+        solver.m_exitUsed = None if entry['exit'] == None else Coordinates3D(*entry['exit'])
+
+
+
+    def remember(self, key: str, entry: dict):
+        """
+        Adds a result to the in-memory cache, evicting the least recently used ones beyond capacity.
+        """
+        self.m_entries[key] = entry
+        self.m_entries.move_to_end(key)
+        while len(self.m_entries) > self.m_capacity:
+            self.m_entries.popitem(last=False)
+
+
+
+    def cacheFileName(self, key: str)->str:
+        """
+        @returns Name of the file the result with key is saved in.
+        """
+        return os.path.join(self.m_cacheDir, key + '.cache')
+
+
+
+def cellList(cell: Coordinates3D)->list:
+    """
+    @returns The [level, row, col] list of cell (as in the configuration files), or None if cell is None.
+    """
+    if cell == None:
+        return None
+    return [cell.getLevel(), cell.getRow(), cell.getCol()]
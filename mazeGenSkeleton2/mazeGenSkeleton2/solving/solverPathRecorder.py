@@ -0,0 +1,278 @@
+# -------------------------------------------------------------------
+# Compact recorder of the path a solver went through.
+#
+# __author__ = 'Jeffrey Chan'
+# __copyright__ = 'Copyright 2024, RMIT University'
+# -------------------------------------------------------------------
+
+import tempfile
+from array import array
+from bisect import bisect_right
+from typing import Iterator, List, Tuple
+
+from maze.maze3D import Maze3D
+from maze.util import Coordinates3D
+
+
+class SolverPathRecorder:
+    """
+    Records the cells a solver visits, including backtracking, as flat cell ids in an array('i') (4 bytes per step)
+    and the backtrack flags in a bit array (1 bit per step), instead of a list of (Coordinates3D, bool) tuples.
+    Optionally, the backtrack flags are run-length encoded instead, which is much smaller for solvers that backtrack
+    in long runs (e.g., DFS).
+
+    Iterating over the recorder lazily yields the same (Coordinates3D, bool) tuples as the old list, and len() and
+    indexing are supported, so it can be used wherever the list was.
+
+    For paths larger than memory, the recorder can spill: every spillThreshold steps, the recorded ids and flags are
+    written as a chunk to a temporary binary file, and only counters and the current chunk are kept in RAM.  Reading
+    the path back (iteration, iterIds(), indexing) streams it from the file a chunk at a time.
+
+    If no maze is given, cell ids can't be computed, and cells are kept in a plain list as before.
+    """
+
+    def __init__(self, maze: Maze3D = None, compressBacktracks: bool = False, spillThreshold: int = None):
+        """
+        Constructor.
+
+        @param maze: Maze being solved, whose flat cell ids are used.  Default is None (uncompressed fallback).
+        @param compressBacktracks: Whether to run-length encode the backtrack flags.  Default is False.  Ignored when
+            spilling, as spilled chunks store one bit per step.
+        @param spillThreshold: Number of steps kept in memory before they are spilled to disk, rounded up to a multiple
+            of 8.  Default is None, which never spills.  Needs a maze.
+        """
+        self.m_maze = maze
+        self.m_spillChunk: int = None
+        if spillThreshold != None and maze != None:
+            self.m_spillChunk = max(8, (spillThreshold + 7) // 8 * 8)
+            compressBacktracks = False
+        self.m_compressBacktracks = compressBacktracks
+        self.m_length: int = 0
+        # number of steps spilled to the temporary file, always a whole number of chunks
+        self.m_spilledSteps: int = 0
+        self.m_spillFile = None
+        # cell ids of the steps, or the cells themselves if there is no maze
+        self.m_cellIds: array = array('i')
+        self.m_cells: List[Coordinates3D] = list()
+        # backtrack flags, one bit per step
+        self.m_flagBits: bytearray = bytearray()
+        # run-length encoded backtrack flags: lengths of alternating runs, starting with a (possibly empty)
+        # non-backtracking run.  Only used if compressBacktracks.
+        self.m_runs: array = array('i', [0])
+        # cumulative run ends, built on demand for indexing
+        self.m_runEnds: List[int] = None
+
+
+
+    def append(self, cell: Coordinates3D, isBacktrack: bool = False):
+        """
+        Records a step.
+
+        @param cell: Cell visited.
+        @param isBacktrack: Whether the cell is visited because of backtracking.  Default is False.
+        """
+        if self.m_maze == None:
+            self.m_cells.append(cell)
+            self.appendFlag(isBacktrack)
+        else:
+            self.appendId(self.m_maze.cellId(cell), isBacktrack)
+
+
+
+    def appendId(self, cellId: int, isBacktrack: bool = False):
+        """
+        Records a step given the flat cell id, which avoids creating Coordinates3D.  Needs a maze.
+
+        @param cellId: Flat id of cell visited.
+        @param isBacktrack: Whether the cell is visited because of backtracking.  Default is False.
+        """
+        self.m_cellIds.append(cellId)
+        self.appendFlag(isBacktrack)
+        if self.m_spillChunk != None and len(self.m_cellIds) >= self.m_spillChunk:
+            self.spill()
+
+
+
+    def spill(self):
+        """
+        Writes the steps held in memory as one chunk to the spill file: the cell ids, then the packed flag bits.
+        """
+        if self.m_spillFile == None:
+            self.m_spillFile = tempfile.TemporaryFile()
+        self.m_spillFile.seek(0, 2)
+        self.m_cellIds.tofile(self.m_spillFile)
+        self.m_spillFile.write(self.m_flagBits)
+
+        self.m_spilledSteps += len(self.m_cellIds)
+        self.m_cellIds = array('i')
+        self.m_flagBits = bytearray()
+
+
+
+    def readChunk(self, chunkIndex: int)->Tuple[array, bytearray]:
+        """
+        @param chunkIndex: Index of spilled chunk.
+
+        @returns Tuple of (cell ids, packed flag bits) of the chunk, read from the spill file.
+        """
+        chunkBytes = self.m_spillChunk * self.m_cellIds.itemsize + self.m_spillChunk // 8
+        self.m_spillFile.seek(chunkIndex * chunkBytes)
+        cellIds: array = array('i')
+        cellIds.fromfile(self.m_spillFile, self.m_spillChunk)
+        return (cellIds, bytearray(self.m_spillFile.read(self.m_spillChunk // 8)))
+
+
+
+    def iterChunks(self)->Iterator[Tuple[array, bytearray, int]]:
+        """
+        @returns Iterator over the recorded steps a chunk at a time, as (cell ids, packed flag bits, step count)
+            tuples: first the spilled chunks, then the steps still in memory.  Only one chunk is loaded at a time.
+        """
+        for chunkIndex in range(self.m_spilledSteps // self.m_spillChunk if self.m_spillChunk != None else 0):
+            (cellIds, flagBits) = self.readChunk(chunkIndex)
+            yield (cellIds, flagBits, len(cellIds))
+        yield (self.m_cellIds, self.m_flagBits, self.m_length - self.m_spilledSteps)
+
+
+
+    def spilledSteps(self)->int:
+        """
+        @returns Number of steps that have been spilled to disk.
+        """
+        return self.m_spilledSteps
+
+
+
+    def appendFlag(self, isBacktrack: bool):
+        """
+        Records the backtrack flag of a new step.
+        """
+        if self.m_compressBacktracks:
+            # odd numbered runs are backtracking ones
+            if (len(self.m_runs) % 2 == 0) == isBacktrack:
+                self.m_runs[-1] += 1
+            else:
+                self.m_runs.append(1)
+            self.m_runEnds = None
+        else:
+            # position within the steps held in memory; spilled steps are a multiple of 8 so bits stay aligned
+            position = self.m_length - self.m_spilledSteps
+            if position % 8 == 0:
+                self.m_flagBits.append(0)
+            if isBacktrack:
+                self.m_flagBits[-1] |= 1 << (position % 8)
+        self.m_length += 1
+
+
+
+    def isBacktrack(self, index: int)->bool:
+        """
+        @param index: Index of step.
+
+        @returns The backtrack flag of the step.
+        """
+        if self.m_compressBacktracks:
+            if self.m_runEnds == None:
+                self.m_runEnds = list()
+                total = 0
+                for runLength in self.m_runs:
+                    total += runLength
+                    self.m_runEnds.append(total)
+            return bisect_right(self.m_runEnds, index) % 2 == 1
+
+        if index < self.m_spilledSteps:
+            (_, flagBits) = self.readChunk(index // self.m_spillChunk)
+            index %= self.m_spillChunk
+        else:
+            flagBits = self.m_flagBits
+            index -= self.m_spilledSteps
+        return flagBits[index // 8] & (1 << (index % 8)) != 0
+
+
+
+    def iterFlags(self)->Iterator[bool]:
+        """
+        @returns Iterator over the backtrack flags of the steps, in order.
+        """
+        if self.m_compressBacktracks:
+            for (i, runLength) in enumerate(self.m_runs):
+                for _ in range(runLength):
+                    yield i % 2 == 1
+        else:
+            for (_, flagBits, stepNum) in self.iterChunks():
+                for i in range(stepNum):
+                    yield flagBits[i // 8] & (1 << (i % 8)) != 0
+
+
+
+    def iterIds(self)->Iterator[Tuple[int, bool]]:
+        """
+        @returns Iterator of (cell id, backtrack flag) tuples, for consumers that work on flat cell ids.  Needs a maze.
+        """
+        if self.m_compressBacktracks:
+            yield from zip(self.m_cellIds, self.iterFlags())
+            return
+
+        for (cellIds, flagBits, stepNum) in self.iterChunks():
+            for i in range(stepNum):
+                yield (cellIds[i], flagBits[i // 8] & (1 << (i % 8)) != 0)
+
+
+
+    def __iter__(self)->Iterator[Tuple[Coordinates3D, bool]]:
+        if self.m_maze == None:
+            return zip(iter(self.m_cells), self.iterFlags())
+
+        cellFromId = self.m_maze.cellFromId
+        return ((cellFromId(cellId), flag) for (cellId, flag) in self.iterIds())
+
+
+
+    def __len__(self)->int:
+        return self.m_length
+
+
+
+    def __getitem__(self, index: int)->Tuple[Coordinates3D, bool]:
+        if index < 0:
+            index += self.m_length
+        if index < 0 or index >= self.m_length:
+            raise IndexError('solver path index out of range')
+
+        if self.m_maze == None:
+            return (self.m_cells[index], self.isBacktrack(index))
+        if index < self.m_spilledSteps:
+            (cellIds, _) = self.readChunk(index // self.m_spillChunk)
+            return (self.m_maze.cellFromId(cellIds[index % self.m_spillChunk]), self.isBacktrack(index))
+        return (self.m_maze.cellFromId(self.m_cellIds[index - self.m_spilledSteps]), self.isBacktrack(index))
+
+
+
+    def nbytes(self)->int:
+        """
+        @returns Approximate number of bytes of memory used by the recorded steps (spilled steps are not counted).
+        """
+        if self.m_compressBacktracks:
+            flagBytes = self.m_runs.itemsize * len(self.m_runs)
+        else:
+            flagBytes = len(self.m_flagBits)
+        return self.m_cellIds.itemsize * len(self.m_cellIds) + flagBytes
+
+
+
+    def countBacktracks(self)->int:
+        """
+        @returns Number of recorded steps that are backtracking, streamed without loading the path.
+        """
+        return sum(1 for flag in self.iterFlags() if flag)
+
+
+
+    def close(self):
+        """
+        Deletes the spill file, if any.  The recorder is empty afterwards.
+        """
+        if self.m_spillFile != None:
+            self.m_spillFile.close()
+            self.m_spillFile = None
+        self.__init__(self.m_maze, self.m_compressBacktracks, self.m_spillChunk)
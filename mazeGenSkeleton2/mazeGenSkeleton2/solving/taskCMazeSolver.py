@@ -5,22 +5,39 @@
 # __author__ = 'Jeffrey Chan'
 # __copyright__ = 'Copyright 2024, RMIT University'
 # -------------------------------------------------------------------
+import time
 from collections import deque
-from queue import PriorityQueue
 from maze.maze3D import Maze3D
 from solving.mazeSolver import MazeSolver
 from maze.util import Coordinates3D
+from maze.tracing import tracer, TRACE_INFO, TRACE_DEBUG
 
 class TaskCMazeSolver(MazeSolver):
     """
-    Task C solver implementation using A* algorithm.
+    Task C solver implementation.  Explores from all entrances at once, and traces the chosen path back through the
+    parent map, or walks it with a tree distance oracle of the maze if one is set (see setDistanceOracle()).
     """
 
     def __init__(self):
         super().__init__()
         self.m_name = "taskC"
+        self.m_deterministic = True
+        # tree distance oracle of the maze being solved, None to trace paths through the exploration's parent map
+        self.m_oracle = None
 
-    def solveMaze(self, maze: Maze3D):
+    def setDistanceOracle(self, oracle):
+        """
+        Sets the tree distance oracle to use in subsequent solves, which should be built for the maze being solved,
+        e.g., one a caller already has for its own distance queries.  The exploration still finds the exits, the best
+        entrance and exit pair and its length; if the maze is perfect, the oracle only produces the chosen path,
+        lazily walking its parent links.  Building an oracle takes longer than an exploration, so building one just
+        to solve a maze is not worth it.
+
+        @param oracle: maze.treeDistanceOracle.TreeDistanceOracle of the maze, or None to not use one.
+        """
+        self.m_oracle = oracle
+
+    def solveMaze(self, maze: Maze3D, entrance: Coordinates3D = None):
         self.solveMazeTaskC(maze)
 
     def solveMazeTaskC(self, maze: Maze3D):
@@ -29,97 +46,104 @@ class TaskCMazeSolver(MazeSolver):
         This version of solveMaze does not provide a starting entrance, and as part of the solution, the method should
         find the entrance and exit pair (see project specs for requirements of this task).
         """
-        min_cost = float('inf')
-        best_pair = (None, None)
+        self.runSteps(self.solveStepIds(maze))
 
+    def solveStepIds(self, maze: Maze3D, entrance: Coordinates3D = None):
+        """
+        Resumable form of solveMazeTaskC(), see MazeSolver.solveStepIds().  The entrance is ignored, the solver picks
+        one.  The exploration is done before the first step, the steps are the cells of the chosen path; the cell and
+        time budgets are enforced by the exploration itself.
+        """
+        self.m_solved = False
+        self.resetPathAndCellExplored(maze)
         entrances = maze.getEntrances()
         num_exits = len(maze.getExits())  # Get the number of exits, but not their locations
 
-        for entrance in entrances:
-            local_paths, local_cells_explored = self.explore_with_dfs(maze, entrance, num_exits)
-            for exit_cell, path in local_paths.items():
-                path_length = len(path) - 1
-                cost = local_cells_explored + path_length
-                if cost < min_cost and entrance != exit_cell:
-                    min_cost = cost
-                    best_pair = (entrance, exit_cell)
+        # a single exploration serves every entrance; each potential exit remembers the entrance that reached it first
+        parents, origins, depths, cells_explored, out_of_time = self.explore_from_entrances(maze, entrances, num_exits)
+        if out_of_time or (self.m_maxCells != None and cells_explored >= self.m_maxCells and len(origins) < num_exits):
+            tracer.log(TRACE_INFO, "Ran out of budget after exploring {} cells.", cells_explored)
+            self.m_cellsExplored = cells_explored
+            self.m_budgetExhausted = True
+            return
+
+        min_cost = float('inf')
+        best_pair = (None, None)
+        for exit_cell, entrance in origins.items():
+            cost = cells_explored + depths[exit_cell]
+            if cost < min_cost:
+                min_cost = cost
+                best_pair = (entrance, exit_cell)
 
         if best_pair[0] and best_pair[1]:
-            self.m_cellsExplored = min_cost
-            self.m_entranceUsed = best_pair[0]
-            self.m_exitUsed = best_pair[1]
-            print(f"Best pair: Entrance at {best_pair[0]}, Exit at {best_pair[1]} with cost {min_cost}")
-            self.trace_path(maze, best_pair[0], best_pair[1])
-
-    def explore_with_dfs(self, maze: Maze3D, entrance: Coordinates3D, num_exits: int):
-        stack = [(entrance, [entrance])]
-        visited = set()
-        visited.add(entrance)
-        local_paths = {}
+            tracer.log(TRACE_INFO, "Best pair: Entrance at {}, Exit at {} with cost {}", best_pair[0], best_pair[1], min_cost)
+            if self.m_oracle != None and self.m_oracle.isPerfect():
+                path = self.m_oracle.path(best_pair[0], best_pair[1])
+            else:
+                path = self.reconstruct_path(parents, best_pair[0], best_pair[1])
+            for cell in path:
+                yield self.recordStep(cell, False)
+            # the path cells were all explored already, only count the exploration
+            self.m_cellsExplored = cells_explored
+            self.solved(best_pair[0], best_pair[1])
+
+    def explore_from_entrances(self, maze: Maze3D, entrances, num_exits: int):
+        """
+        Multi-source breadth first exploration from all entrances at once.
+        Rather than carrying a copy of the path with every frontier cell, each visited cell only records its parent,
+        so memory and time stay linear in the number of cells explored.  Paths are rebuilt with reconstruct_path().
+        Stops early once the cell or time budget of the solver (see setBudget()) is spent; the time is checked every
+        BUDGET_CHECK_STEPS cells.
+
+        @returns Tuple of (parent map, potential exit -> entrance that reached it, cell -> distance from its
+            entrance, number of cells explored, whether the time budget ran out).
+        """
+        parents = {}
+        depths = {}
+        frontier = deque()
+        for entrance in entrances:
+            if entrance not in parents:
+                parents[entrance] = None
+                depths[entrance] = 0
+                frontier.append((entrance, entrance))
+
+        origins = {}
         cells_explored = 0
 
-        while stack and len(local_paths) < num_exits:
-            current_cell, path = stack.pop()
+        max_cells = self.m_maxCells if self.m_maxCells != None else float('inf')
+        deadline = None if self.m_maxSeconds == None else time.perf_counter() + self.m_maxSeconds
+        while frontier and len(origins) < num_exits and cells_explored < max_cells:
+            if deadline != None and cells_explored % self.BUDGET_CHECK_STEPS == 0 and time.perf_counter() > deadline:
+                return parents, origins, depths, cells_explored, True
+            current_cell, entrance = frontier.popleft()
             cells_explored += 1
 
-            if self.is_potential_exit(maze, current_cell, entrance) and current_cell not in local_paths:
-                local_paths[current_cell] = path
+            if current_cell not in origins and self.is_potential_exit(maze, current_cell, parents):
+                origins[current_cell] = entrance
 
             for neighbor in maze.neighbours(current_cell):
-                if neighbor not in visited and not maze.hasWall(current_cell, neighbor):
-                    visited.add(neighbor)
-                    stack.append((neighbor, path + [neighbor]))
-
-        return local_paths, cells_explored
-
-    def a_star_path(self, maze: Maze3D, start: Coordinates3D, end: Coordinates3D):
-        pq = PriorityQueue()
-        pq.put((0, start))
-        came_from = {}
-        cost_so_far = {start: 0}
-        came_from[start] = None
+                if neighbor not in parents and not maze.hasWall(current_cell, neighbor):
+                    parents[neighbor] = current_cell
+                    depths[neighbor] = depths[current_cell] + 1
+                    frontier.append((neighbor, entrance))
 
-        while not pq.empty():
-            _, current = pq.get()
+        return parents, origins, depths, cells_explored, False
 
-            if current == end:
-                break
-
-            for neighbor in maze.neighbours(current):
-                new_cost = cost_so_far[current] + 1
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-                    priority = new_cost + self.heuristic(neighbor, end)  # Heuristic calculation
-                    pq.put((priority, neighbor))
-                    came_from[neighbor] = current
-
-        return self.reconstruct_path(came_from, start, end)  # Path is reconstructed from entrance to exit utilizing the shortest distance found
-
-    def heuristic(self, cell: Coordinates3D, entrance: Coordinates3D):
-        # Manhattan distance as the heuristic:the sum of absolute differences between points across all the dimensions.
-        return abs(cell.getLevel() - entrance.getLevel()) + abs(cell.getRow() - entrance.getRow()) + abs(cell.getCol() - entrance.getCol())
-
-    def is_potential_exit(self, maze: Maze3D, cell: Coordinates3D, entrance: Coordinates3D):
+    def is_potential_exit(self, maze: Maze3D, cell: Coordinates3D, parents):
         """
         Simulate checking if the cell is an exit based on heuristic rules.
         For example, assume an exit is located at the outer boundary of the maze.
-        Ensure the entrance is not considered as an exit.
+        Ensure the entrances (the roots of the exploration, which have no parent) are not considered as exits.
         """
-        if cell == entrance:
+        if parents[cell] is None:
             return False
 
         level, row, col = cell.getLevel(), cell.getRow(), cell.getCol()
         if row == -1 or col == -1 or row == maze.rowNum(level) or col == maze.colNum(level):
-            print(f"Potential exit: {cell}")
+            tracer.log(TRACE_DEBUG, "Potential exit: {}", cell)
             return True
         return False
 
-    def trace_path(self, maze: Maze3D, start: Coordinates3D, end: Coordinates3D):
-        path = self.a_star_path(maze, start, end)
-        for cell in path:
-            self.solverPathAppend(cell, False)
-        return path
-
     def reconstruct_path(self, came_from, start, end):
         current = end
         path = []